@@ -0,0 +1,127 @@
+"""
+요약 컨텍스트 벤치마크: 앞 5페이지 원본 이미지(pages) vs contact sheet 1장(sheet)
+
+처리 버킷의 페이지 이미지로 요약 요청을 두 방식으로 실행해서
+요청 페이로드, 입력 토큰 수, 페이지당 지연 시간을 비교 (결과 캐시 미사용, 이미지는 inline bytes)
+contact sheet는 GCS에 업로드하지 않고 메모리에서 생성 (문서별 1회, 생성 시간도 출력)
+
+    python benchmark/context_sheet_benchmark.py --prefix "1. International Standards/IEC/" --limit 20
+    python benchmark/context_sheet_benchmark.py --paths a/a-page-00007.png --tile-px 512
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from typing import Dict, List
+
+from google import genai
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from storage.gcs_client import GCSStorageClient, create_storage_client
+from processor.extractor import build_summary_request
+from processor.context_sheet import CONTEXT_PAGES, CONTEXT_SHEET_MIME_TYPE, build_context_sheet_from_bytes
+from processor.image_encoding import mime_type_for
+from config import (
+    PROJECT_ID, GENAI_LOCATION, GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, EXTRACT_SUMMARY_MODEL, CONTEXT_SHEET_TILE_PX,
+)
+from image_source_benchmark import context_paths, payload_size
+
+MODES = ["pages", "sheet"]
+
+
+def run_page(storage: GCSStorageClient, client: genai.Client, gcs_path: str,
+             context: Dict[str, List[bytes]], mode: str) -> Dict:
+    bucket = storage.target_bucket
+    mime_type = mime_type_for(gcs_path)
+    target = storage.download_bytes(gcs_path, bucket)
+    context_images = context[mode]
+    context_mime_type = CONTEXT_SHEET_MIME_TYPE if mode == "sheet" else mime_type
+
+    contents, config, _ = build_summary_request(target, context_images, gcs_path, mime_type, context_mime_type)
+    started = time.perf_counter()
+    error, text, tokens = None, "", 0
+    try:
+        result = client.models.generate_content(model=EXTRACT_SUMMARY_MODEL, contents=contents, config=config)
+        text = result.text or ""
+        tokens = (result.usage_metadata.prompt_token_count or 0) if result.usage_metadata else 0
+    except Exception as e:
+        error = str(e)
+
+    return {
+        "context_bytes": sum(len(image) for image in context_images),
+        "payload": payload_size(contents),
+        "tokens": tokens,
+        "time": time.perf_counter() - started,
+        "error": error,
+        "summary": text,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", nargs="*", default=[], help="처리 버킷의 페이지 이미지 경로")
+    parser.add_argument("--prefix", default=None, help="처리 버킷 prefix (--paths 대신)")
+    parser.add_argument("--limit", type=int, default=20, help="--prefix 사용 시 최대 페이지 수")
+    parser.add_argument("--tile-px", type=int, default=CONTEXT_SHEET_TILE_PX, help="contact sheet 페이지 타일 긴 변 (px)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--show", action="store_true", help="페이지별 요약 출력 (품질 비교용)")
+    args = parser.parse_args()
+
+    storage = GCSStorageClient(GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, create_storage_client())
+    client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+
+    paths = list(args.paths)
+    if args.prefix is not None:
+        paths += [p for p in storage.list_paths(args.prefix, storage.target_bucket) if "-page-" in p][:args.limit]
+    if not paths:
+        parser.error("--paths 또는 --prefix 필요")
+
+    # 문서별 컨텍스트 (같은 문서의 페이지는 한 번만 다운로드/생성)
+    contexts: Dict[str, Dict[str, List[bytes]]] = {}
+    sheet_times = []
+    for path in paths:
+        first_pages = tuple(context_paths(path, CONTEXT_PAGES))
+        if first_pages[0] in contexts:
+            continue
+        pages = [storage.download_bytes(p, storage.target_bucket) for p in first_pages]
+        started = time.perf_counter()
+        sheet = build_context_sheet_from_bytes(pages, args.tile_px)
+        sheet_times.append(time.perf_counter() - started)
+        contexts[first_pages[0]] = {"pages": pages, "sheet": [sheet]}
+
+    print(f"contact sheet: {len(contexts)} documents, {statistics.mean(sheet_times) * 1000:.0f} ms/document (tile {args.tile_px}px)")
+    print(f"{'mode':>6} {'pages':>6} {'errors':>7} {'context KB':>11} {'request KB':>11} "
+          f"{'input tokens':>13} {'p50 ms':>8} {'p95 ms':>8}")
+    summaries: Dict[str, List[str]] = {}
+    for mode in args.modes:
+        results = [run_page(storage, client, path, contexts[context_paths(path, 1)[0]], mode) for path in paths]
+        pages = len(results)
+        latencies = sorted(r["time"] * 1000 for r in results)
+        p95 = latencies[min(pages - 1, int(pages * 0.95))]
+        print(
+            f"{mode:>6} {pages:>6} {sum(1 for r in results if r['error']):>7} "
+            f"{sum(r['context_bytes'] for r in results) / pages / 1024:>11.1f} "
+            f"{sum(r['payload'] for r in results) / pages / 1024:>11.1f} "
+            f"{sum(r['tokens'] for r in results) / pages:>13.0f} "
+            f"{statistics.median(latencies):>8.0f} {p95:>8.0f}"
+        )
+        for r in results:
+            if r["error"]:
+                print(f"  {mode} 오류: {r['error']}")
+        summaries[mode] = [r["summary"] for r in results]
+
+    if args.show:
+        for i, path in enumerate(paths):
+            print(f"\n## {path}")
+            for mode in args.modes:
+                print(f"[{mode}] {summaries[mode][i]}")
+
+
+if __name__ == "__main__":
+    main()
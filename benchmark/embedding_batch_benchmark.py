@@ -0,0 +1,67 @@
+"""
+임베딩 벤치마크: 페이지마다 요청 vs 여러 텍스트를 한 요청으로 (get_text_embeddings)
+
+텍스트 파일(빈 줄 2개로 페이지 구분) 또는 임의 텍스트로 순차 실행해서 요청 수, 전체 시간, 페이지당 시간을 비교
+묶음 크기/토큰 상한은 EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS와 같은 규칙 (batch_texts)
+
+    python benchmark/embedding_batch_benchmark.py --pages 200
+    python benchmark/embedding_batch_benchmark.py --file pages.txt --batch-sizes 1 25 100
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+from google import genai
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from processor.embedder import batch_texts, get_text_embedding, get_text_embeddings
+from config import PROJECT_ID, GENAI_LOCATION, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS
+
+WORDS = ["circuit", "breaker", "rated", "voltage", "current", "test", "insulation", "IEC", "62271", "switching",
+         "차단기", "정격", "전압", "시험", "절연"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=None, help="페이지 텍스트 파일 (빈 줄 2개로 구분)")
+    parser.add_argument("--pages", type=int, default=200, help="--file이 없을 때 만들 임의 텍스트 수")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, EMBEDDING_BATCH_SIZE])
+    parser.add_argument("--max-tokens", type=int, default=EMBEDDING_BATCH_MAX_TOKENS)
+    args = parser.parse_args()
+
+    if args.file is not None:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [t.strip() for t in f.read().split("\n\n\n") if t.strip()]
+    else:
+        rng = random.Random(0)
+        texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 600))) for _ in range(args.pages)]
+
+    client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+    print(f"model: {EMBEDDING_MODEL}, pages: {len(texts)}, chars/page: {sum(len(t) for t in texts) / len(texts):.0f}")
+    print(f"{'batch size':>11} {'requests':>9} {'errors':>7} {'total s':>8} {'ms/page':>8}")
+    for batch_size in args.batch_sizes:
+        batches = batch_texts(texts, batch_size, args.max_tokens)
+        errors = 0
+        started = time.perf_counter()
+        for batch in batches:
+            try:
+                if batch_size == 1:
+                    get_text_embedding(texts[batch[0]], client)
+                else:
+                    get_text_embeddings([texts[i] for i in batch], client)
+            except Exception as e:
+                errors += 1
+                print(f"  오류 ({len(batch)} texts): {e}")
+        elapsed = time.perf_counter() - started
+        print(f"{batch_size:>11} {len(batches):>9} {errors:>7} {elapsed:>8.1f} {elapsed * 1000 / len(texts):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+페이지 이미지 인코딩 프로파일 벤치마크 (로컬 샘플 PDF)
+
+프로파일별로 샘플 PDF를 래스터화/인코딩해서 페이지당 바이트, 래스터화/인코딩 시간을 비교
+--ocr 옵션을 주면 Gemini OCR 결과를 기존 출력(png 프로파일)과 비교 (글자 수 차이, 유사도)
+
+    python benchmark/encoding_benchmark.py samples/*.pdf --max-pages 10
+    python benchmark/encoding_benchmark.py samples/*.pdf --profiles png webp png_gray_200dpi --ocr
+"""
+import os
+import sys
+import time
+import argparse
+import difflib
+from typing import Dict, List
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from processor.image_encoding import ENCODING_PROFILES, EncodingProfile
+from processor.extractor import extract_text
+
+BASELINE = "png"
+
+
+def encode_samples(pdf_paths: List[str], profile: EncodingProfile, max_pages: int) -> Dict:
+    """프로파일 하나로 샘플 전체 인코딩 → {"images": {(pdf, page): bytes}, "render": s, "encode": s}"""
+    images, render_time, encode_time = {}, 0.0, 0.0
+    for pdf_path in pdf_paths:
+        page_count = min(pdfinfo_from_path(pdf_path)["Pages"], max_pages)
+        for page_number in range(1, page_count + 1):
+            started = time.perf_counter()
+            image = convert_from_path(
+                pdf_path, dpi=profile.dpi, first_page=page_number, last_page=page_number, grayscale=profile.grayscale
+            )[0]
+            render_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            images[(pdf_path, page_number)] = profile.encode(image)
+            encode_time += time.perf_counter() - started
+            image.close()
+
+    return {"images": images, "render": render_time, "encode": encode_time}
+
+
+def run_ocr(images: Dict, profile: EncodingProfile, client) -> Dict:
+    texts = {}
+    for key, image_bytes in images.items():
+        text, error = extract_text(image_bytes, client, mime_type=profile.mime_type)
+        if error:
+            print(f"  OCR 실패 ({profile.name}, {key}): {error}")
+        texts[key] = text or ""
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="+", help="샘플 PDF 경로")
+    parser.add_argument("--profiles", nargs="+", default=list(ENCODING_PROFILES), choices=list(ENCODING_PROFILES))
+    parser.add_argument("--max-pages", type=int, default=10, help="PDF당 최대 페이지 수")
+    parser.add_argument("--ocr", action="store_true", help="Gemini OCR 결과를 png 프로파일과 비교")
+    args = parser.parse_args()
+
+    profiles = [ENCODING_PROFILES[name] for name in args.profiles]
+    if args.ocr and BASELINE not in args.profiles:
+        profiles.insert(0, ENCODING_PROFILES[BASELINE])
+
+    client = None
+    if args.ocr:
+        from google import genai
+        from config import PROJECT_ID, GENAI_LOCATION
+        client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+
+    results = {}
+    for profile in profiles:
+        results[profile.name] = encode_samples(args.pdfs, profile, args.max_pages)
+        if args.ocr:
+            results[profile.name]["texts"] = run_ocr(results[profile.name]["images"], profile, client)
+
+    header = f"{'profile':>16} {'pages':>6} {'KB/page':>9} {'vs png':>8} {'render ms':>10} {'encode ms':>10}"
+    if args.ocr:
+        header += f" {'OCR chars Δ':>12} {'similarity':>11}"
+    print(header)
+
+    baseline = results.get(BASELINE)
+    for profile in profiles:
+        result = results[profile.name]
+        pages = len(result["images"])
+        total_bytes = sum(len(b) for b in result["images"].values())
+        kb_per_page = total_bytes / pages / 1024 if pages else 0
+
+        line = f"{profile.name:>16} {pages:>6} {kb_per_page:>9.1f}"
+        if baseline:
+            baseline_bytes = sum(len(b) for b in baseline["images"].values())
+            line += f" {total_bytes / baseline_bytes * 100 if baseline_bytes else 0:>7.0f}%"
+        else:
+            line += f" {'-':>8}"
+        line += f" {result['render'] / pages * 1000 if pages else 0:>10.1f} {result['encode'] / pages * 1000 if pages else 0:>10.1f}"
+
+        if args.ocr:
+            base_texts, texts = baseline["texts"], result["texts"]
+            base_chars = sum(len(t) for t in base_texts.values())
+            chars = sum(len(t) for t in texts.values())
+            similarity = sum(
+                difflib.SequenceMatcher(None, base_texts[key], texts[key]).ratio() for key in texts
+            ) / len(texts) if texts else 0
+            line += f" {(chars - base_chars) / base_chars * 100 if base_chars else 0:>+11.1f}% {similarity:>11.3f}"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+텍스트 추출 + 요약 벤치마크: 2회 호출(OCR 요청, 요약 요청) vs 결합 요청 1회(JSON 응답)
+
+처리 버킷의 페이지 이미지로 두 방식을 실행해서 페이지당 지연 시간, 입력/출력 토큰, 요청 페이로드를 비교
+결합 요청의 추출 텍스트가 OCR 요청 결과와 얼마나 같은지(difflib ratio)도 출력 (결과 캐시 미사용, 이미지는 inline bytes)
+
+    python benchmark/fused_benchmark.py --prefix "2. Type Test Reports/300SR/" --limit 20
+    python benchmark/fused_benchmark.py --paths a/a-page-00007.png --context sheet --show
+"""
+import os
+import sys
+import time
+import difflib
+import argparse
+import statistics
+from typing import Dict, List
+
+from google import genai
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from storage.gcs_client import GCSStorageClient, create_storage_client
+from processor.extractor import FusedResult, build_text_request, build_summary_request, build_fused_request
+from processor.context_sheet import CONTEXT_PAGES, CONTEXT_SHEET_MIME_TYPE, build_context_sheet_from_bytes
+from processor.image_encoding import mime_type_for
+from config import (
+    PROJECT_ID, GENAI_LOCATION, GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET,
+    EXTRACT_TEXT_MODEL, EXTRACT_SUMMARY_MODEL, EXTRACT_FUSED_MODEL, CONTEXT_SHEET_TILE_PX,
+)
+from image_source_benchmark import context_paths, payload_size
+
+MODES = ["two-call", "fused"]
+
+
+def call(client: genai.Client, model: str, contents: list, config) -> Dict:
+    started = time.perf_counter()
+    result = client.models.generate_content(model=model, contents=contents, config=config)
+    usage = result.usage_metadata
+    return {
+        "text": result.text or "",
+        "time": time.perf_counter() - started,
+        "input_tokens": (usage.prompt_token_count or 0) if usage else 0,
+        "output_tokens": (usage.candidates_token_count or 0) if usage else 0,
+        "payload": payload_size(contents),
+    }
+
+
+def run_page(client: genai.Client, target: bytes, gcs_path: str, context_images: List[bytes],
+             context_mime_type: str, mode: str) -> Dict:
+    mime_type = mime_type_for(gcs_path)
+    try:
+        if mode == "two-call":
+            contents, config, _ = build_text_request(target, mime_type)
+            ocr = call(client, EXTRACT_TEXT_MODEL, contents, config)
+            contents, config, _ = build_summary_request(target, context_images, gcs_path, mime_type, context_mime_type)
+            summary = call(client, EXTRACT_SUMMARY_MODEL, contents, config)
+            calls = [ocr, summary]
+            text, summary_text = ocr["text"], summary["text"]
+        else:
+            contents, config, _ = build_fused_request(target, context_images, gcs_path, mime_type, context_mime_type)
+            fused = call(client, EXTRACT_FUSED_MODEL, contents, config)
+            calls = [fused]
+            parsed = FusedResult.model_validate_json(fused["text"])
+            text, summary_text = parsed.extracted_text, parsed.summary
+    except Exception as e:
+        return {"error": str(e)}
+
+    return {
+        "error": None,
+        "time": sum(c["time"] for c in calls),
+        "input_tokens": sum(c["input_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+        "payload": sum(c["payload"] for c in calls),
+        "text": text,
+        "summary": summary_text,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", nargs="*", default=[], help="처리 버킷의 페이지 이미지 경로")
+    parser.add_argument("--prefix", default=None, help="처리 버킷 prefix (--paths 대신)")
+    parser.add_argument("--limit", type=int, default=20, help="--prefix 사용 시 최대 페이지 수")
+    parser.add_argument("--context", choices=["pages", "sheet"], default="pages", help="요약 컨텍스트 (앞 5페이지 / contact sheet)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--show", action="store_true", help="페이지별 요약 출력 (품질 비교용)")
+    args = parser.parse_args()
+
+    storage = GCSStorageClient(GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, create_storage_client())
+    client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+
+    paths = list(args.paths)
+    if args.prefix is not None:
+        paths += [p for p in storage.list_paths(args.prefix, storage.target_bucket) if "-page-" in p][:args.limit]
+    if not paths:
+        parser.error("--paths 또는 --prefix 필요")
+
+    # 문서별 컨텍스트는 한 번만 다운로드/생성
+    contexts: Dict[str, List[bytes]] = {}
+    for path in paths:
+        first_pages = context_paths(path, CONTEXT_PAGES)
+        if first_pages[0] not in contexts:
+            images = [storage.download_bytes(p, storage.target_bucket) for p in first_pages]
+            contexts[first_pages[0]] = [build_context_sheet_from_bytes(images, CONTEXT_SHEET_TILE_PX)] if args.context == "sheet" else images
+    targets = {path: storage.download_bytes(path, storage.target_bucket) for path in paths}
+
+    print(f"context: {args.context}, models: OCR {EXTRACT_TEXT_MODEL} / summary {EXTRACT_SUMMARY_MODEL} / fused {EXTRACT_FUSED_MODEL}")
+    print(f"{'mode':>9} {'pages':>6} {'errors':>7} {'request KB':>11} {'input tok':>10} {'output tok':>11} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'text chars':>11} {'OCR match':>10}")
+    results: Dict[str, List[Dict]] = {}
+    for mode in args.modes:
+        results[mode] = [
+            run_page(client, targets[path], path, contexts[context_paths(path, 1)[0]],
+                     CONTEXT_SHEET_MIME_TYPE if args.context == "sheet" else mime_type_for(path), mode)
+            for path in paths
+        ]
+        ok = [r for r in results[mode] if r["error"] is None]
+        if not ok:
+            print(f"{mode:>9} {len(paths):>6} {len(paths):>7}")
+            continue
+
+        # 결합 요청의 추출 텍스트 ↔ OCR 요청 결과 (같은 페이지 둘 다 성공한 경우)
+        match = ""
+        if mode == "fused" and "two-call" in results:
+            ratios = [
+                difflib.SequenceMatcher(None, base["text"], r["text"]).ratio()
+                for base, r in zip(results["two-call"], results[mode]) if base["error"] is None and r["error"] is None
+            ]
+            match = f"{statistics.mean(ratios):.3f}" if ratios else ""
+
+        latencies = sorted(r["time"] * 1000 for r in ok)
+        p95 = latencies[min(len(ok) - 1, int(len(ok) * 0.95))]
+        print(
+            f"{mode:>9} {len(paths):>6} {len(paths) - len(ok):>7} "
+            f"{sum(r['payload'] for r in ok) / len(ok) / 1024:>11.1f} "
+            f"{sum(r['input_tokens'] for r in ok) / len(ok):>10.0f} "
+            f"{sum(r['output_tokens'] for r in ok) / len(ok):>11.0f} "
+            f"{statistics.median(latencies):>8.0f} {p95:>8.0f} "
+            f"{sum(len(r['text']) for r in ok) / len(ok):>11.0f} {match:>10}"
+        )
+        for r in results[mode]:
+            if r["error"]:
+                print(f"  {mode} 오류: {r['error']}")
+
+    if args.show:
+        for i, path in enumerate(paths):
+            print(f"\n## {path}")
+            for mode in args.modes:
+                print(f"[{mode}] {results[mode][i].get('summary') or results[mode][i]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Gemini 요청 이미지 전달 방식 벤치마크: inline bytes vs gs:// URI
+
+처리 버킷의 페이지 이미지로 텍스트 추출(또는 요약)을 두 방식으로 실행해서
+워커 트래픽(GCS 다운로드, Gemini 요청 페이로드)과 페이지당 지연 시간을 비교 (결과 캐시 미사용)
+
+    python benchmark/image_source_benchmark.py --prefix "1. International Standards/IEC/" --limit 20
+    python benchmark/image_source_benchmark.py --paths a/1.png a/2.png --stage summary
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from typing import Dict, List
+
+from google import genai
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from storage.gcs_client import GCSStorageClient, create_storage_client
+from processor.extractor import build_text_request, build_summary_request, extract_text, extract_summary
+from processor.image_encoding import mime_type_for
+from config import PROJECT_ID, GENAI_LOCATION, GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET
+
+MODES = ["bytes", "uri"]
+
+
+def payload_size(contents: list) -> int:
+    """Gemini 요청 contents의 JSON 크기 (inline 이미지는 base64)"""
+    return len(json.dumps([content.model_dump(mode="json", exclude_none=True) for content in contents]))
+
+
+def context_paths(gcs_path: str, n: int = 5) -> List[str]:
+    """같은 문서의 앞 n페이지 (DB 조회 없이 split 경로 규칙 사용: <pdf>-page-00001.<ext>)"""
+    prefix, rest = gcs_path.rsplit("-page-", 1)
+    extension = rest.rsplit(".", 1)[-1]
+    return [f"{prefix}-page-{i:05}.{extension}" for i in range(1, n + 1)]
+
+
+def run_page(storage: GCSStorageClient, client: genai.Client, gcs_path: str, stage: str, mode: str) -> Dict:
+    bucket = storage.target_bucket
+    mime_type = mime_type_for(gcs_path)
+    paths = [gcs_path] if stage == "extraction" else [*context_paths(gcs_path), gcs_path]
+
+    started = time.perf_counter()
+    downloaded = 0
+    if mode == "bytes":
+        images = [storage.download_bytes(path, bucket) for path in paths]
+        downloaded = sum(len(image) for image in images)
+    else:
+        images = [f"gs://{bucket}/{path}" for path in paths]
+    download_time = time.perf_counter() - started
+
+    if stage == "extraction":
+        contents, _, _ = build_text_request(images[0], mime_type)
+        text, error = extract_text(images[0], client, mime_type=mime_type)
+    else:
+        contents, _, _ = build_summary_request(images[-1], images[:-1], gcs_path, mime_type)
+        text, error = extract_summary(images[-1], images[:-1], client, file_name=gcs_path, mime_type=mime_type)
+
+    return {
+        "downloaded": downloaded,
+        "payload": payload_size(contents),
+        "download_time": download_time,
+        "total_time": time.perf_counter() - started,
+        "error": error,
+        "chars": len(text or ""),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", nargs="*", default=[], help="처리 버킷의 페이지 이미지 경로")
+    parser.add_argument("--prefix", default=None, help="처리 버킷 prefix (--paths 대신)")
+    parser.add_argument("--limit", type=int, default=20, help="--prefix 사용 시 최대 페이지 수")
+    parser.add_argument("--stage", choices=["extraction", "summary"], default="extraction")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    storage = GCSStorageClient(GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, create_storage_client())
+    client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+
+    paths = list(args.paths)
+    if args.prefix is not None:
+        paths += [p for p in storage.list_paths(args.prefix, storage.target_bucket) if not p.endswith("/")][:args.limit]
+    if not paths:
+        parser.error("--paths 또는 --prefix 필요")
+
+    print(f"{'mode':>6} {'pages':>6} {'errors':>7} {'GCS KB/page':>12} {'request KB/page':>16} "
+          f"{'download ms':>12} {'p50 ms':>8} {'p95 ms':>8} {'chars':>8}")
+    for mode in args.modes:
+        results = [run_page(storage, client, path, args.stage, mode) for path in paths]
+        pages = len(results)
+        latencies = sorted(r["total_time"] * 1000 for r in results)
+        p95 = latencies[min(pages - 1, int(pages * 0.95))]
+        print(
+            f"{mode:>6} {pages:>6} {sum(1 for r in results if r['error']):>7} "
+            f"{sum(r['downloaded'] for r in results) / pages / 1024:>12.1f} "
+            f"{sum(r['payload'] for r in results) / pages / 1024:>16.1f} "
+            f"{sum(r['download_time'] for r in results) / pages * 1000:>12.1f} "
+            f"{statistics.median(latencies):>8.0f} {p95:>8.0f} "
+            f"{sum(r['chars'] for r in results) / pages:>8.0f}"
+        )
+        for r in results:
+            if r["error"]:
+                print(f"  {mode} 오류: {r['error']}")
+
+
+if __name__ == "__main__":
+    main()
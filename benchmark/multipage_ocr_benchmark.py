@@ -0,0 +1,128 @@
+"""
+여러 페이지 OCR 벤치마크: 페이지마다 요청 vs 연속 페이지 N장을 한 요청으로 (JSON 응답, 페이지별 Markdown)
+
+처리 버킷의 한 문서 페이지 이미지로 묶음 크기별로 실행해서 요청 수, 페이지당 시간/입력/출력 토큰,
+잘못된 응답(JSON 형식 오류, 페이지 누락) 수, 페이지별 요청 결과와의 일치도(difflib ratio)를 비교 (결과 캐시 미사용, 이미지는 inline bytes)
+페이지별 요청의 "이미지 크기 / 출력 토큰"도 출력 → OCR_BYTES_PER_TOKEN 조정용
+
+    python benchmark/multipage_ocr_benchmark.py --prefix "2. Type Test Reports/300SR/300SR/300SR-page-" --limit 12
+    python benchmark/multipage_ocr_benchmark.py --prefix "..." --group-sizes 1 4 8 --token-budget 16384
+"""
+import os
+import sys
+import time
+import difflib
+import argparse
+import statistics
+from typing import Dict, List
+
+from google import genai
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from storage.gcs_client import GCSStorageClient, create_storage_client
+from processor.extractor import MultiPageResult, build_text_request, build_multi_text_request
+from processor.image_encoding import mime_type_for
+from config import (
+    PROJECT_ID, GENAI_LOCATION, GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, EXTRACT_TEXT_MODEL, OCR_GROUP_TOKEN_BUDGET,
+)
+from image_source_benchmark import payload_size
+
+
+def call(client: genai.Client, contents: list, config) -> Dict:
+    started = time.perf_counter()
+    result = client.models.generate_content(model=EXTRACT_TEXT_MODEL, contents=contents, config=config)
+    usage = result.usage_metadata
+    return {
+        "text": result.text or "",
+        "time": time.perf_counter() - started,
+        "input_tokens": (usage.prompt_token_count or 0) if usage else 0,
+        "output_tokens": (usage.candidates_token_count or 0) if usage else 0,
+        "payload": payload_size(contents),
+    }
+
+
+def run(client: genai.Client, images: List[bytes], paths: List[str], group_size: int, token_budget: int) -> Dict:
+    """group_size장씩 순서대로 요청, 반환: 요청 목록 + 페이지별 텍스트 (잘못된 응답의 페이지는 None)"""
+    mime_type = mime_type_for(paths[0])
+    calls, texts, malformed = [], [], 0
+    for start in range(0, len(images), group_size):
+        group = images[start:start + group_size]
+        if group_size == 1:
+            contents, config, _ = build_text_request(group[0], mime_type)
+            result = call(client, contents, config)
+            texts.append(result["text"])
+        else:
+            page_numbers = list(range(start + 1, start + len(group) + 1))
+            contents, config, _ = build_multi_text_request(group, page_numbers, mime_type, token_budget)
+            result = call(client, contents, config)
+            try:
+                by_page = MultiPageResult.model_validate_json(result["text"]).by_page(page_numbers)
+                texts += [by_page[n] for n in page_numbers]
+            except ValueError:
+                malformed += 1
+                texts += [None] * len(group)
+        calls.append(result)
+    return {"calls": calls, "texts": texts, "malformed": malformed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prefix", required=True, help="한 문서의 페이지 이미지 prefix (처리 버킷, 예: <폴더>/<이름>-page-)")
+    parser.add_argument("--limit", type=int, default=12, help="앞에서부터 사용할 페이지 수")
+    parser.add_argument("--group-sizes", nargs="+", type=int, default=[1, 3, 5], help="요청당 페이지 수 (1 = 페이지마다 요청)")
+    parser.add_argument("--token-budget", type=int, default=OCR_GROUP_TOKEN_BUDGET, help="여러 페이지 요청의 max_output_tokens")
+    args = parser.parse_args()
+
+    storage = GCSStorageClient(GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, create_storage_client())
+    client = genai.Client(vertexai=True, project=PROJECT_ID, location=GENAI_LOCATION)
+
+    paths = sorted(p for p in storage.list_paths(args.prefix, storage.target_bucket) if "-page-" in p)[:args.limit]
+    if not paths:
+        parser.error(f"페이지 이미지 없음: {args.prefix}")
+    images = [storage.download_bytes(p, storage.target_bucket) for p in paths]
+    pages = len(paths)
+
+    print(f"model: {EXTRACT_TEXT_MODEL}, pages: {pages}, image KB/page: {sum(len(i) for i in images) / pages / 1024:.1f}")
+    print(f"{'pages/req':>10} {'requests':>9} {'malformed':>10} {'request KB':>11} {'ms/page':>8} "
+          f"{'input tok/page':>15} {'output tok/page':>16} {'match':>7}")
+    results: Dict[int, Dict] = {}
+    for group_size in args.group_sizes:
+        try:
+            results[group_size] = result = run(client, images, paths, group_size, args.token_budget)
+        except Exception as e:
+            print(f"{group_size:>10} 오류: {e}")
+            continue
+        calls = result["calls"]
+
+        # 페이지별 요청 결과와 비교 (잘못된 응답의 페이지 제외)
+        match = ""
+        if group_size != 1 and 1 in results:
+            ratios = [
+                difflib.SequenceMatcher(None, base, text).ratio()
+                for base, text in zip(results[1]["texts"], result["texts"]) if text is not None
+            ]
+            match = f"{statistics.mean(ratios):.3f}" if ratios else ""
+
+        print(
+            f"{group_size:>10} {len(calls):>9} {result['malformed']:>10} "
+            f"{sum(c['payload'] for c in calls) / len(calls) / 1024:>11.1f} "
+            f"{sum(c['time'] for c in calls) * 1000 / pages:>8.0f} "
+            f"{sum(c['input_tokens'] for c in calls) / pages:>15.0f} "
+            f"{sum(c['output_tokens'] for c in calls) / pages:>16.0f} {match:>7}"
+        )
+
+    if 1 in results:
+        # OCR_BYTES_PER_TOKEN 조정용: 페이지 이미지 크기 / 출력 토큰 (출력이 거의 없는 페이지 제외)
+        ratios = [len(image) / c["output_tokens"] for image, c in zip(images, results[1]["calls"]) if c["output_tokens"] >= 50]
+        if ratios:
+            print(f"\nimage bytes per output token (per-page requests): median {statistics.median(ratios):.0f}, "
+                  f"min {min(ratios):.0f}, max {max(ratios):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+ChangeDetector 버킷 스캔 처리량 벤치마크 (로컬 가짜 버킷)
+
+GCS 대신 메모리 상의 가짜 버킷을 사용하고, ranged read 한 번마다 네트워크 지연(latency)을 흉내냄
+워커 수(1/4/16/64)별로 scan_current_files 처리량을 비교
+
+    python benchmark/scan_benchmark.py --files 200 --size-mb 4 --latency-ms 40
+    (읽기 단위는 HASH_CHUNK_SIZE 환경변수로 조정)
+"""
+import os
+import sys
+import io
+import time
+import logging
+import argparse
+from typing import Dict, Iterator, List
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_PATH)
+
+# config.py import 시 필요한 값 (DB 연결은 하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+from storage.gcs_client import BlobMetadata
+from sync.change_detector import ChangeDetector
+
+
+class _SlowReader(io.RawIOBase):
+    """read 호출(= ranged GET) 마다 latency 만큼 대기하는 스트림"""
+    def __init__(self, data: bytes, latency: float) -> None:
+        self._stream = io.BytesIO(data)
+        self._latency = latency
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        time.sleep(self._latency)
+        return self._stream.read(size)
+
+
+class FakeBucketStorage:
+    """GCSStorageClient 중 ChangeDetector가 사용하는 부분만 흉내낸 가짜 버킷"""
+    def __init__(self, files: int, size_mb: float, latency: float) -> None:
+        self.source_bucket = "fake-source-bucket"
+        self.target_bucket = "fake-processed-bucket"
+        self.latency = latency
+        self.data = os.urandom(int(size_mb * 1024 * 1024))  # 모든 객체가 같은 내용 (doc_id는 경로로 구분됨)
+        self.blobs = [
+            BlobMetadata(name=f"bench/doc-{i:05d}.pdf", size=len(self.data), generation=i + 1)
+            for i in range(files)
+        ]
+
+    def list_pdf_blobs(self, prefix: str = "") -> List[BlobMetadata]:
+        return list(self.iter_pdf_blobs(prefix))
+
+    def iter_pdf_blobs(self, prefix: str = "", page_size: int = 100) -> Iterator[BlobMetadata]:
+        # 목록 페이지마다 지연 → 해시 계산이 목록 조회와 겹치는지 확인 가능
+        for i, blob in enumerate(self.blobs):
+            if i % page_size == 0:
+                time.sleep(self.latency)
+            yield blob
+
+    def open_stream(self, gcs_path: str, bucket_name: str, chunk_size=None, generation=None):
+        return _SlowReader(self.data, self.latency)
+
+
+class FakeRepository:
+    def get_documents_by_path(self) -> Dict:
+        return {}
+
+    def update_document_metadata(self, doc_id, blob) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    logging.getLogger("sync.change_detector").setLevel(logging.WARNING)
+
+    storage = FakeBucketStorage(args.files, args.size_mb, args.latency_ms / 1000)
+    total_mb = args.files * len(storage.data) / 1024 ** 2
+
+    print(f"files={args.files} size={args.size_mb}MB latency={args.latency_ms}ms")
+    print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'MB/s':>9} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        detector = ChangeDetector(storage, FakeRepository(), mode="metadata", max_workers=workers)
+        started = time.perf_counter()
+        result = detector.scan_current_files()
+        elapsed = time.perf_counter() - started
+        assert len(result) == args.files
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {args.files / elapsed:>9.1f} {total_mb / elapsed:>9.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
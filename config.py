@@ -28,6 +28,8 @@ MYSQL_DB: str = os.getenv("MYSQL_DB")
 TABLENAME_PDFPAGES: str = "hdegis_pdf_pages"
 TABLENAME_PDFDOCUMENTS: str = "hdegis_pdf_documents"
 TABLENAME_PIPELINE: str = "hdegis_pipeline_status"
+TABLENAME_MODEL_CACHE: str = "hdegis_model_result_cache"
+TABLENAME_MODEL_CALLS: str = "hdegis_model_calls"
 
 # Elastic
 ES_HOST: str = os.getenv("ES_HOST")
@@ -41,4 +43,96 @@ INDEX_NAME: str = f"hdegis-{EMBEDDING_MODEL}"
 LOG_LEVEL: str = "DEBUG"
 
 # Data Source
-LOCAL_DATA_DIR = 'data/'
\ No newline at end of file
+LOCAL_DATA_DIR = 'data/'
+
+# Change Detection
+# metadata : GCS 객체 메타데이터(generation/md5/crc32c/size)가 DB와 일치하면 다운로드 생략
+# hash     : DB 메타데이터 비교 없이 모든 PDF 해시 계산 (기존 방식, HashCache 적중 시 제외)
+CHANGE_DETECTION_MODE: str = os.getenv("CHANGE_DETECTION_MODE", "metadata")
+
+# 해시 계산 시 GCS 스트리밍 읽기 단위 (bytes)
+HASH_CHUNK_SIZE: int = int(os.getenv("HASH_CHUNK_SIZE", 8 * 1024 * 1024))
+
+# 해시 캐시: (bucket, name, generation, size) → (doc_id, content_hash)
+# LOCAL_DATA_DIR은 GCS와 rsync 되므로 별도 경로 사용
+HASH_CACHE_PATH: str = os.getenv("HASH_CACHE_PATH", ".cache/hash_cache.sqlite3")
+HASH_CACHE_MAX_ENTRIES: int = int(os.getenv("HASH_CACHE_MAX_ENTRIES", 100000))
+
+# 버킷 스캔 동시 작업 수 (storage.Client 커넥션 풀 크기도 이 값에 맞춤)
+SCAN_MAX_WORKERS: int = int(os.getenv("SCAN_MAX_WORKERS", 16))
+
+# 최상위 prefix별 병렬 목록 조회 (목록 조회가 오래 걸리는 대형 버킷용)
+GCS_LIST_SHARDED: bool = os.getenv("GCS_LIST_SHARDED", "false").lower() == "true"
+GCS_LIST_SHARD_WORKERS: int = int(os.getenv("GCS_LIST_SHARD_WORKERS", 8))
+
+# 이벤트 기반 수집 (GCS 객체 변경 알림)
+# NOTIFICATION_SUBSCRIPTION: "projects/<project>/subscriptions/<name>" (미설정 시 LOCAL_EVENT_DIR 사용)
+NOTIFICATION_SUBSCRIPTION: str = os.getenv("NOTIFICATION_SUBSCRIPTION", "")
+LOCAL_EVENT_DIR: str = os.getenv("LOCAL_EVENT_DIR", ".cache/events/")
+EVENT_POLL_INTERVAL_SEC: int = int(os.getenv("EVENT_POLL_INTERVAL_SEC", 30))
+RECONCILE_INTERVAL_SEC: int = int(os.getenv("RECONCILE_INTERVAL_SEC", 6 * 60 * 60))  # 전체 재스캔 주기
+
+# Split: 한 번에 래스터화할 페이지 수 (300dpi 페이지 1장 ≈ 25MB → 최대 메모리 ≈ window × 25MB)
+SPLIT_PAGE_WINDOW: int = int(os.getenv("SPLIT_PAGE_WINDOW", 8))
+# 페이지 이미지 인코딩 프로파일 (processor/image_encoding.py: png, png_compressed, png_gray, webp, jpeg, png_gray_200dpi)
+SPLIT_ENCODING_PROFILE: str = os.getenv("SPLIT_ENCODING_PROFILE", "png")
+# PDF 텍스트 레이어 사용 여부 ("off": 모든 페이지 Gemini OCR, "auto": split 시 텍스트 레이어 품질 점수가 TEXT_LAYER_MIN_SCORE 이상인 페이지는 OCR 생략)
+TEXT_LAYER_MODE: str = os.getenv("TEXT_LAYER_MODE", "off")
+TEXT_LAYER_MIN_SCORE: float = float(os.getenv("TEXT_LAYER_MIN_SCORE", 0.8))
+# 유사 페이지(dHash 해밍 거리 PHASH_MAX_DISTANCE 이하)의 추출 텍스트 재사용
+# "off": 사용 안 함, "verify": Gemini로 후보 텍스트 일치 여부만 확인 후 재사용, "reuse": 확인 없이 재사용
+PHASH_REUSE_MODE: str = os.getenv("PHASH_REUSE_MODE", "off")
+PHASH_MAX_DISTANCE: int = int(os.getenv("PHASH_MAX_DISTANCE", 8))  # 256bit 중 (BANDS=16 미만이어야 후보 누락 없음)
+# Gemini 요청에 페이지 이미지를 넣는 방식
+# "bytes": 처리 버킷에서 다운로드 후 inline 전송, "uri": gs:// URI 참조 (Vertex AI 서비스 에이전트에 버킷 읽기 권한 필요, 실패 시 bytes로 재시도)
+GENAI_IMAGE_SOURCE: str = os.getenv("GENAI_IMAGE_SOURCE", "bytes")
+# 요약 컨텍스트(문서 첫 5페이지) 캐시: 문서별로 한 번만 조회/다운로드, 프로세스 내 LRU 메모리 상한
+CONTEXT_CACHE_MAX_MB: int = int(os.getenv("CONTEXT_CACHE_MAX_MB", 256))
+# 요약 컨텍스트 형태
+# "pages": 앞 5페이지 원본 이미지, "sheet": 앞 5페이지를 축소해서 합친 contact sheet 1장 (split 시 생성, 없으면 요약 시 생성)
+# "synopsis": 문서당 한 번 생성한 synopsis(텍스트)만 전달 → 페이지 요약은 이미지 1장 요청 (synopsis 생성 실패 시 "pages")
+SUMMARY_CONTEXT_MODE: str = os.getenv("SUMMARY_CONTEXT_MODE", "pages")
+CONTEXT_SHEET_DPI: int = int(os.getenv("CONTEXT_SHEET_DPI", 96))  # split 시 contact sheet용 래스터화 해상도
+CONTEXT_SHEET_TILE_PX: int = int(os.getenv("CONTEXT_SHEET_TILE_PX", 640))  # 페이지 타일 긴 변 (px)
+# 텍스트 추출 + 요약을 Gemini 한 번 호출(JSON 응답)로 수행 (3단계에서 summary도 저장, 배치 모드에서는 사용하지 않음)
+FUSED_OCR_SUMMARY: bool = os.getenv("FUSED_OCR_SUMMARY", "false").lower() == "true"
+EXTRACT_FUSED_MODEL: str = os.getenv("EXTRACT_FUSED_MODEL", EXTRACT_TEXT_MODEL)
+# 여러 페이지 OCR: 같은 문서의 연속 페이지를 최대 OCR_PAGES_PER_REQUEST장씩 한 요청으로 묶음 (1이면 페이지마다 요청, FUSED_OCR_SUMMARY 사용 시 미적용)
+# 페이지 예상 출력 토큰(이미지 크기 / OCR_BYTES_PER_TOKEN) 합이 OCR_GROUP_TOKEN_BUDGET(응답 max_output_tokens) 이하인 페이지만 묶음
+OCR_PAGES_PER_REQUEST: int = int(os.getenv("OCR_PAGES_PER_REQUEST", 1))
+OCR_GROUP_TOKEN_BUDGET: int = int(os.getenv("OCR_GROUP_TOKEN_BUDGET", 8192))
+OCR_BYTES_PER_TOKEN: int = int(os.getenv("OCR_BYTES_PER_TOKEN", 300))  # benchmark/multipage_ocr_benchmark.py 측정값으로 조정
+# 임베딩 요청 묶음: 요청당 최대 EMBEDDING_BATCH_SIZE개 텍스트, 예상 토큰 합 EMBEDDING_BATCH_MAX_TOKENS 이하
+# (Vertex AI 텍스트 임베딩 요청 한도: 250개 / 20,000 토큰, 요청당 입력 1개만 받는 모델은 EMBEDDING_BATCH_SIZE=1)
+EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", 100))
+EMBEDDING_BATCH_MAX_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 18000))
+
+# Split 엔진: 래스터화/PNG 인코딩 프로세스 수 (1이면 엔진 미사용 → 순차 처리)
+# 최대 메모리 ≈ SPLIT_PROCESSES × SPLIT_PAGE_WINDOW × 25MB
+SPLIT_PROCESSES: int = int(os.getenv("SPLIT_PROCESSES", os.cpu_count() or 1))
+SPLIT_UPLOAD_WORKERS: int = int(os.getenv("SPLIT_UPLOAD_WORKERS", 8))
+SPLIT_MAX_BUFFERED_PAGES: int = int(os.getenv("SPLIT_MAX_BUFFERED_PAGES", 64))  # 업로드 대기 페이지 상한
+
+# Gemini OCR/요약 결과 캐시 (이미지 digest + 프롬프트 + 모델 + 생성 설정 기준, MySQL 테이블)
+RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL_DAYS: int = int(os.getenv("RESULT_CACHE_TTL_DAYS", 180))  # 마지막 사용 후 보관 기간
+RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 500000))
+
+# Gemini/임베딩 호출 기록 (모델, 입력/출력 토큰, 이미지 수, 요청 크기, 지연 시간, quota 재시도 수)
+# "db": TABLENAME_MODEL_CALLS 테이블, "file": MODEL_CALL_LOG_PATH에 JSONL로 추가, "off": 호출별 기록 안 함 (단계별 집계는 항상 PipelineStatus에 저장)
+MODEL_CALL_LOG: str = os.getenv("MODEL_CALL_LOG", "db")
+MODEL_CALL_LOG_PATH: str = os.getenv("MODEL_CALL_LOG_PATH", "model_calls.jsonl")
+
+# Gemini 호출 asyncio 엔진 (단계 3~5)
+ASYNC_MAX_CONCURRENCY: int = int(os.getenv("ASYNC_MAX_CONCURRENCY", 16))  # 모델별 동시 요청 상한 (AIMD로 1 ~ 이 값 사이에서 조정)
+# 모델별 분당 요청 상한 (token bucket), "모델명=RPM,모델명=RPM" (미지정 모델은 ASYNC_DEFAULT_RPM)
+ASYNC_MODEL_RPM: str = os.getenv("ASYNC_MODEL_RPM", "")
+ASYNC_DEFAULT_RPM: float = float(os.getenv("ASYNC_DEFAULT_RPM", 300))
+ASYNC_LATENCY_TARGET_SEC: float = float(os.getenv("ASYNC_LATENCY_TARGET_SEC", 60))  # 응답이 이보다 느리면 동시 요청 수 감소
+ASYNC_MAX_QUOTA_RETRIES: int = int(os.getenv("ASYNC_MAX_QUOTA_RETRIES", 5))  # quota 오류(429) 시 다시 큐에 넣는 최대 횟수
+
+# 배치 예측 모드 (백필용): 3~4단계에서 온라인 호출 대신 JSONL 배치 작업 제출, 다음 실행에서 끝난 작업 결과 반영
+BATCH_MODE: bool = os.getenv("BATCH_MODE", "false").lower() == "true"
+BATCH_BACKEND: str = os.getenv("BATCH_BACKEND", "vertex")  # "vertex": Vertex AI 배치 예측, "local": 로컬 디렉터리 (테스트용)
+BATCH_GCS_PREFIX: str = os.getenv("BATCH_GCS_PREFIX", "batch/")  # 처리 버킷 내 요청/결과 JSONL + 작업 manifest 경로
+BATCH_LOCAL_DIR: str = os.getenv("BATCH_LOCAL_DIR", ".cache/batch/")  # local 백엔드 작업 디렉터리
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import sys
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
@@ -30,6 +31,23 @@ def print_table_infos():
                   f"{' DEFAULT ' + str(default) if default is not None else ''}")
     return tables
 
+def add_missing_columns():
+    """ORM 모델에는 있지만 DB 테이블에는 없는 컬럼을 ALTER TABLE로 추가 (컬럼 추가만 지원)"""
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                logger.info(f" └── Added column {table.name}.{column.name}")
+
 def initialize_tables():
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
@@ -41,6 +59,9 @@ def initialize_tables():
         logger.info(" └── Created tables!")
     else:
         logger.info(" └── Already exists all tables")
+        # 기준 테이블이 있어도 이후 추가된 테이블/컬럼은 반영
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns()
     
     # print_table_infos()
 
@@ -3,11 +3,11 @@ from datetime import datetime
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, BigInteger, Integer
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, BigInteger, Integer, Float
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.sql import func
 
-from config import TABLENAME_PDFPAGES, TABLENAME_PDFDOCUMENTS, TABLENAME_PIPELINE
+from config import TABLENAME_PDFPAGES, TABLENAME_PDFDOCUMENTS, TABLENAME_PIPELINE, TABLENAME_MODEL_CACHE, TABLENAME_MODEL_CALLS
 
 
 # 모든 ORM 모델의 기본이 되는 클래스를 정의
@@ -30,6 +30,11 @@ class PageStatus(enum.Enum):
     SUCCESS = "SUCCESS"  # 처리 완료
     FAILED = "FAILED"  # 처리 실패
 
+class TextSource(enum.Enum):
+    TEXT_LAYER = "text_layer"  # PDF 텍스트 레이어 (Gemini 호출 없음)
+    GEMINI = "gemini"  # Gemini OCR
+    REUSED = "reused"  # 유사 페이지(dHash)의 추출 텍스트 재사용 (reused_from)
+
 
 class PipelineStatus(Base):
     __tablename__ = TABLENAME_PIPELINE
@@ -43,6 +48,11 @@ class PipelineStatus(Base):
     processed_documents: int = Column(Integer, default=0)
     error_message: str = Column(Text, nullable=True)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    # 모델 호출 집계 (실행 전체 + 단계별 JSON, processor/call_log.py)
+    model_calls: int = Column(Integer, default=0)
+    input_tokens: int = Column(BigInteger, default=0)
+    output_tokens: int = Column(BigInteger, default=0)
+    stage_usage: str = Column(Text, nullable=True)
 
 
 class PDFDocument(Base):
@@ -56,6 +66,18 @@ class PDFDocument(Base):
     status: str = Column(Enum(DocumentStatus), default=DocumentStatus.ACTIVE)
     updated_at: datetime = Column(DateTime, default=func.now(), onupdate=func.now())
     content_hash: str = Column(String(128), nullable=False)
+    # GCS 객체 메타데이터 (다운로드 없이 변경 여부 판단용)
+    generation: int = Column(BigInteger, nullable=True)
+    md5_hash: str = Column(String(32), nullable=True)
+    crc32c: str = Column(String(16), nullable=True)
+    # split 진행 상태 (NULL: split 상태 관리 이전에 등록된 문서 → 완료로 간주)
+    page_count: int = Column(Integer, nullable=True)
+    split_status: PageStatus = Column(Enum(PageStatus), nullable=True, default=PageStatus.PENDING)
+    # 요약 컨텍스트용 앞 페이지 contact sheet (처리 버킷 경로, NULL: 아직 생성 전)
+    context_image_path: str = Column(String(1000), nullable=True)
+    # 문서 synopsis (SUMMARY_CONTEXT_MODE=synopsis에서 페이지 요약의 텍스트 컨텍스트, NULL 상태: 아직 생성 전)
+    synopsis: str = Column(LONGTEXT, nullable=True)
+    synopsis_status: PageStatus = Column(Enum(PageStatus), nullable=True, default=PageStatus.PENDING)
 
     pages = relationship("PDFPage", back_populates="document", cascade="all, delete-orphan")
     # back_populates="document"     : document.pages로 페이지 접근 가능, page.document로 해당 페이지가 속한 문서 확인가능
@@ -81,5 +103,45 @@ class PDFPage(Base):
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     updated_at: datetime = Column(DateTime, default=func.now(), onupdate=func.now())
     status: str = Column(Enum(DocumentStatus), default=DocumentStatus.ACTIVE)
+    encoding_profile: str = Column(String(32), nullable=True)  # split 시 사용한 이미지 인코딩 프로파일 (NULL: 기존 png)
+    # extracted_text 출처 (VARCHAR로 저장 → 값 추가 시 스키마 변경 불필요)
+    text_source: TextSource = Column(Enum(TextSource, native_enum=False, length=16), nullable=True)
+    text_layer_score: float = Column(Float, nullable=True)  # 텍스트 레이어 품질 점수 (0~1)
+    phash: str = Column(String(64), nullable=True)  # 페이지 이미지 dHash (256bit hex)
+    reused_from: str = Column(String(128), nullable=True)  # text_source=reused 일 때 원본 page_id
     
-    document = relationship("PDFDocument", back_populates="pages")
\ No newline at end of file
+    document = relationship("PDFDocument", back_populates="pages")
+
+
+class ModelResultCache(Base):
+    __tablename__ = TABLENAME_MODEL_CACHE
+
+    cache_key: str = Column(String(64), primary_key=True)  # sha256(image_digest, prompt_digest, model, config_digest)
+    image_digest: str = Column(String(255), nullable=False)  # 이미지별 base64 md5 (GCS md5Hash와 같은 형식), 여러 장이면 ','로 연결
+    prompt_digest: str = Column(String(64), nullable=False)
+    model: str = Column(String(100), nullable=False)
+    config_digest: str = Column(String(64), nullable=False)
+    result: str = Column(LONGTEXT, nullable=False)
+    hit_count: int = Column(Integer, default=0)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    last_used_at: datetime = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ModelCallLog(Base):
+    """Gemini/임베딩 호출 1회 기록 (MODEL_CALL_LOG=db)"""
+    __tablename__ = TABLENAME_MODEL_CALLS
+
+    id: int = Column(BigInteger, primary_key=True, autoincrement=True)
+    run_id: int = Column(Integer, nullable=True, index=True)  # PipelineStatus.id
+    stage: str = Column(String(50), nullable=True)  # AsyncEngine 단계 이름 ("text extraction", "summary", ...)
+    model: str = Column(String(100), nullable=False)
+    doc_id: str = Column(String(128), nullable=True)
+    page_id: str = Column(String(128), nullable=True)  # 여러 페이지 요청이면 첫 페이지
+    input_tokens: int = Column(Integer, default=0)
+    output_tokens: int = Column(Integer, default=0)  # 출력 + thinking 토큰
+    image_count: int = Column(Integer, default=0)
+    request_bytes: int = Column(BigInteger, default=0)  # 이미지 바이트 + 텍스트 (base64 인코딩 전)
+    latency_ms: int = Column(Integer, default=0)
+    retries: int = Column(Integer, default=0)  # quota 오류로 다시 큐에 넣은 횟수
+    error: str = Column(String(500), nullable=True)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
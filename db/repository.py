@@ -1,19 +1,20 @@
 import os
 import sys
-import datetime
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
-from db.models import PDFDocument, PDFPage, PageStatus, DocumentStatus, PipelineStatus, PipelineStatusEnum
-from storage.gcs_client import GCSStorageClient
+from db.models import PDFDocument, PDFPage, PageStatus, DocumentStatus, PipelineStatus, PipelineStatusEnum, TextSource
+from storage.gcs_client import GCSStorageClient, BlobMetadata
 from utils.logger import get_logger
-from config import LOG_LEVEL, TABLENAME_PDFDOCUMENTS, TABLENAME_PDFPAGES, TABLENAME_PIPELINE
+from config import LOG_LEVEL, TABLENAME_PDFDOCUMENTS, TABLENAME_PDFPAGES, TABLENAME_PIPELINE, TEXT_LAYER_MIN_SCORE
 
 class Repository:
     def __init__(self, session: Session) -> None:
@@ -33,26 +34,203 @@ class Repository:
         return self.session.query(PDFDocument).filter_by(doc_id=doc_id).first() is not None
 
 
-    def create_document(self, doc_id: str, gcs_path: str) -> PDFDocument:
-        doc = PDFDocument(doc_id=doc_id, gcs_path=gcs_path)
+    def get_document(self, doc_id: str) -> Optional[PDFDocument]:
+        return self.session.get(PDFDocument, doc_id)
+
+
+    def create_document(self, doc_id: str, gcs_path: str,
+                        content_hash: Optional[str] = None,
+                        blob: Optional[BlobMetadata] = None) -> PDFDocument:
+        doc = PDFDocument(doc_id=doc_id, gcs_path=gcs_path, content_hash=content_hash)
+        if blob is not None:
+            self._apply_blob_metadata(doc, blob)
         self.session.add(doc)
         self.session.commit()
         return doc
 
 
-    def create_page_record(self, doc_id: str, page_number:int, gcs_path: str, gcs_pdf_path: str) -> PDFPage:
+    def get_documents_by_path(self) -> Dict[str, List[PDFDocument]]:
+        """gcs_path별 문서 목록 (메타데이터 기반 변경 감지용)"""
+        docs_by_path: Dict[str, List[PDFDocument]] = {}
+        for doc in self.session.query(PDFDocument).all():
+            docs_by_path.setdefault(doc.gcs_path, []).append(doc)
+        return docs_by_path
+
+
+    def get_documents_at_path(self, gcs_path: str, active_only: bool = False) -> List[PDFDocument]:
+        """특정 gcs_path의 문서 목록 (이벤트 기반 변경 감지용)"""
+        query = self.session.query(PDFDocument).filter(PDFDocument.gcs_path == gcs_path)
+        if active_only:
+            query = query.filter(PDFDocument.status == DocumentStatus.ACTIVE)
+        return query.all()
+
+
+    def update_document_metadata(self, doc_id: str, blob: BlobMetadata):
+        """문서의 GCS 객체 메타데이터 업데이트 (기존 문서 backfill 포함)"""
+        doc = self.session.get(PDFDocument, doc_id)
+        if doc:
+            self._apply_blob_metadata(doc, blob)
+            self.session.commit()
+
+
+    @staticmethod
+    def _apply_blob_metadata(doc: PDFDocument, blob: BlobMetadata):
+        doc.generation = blob.generation
+        doc.md5_hash = blob.md5_hash
+        doc.crc32c = blob.crc32c
+        doc.file_size = blob.size
+        if blob.updated is not None:
+            # DB DateTime 컬럼은 naive UTC로 저장
+            doc.last_modified = blob.updated.replace(tzinfo=None)
+
+
+    def create_page_record(self, doc_id: str, page_number:int, gcs_path: str, gcs_pdf_path: str,
+                           encoding_profile: Optional[str] = None) -> PDFPage:
         page = PDFPage(
             page_id=f"{doc_id}_{page_number:05d}",
             doc_id=doc_id,
             page_number=f"{page_number:05d}",
             gcs_path=gcs_path,
-            gcs_pdf_path=gcs_pdf_path
+            gcs_pdf_path=gcs_pdf_path,
+            encoding_profile=encoding_profile,
         )
         self.session.add(page)
         self.session.commit()
         return page
 
 
+    def register_pages(self, doc_id: str, gcs_pdf_path: str, page_infos: Dict[int, str],
+                       encoding_profile: Optional[str] = None,
+                       text_layers: Optional[Dict[int, Tuple[str, float]]] = None,
+                       page_hashes: Optional[Dict[int, str]] = None,
+                       min_text_score: float = TEXT_LAYER_MIN_SCORE,
+                       chunk_size: int = 500) -> int:
+        """
+        split된 페이지를 트랜잭션 하나로 등록 (split 중 구간별 체크포인트로도 사용)
+        - multi-row INSERT ... ON DUPLICATE KEY UPDATE (page_id 기준 upsert → 재실행해도 안전)
+        - 충돌 시 이미지 경로/프로파일만 갱신하고 추출/요약/임베딩 결과와 상태는 유지
+        - text_layers: {page_number: (텍스트 레이어, 품질 점수)}, 점수가 min_text_score 이상인 페이지는 추출 완료로 등록 (Gemini OCR 생략)
+        - page_hashes: 페이지 이미지 dHash (유사 페이지 재사용용)
+        page_infos: {page_number: gcs_image_path}
+        반환: 등록한 페이지 수
+        """
+        text_layers = text_layers or {}
+        page_hashes = page_hashes or {}
+        page_rows = []
+        for page_number, gcs_path in sorted(page_infos.items()):
+            layer_text, layer_score = text_layers.get(page_number, (None, None))
+            use_text_layer = layer_score is not None and layer_score >= min_text_score
+            # multi-row INSERT는 모든 row의 컬럼 구성이 같아야 함
+            page_rows.append({
+                "page_id": f"{doc_id}_{page_number:05d}",
+                "doc_id": doc_id,
+                "page_number": f"{page_number:05d}",
+                "gcs_path": gcs_path,
+                "gcs_pdf_path": gcs_pdf_path,
+                "encoding_profile": encoding_profile,
+                "text_layer_score": layer_score,
+                "extracted_text": layer_text if use_text_layer else None,
+                "extracted": PageStatus.SUCCESS if use_text_layer else PageStatus.PENDING,
+                "text_source": TextSource.TEXT_LAYER if use_text_layer else None,
+                "phash": page_hashes.get(page_number),
+            })
+
+        try:
+            for start in range(0, len(page_rows), chunk_size):
+                stmt = mysql_insert(PDFPage).values(page_rows[start:start + chunk_size])
+                stmt = stmt.on_duplicate_key_update(
+                    gcs_path=stmt.inserted.gcs_path,
+                    gcs_pdf_path=stmt.inserted.gcs_pdf_path,
+                    encoding_profile=stmt.inserted.encoding_profile,
+                )
+                self.session.execute(stmt)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return len(page_rows)
+
+
+    def get_page_paths(self, doc_id: str) -> Dict[int, str]:
+        """이미 등록된 페이지 {page_number: gcs_image_path} (split 재개용)"""
+        rows = (
+            self.session.query(PDFPage.page_number, PDFPage.gcs_path)
+            .filter(PDFPage.doc_id == doc_id)
+            .all()
+        )
+        return {int(page_number): gcs_path for page_number, gcs_path in rows}
+
+
+    def get_phash_sources(self) -> List[tuple]:
+        """유사 페이지 재사용 원본 후보: 추출이 끝난 ACTIVE 페이지 (page_id, phash), 재사용된 페이지는 제외"""
+        return (
+            self.session.query(PDFPage.page_id, PDFPage.phash)
+            .filter(
+                PDFPage.status == DocumentStatus.ACTIVE,
+                PDFPage.extracted == PageStatus.SUCCESS,
+                PDFPage.phash.isnot(None),
+                or_(PDFPage.text_source.is_(None), PDFPage.text_source != TextSource.REUSED),
+            )
+            .all()
+        )
+
+
+    def get_documents_for_split(self) -> List[PDFDocument]:
+        """split이 끝나지 않은 ACTIVE 문서 (신규 + 이전 실행에서 중단/실패)"""
+        return (
+            self.session.query(PDFDocument)
+            .filter(
+                PDFDocument.status == DocumentStatus.ACTIVE,
+                PDFDocument.split_status.in_([PageStatus.PENDING, PageStatus.FAILED]),
+            )
+            .order_by(PDFDocument.gcs_path)
+            .all()
+        )
+
+
+    def update_split_status(self, doc_id: str, status: PageStatus, page_count: Optional[int] = None):
+        doc = self.session.get(PDFDocument, doc_id)
+        if doc:
+            doc.split_status = status
+            if page_count is not None:
+                doc.page_count = page_count
+            self.session.commit()
+
+
+    def get_documents_for_synopsis(self) -> List[PDFDocument]:
+        """synopsis가 없고(PENDING/FAILED/NULL) 요약할 페이지가 남아있는 ACTIVE 문서"""
+        pages_to_summarize = (
+            select(PDFPage.doc_id)
+            .where(PDFPage.summarized.in_([PageStatus.PENDING, PageStatus.FAILED]))
+        )
+        return (
+            self.session.query(PDFDocument)
+            .filter(
+                PDFDocument.status == DocumentStatus.ACTIVE,
+                or_(PDFDocument.synopsis_status.is_(None), PDFDocument.synopsis_status.in_([PageStatus.PENDING, PageStatus.FAILED])),
+                PDFDocument.doc_id.in_(pages_to_summarize),
+            )
+            .order_by(PDFDocument.gcs_path)
+            .all()
+        )
+
+
+    def update_synopsis(self, doc_id: str, synopsis: Optional[str], status: PageStatus):
+        doc = self.session.get(PDFDocument, doc_id)
+        if doc:
+            doc.synopsis = synopsis
+            doc.synopsis_status = status
+            self.session.commit()
+
+
+    def update_context_image(self, doc_id: str, context_image_path: str):
+        doc = self.session.get(PDFDocument, doc_id)
+        if doc:
+            doc.context_image_path = context_image_path
+            self.session.commit()
+
+
     def update_page_record(self, page_id: str, **kwargs):
         page = self.session.get(PDFPage, page_id)
         if page:
@@ -62,6 +240,22 @@ class Repository:
             self.session.commit()
 
 
+    def bulk_update_pages(self, mappings: List[Dict], chunk_size: int = 500) -> int:
+        """
+        여러 페이지 결과를 한 트랜잭션으로 반영 (배치 결과 반영 등)
+        mappings: [{"page_id": ..., 컬럼: 값, ...}] (키가 같은 행끼리 executemany로 묶임)
+        반환: 반영한 행 수
+        """
+        try:
+            for start in range(0, len(mappings), chunk_size):
+                self.session.bulk_update_mappings(PDFPage, mappings[start:start + chunk_size])
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(mappings)
+
+
     def get_first_n_pages(self, doc_id: str, n: int = 5) -> List[str]:
         stmt = (
             select(PDFPage.gcs_path)
@@ -86,6 +280,7 @@ class Repository:
             self.session.query(PDFPage)
             .filter(PDFPage.status == DocumentStatus.ACTIVE) # ACTIVE 문서에 대해서
             .filter(PDFPage.summarized.in_([PageStatus.PENDING, PageStatus.FAILED]))
+            .order_by(PDFPage.doc_id, PDFPage.page_number)  # 문서별로 모아서 처리 → 컨텍스트 페이지 캐시 재사용
             .all()
         )
 
@@ -149,6 +344,13 @@ class Repository:
 
 
     # === 파이프라인 상태 관리 메서드들 ===
+    def create_pipeline_run(self) -> PipelineStatus:
+        """파이프라인 실행 1회 등록 (RUNNING), 이후 update_pipeline_status(run_id=run.id)로 이 행을 갱신"""
+        run = PipelineStatus(status=PipelineStatusEnum.RUNNING, started_at=datetime.utcnow())
+        self.session.add(run)
+        self.session.commit()
+        return run
+
     def get_current_pipeline_status(self) -> str:
         """현재 파이프라인 상태 조회"""
         latest = self.session.query(PipelineStatus)\
@@ -156,11 +358,18 @@ class Repository:
                      .first()
         return latest.status.value if latest else "IDLE"
 
-    def update_pipeline_status(self, status: PipelineStatusEnum, stage: str = None, **kwargs):
-        """파이프라인 상태 업데이트"""
-        latest = self.session.query(PipelineStatus)\
-                     .order_by(PipelineStatus.id.desc())\
-                     .first()
+    def update_pipeline_status(self, status: PipelineStatusEnum, stage: str = None, run_id: Optional[int] = None, **kwargs):
+        """
+        파이프라인 상태 업데이트
+        run_id: 갱신할 실행 (create_pipeline_run()의 id), 없으면 가장 최근 실행
+        → 동시에 실행 중인 파이프라인이 서로의 행을 덮어쓰지 않도록 run_id 지정
+        """
+        if run_id is not None:
+            latest = self.session.get(PipelineStatus, run_id)
+        else:
+            latest = self.session.query(PipelineStatus)\
+                         .order_by(PipelineStatus.id.desc())\
+                         .first()
         
         if latest:
             latest.status = status
@@ -0,0 +1,252 @@
+import os
+import sys
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from google.genai import errors as genai_errors
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.call_log import set_call_context
+from utils.logger import get_logger
+from config import (
+    LOG_LEVEL,
+    ASYNC_MAX_CONCURRENCY,
+    ASYNC_MODEL_RPM,
+    ASYNC_DEFAULT_RPM,
+    ASYNC_LATENCY_TARGET_SEC,
+    ASYNC_MAX_QUOTA_RETRIES,
+)
+
+# quota 오류 후 새 요청을 보내지 않는 시간 (연속 오류마다 2배, 최대 QUOTA_BACKOFF_MAX_SEC)
+QUOTA_BACKOFF_SEC = 2.0
+QUOTA_BACKOFF_MAX_SEC = 60.0
+
+
+def is_quota_error(e: Exception) -> bool:
+    """Gemini quota 초과(429 RESOURCE_EXHAUSTED) 여부 → 실패 처리하지 않고 다시 큐에 넣음"""
+    if isinstance(e, genai_errors.APIError):
+        return e.code == 429 or e.status == "RESOURCE_EXHAUSTED"
+    return "RESOURCE_EXHAUSTED" in str(e)
+
+
+def parse_model_rpm(value: str) -> Dict[str, float]:
+    """"모델명=RPM,모델명=RPM" → {모델명: RPM}"""
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            model, rpm = item.split("=", 1)
+            limits[model.strip()] = float(rpm)
+    return limits
+
+
+class AdaptiveLimiter:
+    """
+    모델 하나의 요청 제한: token bucket(분당 요청 수) + 동시 요청 수
+    AIMD: 성공하면 동시 요청 수/요청 속도를 조금씩 늘리고, quota 오류면 절반으로 줄임
+    응답이 latency_target보다 느리면 동시 요청 수만 조금 줄임
+    """
+    def __init__(self, rpm: float, max_concurrency: int, latency_target: float) -> None:
+        self.max_rate = rpm / 60
+        self.rate = self.max_rate
+        self.tokens = 1.0
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.quota_errors = 0  # 연속 quota 오류 수
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        # 버스트는 1초 분량까지만 허용
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.paused_until and self.in_flight < int(self.concurrency) and self.tokens >= 1:
+                self.tokens -= 1
+                self.in_flight += 1
+                return
+
+            if now < self.paused_until:
+                wait = self.paused_until - now
+            elif self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+            else:
+                wait = 0.05  # 동시 요청 수 상한 → 진행 중인 요청이 끝날 때까지 대기
+            await asyncio.sleep(wait)
+
+    def release(self, latency: float, quota_error: bool = False) -> None:
+        self.in_flight -= 1
+
+        if quota_error:
+            # multiplicative decrease + 잠시 요청 중단
+            self.quota_errors += 1
+            self.concurrency = max(1.0, self.concurrency / 2)
+            self.rate = max(self.max_rate / 64, self.rate / 2)
+            self.tokens = 0.0
+            backoff = min(QUOTA_BACKOFF_MAX_SEC, QUOTA_BACKOFF_SEC * 2 ** (self.quota_errors - 1))
+            self.paused_until = max(self.paused_until, time.monotonic() + backoff)
+            return
+
+        self.quota_errors = 0
+        if latency > self.latency_target:
+            self.concurrency = max(1.0, self.concurrency * 0.9)
+        else:
+            # additive increase: 동시 요청 수는 라운드당 +1, 요청 속도는 상한의 5%씩
+            self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class RequestSlot:
+    """
+    항목 하나의 limiter 슬롯: 첫 모델 호출 직전에 획득 (processor/call_log.py), 항목이 끝나면 반환
+    결과 캐시 hit처럼 모델을 호출하지 않은 항목은 슬롯을 얻지 않음 → 요청 속도/동시 요청 수/req/s에 포함되지 않음
+    한 항목 안의 여러 호출(uri → bytes 재시도 등)은 같은 슬롯을 사용
+    """
+    def __init__(self, limiter: AdaptiveLimiter) -> None:
+        self.limiter = limiter
+        self.started: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            if self.started is None:
+                await self.limiter.acquire()
+                self.started = time.monotonic()
+
+    def release(self, quota_error: bool = False) -> bool:
+        """반환: 슬롯을 사용했는지 (모델 호출 여부)"""
+        if self.started is None:
+            return False
+        self.limiter.release(time.monotonic() - self.started, quota_error=quota_error)
+        return True
+
+
+@dataclass
+class StageStats:
+    stage: str
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    requeued: int = 0  # quota 오류로 다시 큐에 넣은 횟수
+    requests: int = 0
+    cached: int = 0  # 모델 호출 없이 끝난 항목 (결과 캐시 hit 등)
+    elapsed: float = 0.0
+
+    @property
+    def requests_per_sec(self) -> float:
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class AsyncEngine:
+    """
+    Gemini 호출 단계(텍스트 추출/요약/임베딩)를 asyncio로 동시 실행
+    - 모델별 AdaptiveLimiter로 요청 속도/동시 요청 수 제한 (슬롯은 모델 호출 직전에 획득, 캐시 hit은 제한 없이 처리)
+    - quota 오류는 실패로 기록하지 않고 다시 큐에 넣음 (max_quota_retries회 초과 시 실패)
+    - 결과 콜백(on_result)은 이벤트 루프 스레드에서 순서대로 호출 → DB 세션을 그대로 사용 가능
+    genai 비동기 클라이언트의 커넥션 풀이 이벤트 루프에 묶이므로 단계마다 같은 루프를 사용
+    """
+    def __init__(self,
+                 max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                 model_rpm: Optional[Dict[str, float]] = None,
+                 default_rpm: float = ASYNC_DEFAULT_RPM,
+                 latency_target: float = ASYNC_LATENCY_TARGET_SEC,
+                 max_quota_retries: int = ASYNC_MAX_QUOTA_RETRIES) -> None:
+        self.max_concurrency = max_concurrency
+        self.model_rpm = model_rpm if model_rpm is not None else parse_model_rpm(ASYNC_MODEL_RPM)
+        self.default_rpm = default_rpm
+        self.latency_target = latency_target
+        self.max_quota_retries = max_quota_retries
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        self.loop = asyncio.new_event_loop()
+        self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
+
+    def limiter(self, model: str) -> AdaptiveLimiter:
+        """모델별 limiter (단계가 바뀌어도 조정된 값 유지)"""
+        if model not in self.limiters:
+            self.limiters[model] = AdaptiveLimiter(
+                self.model_rpm.get(model, self.default_rpm), self.max_concurrency, self.latency_target
+            )
+        return self.limiters[model]
+
+    def run(self, stage: str, model: str, items: Iterable[Any],
+            task: Callable[[Any], Awaitable[Any]],
+            on_result: Callable[[Any, Any, Optional[str]], None]) -> StageStats:
+        """
+        items 각각에 대해 task(item) 실행 → on_result(item, 결과, None) 또는 on_result(item, None, 오류메시지)
+        반환: 단계 통계 (처리량 req/s 포함)
+        """
+        stats = self.loop.run_until_complete(self._run(stage, model, list(items), task, on_result))
+        limiter = self.limiter(model)
+        self.logger.info(
+            f" └── [{stage}] {stats.succeeded} succeeded ({stats.cached} without a model call), {stats.failed} failed, "
+            f"{stats.requeued} re-queued (quota) "
+            f"in {stats.elapsed:.1f}s: {stats.requests_per_sec:.2f} req/s "
+            f"(concurrency {limiter.concurrency:.1f}, {limiter.rate * 60:.0f} rpm)"
+        )
+        return stats
+
+    async def _run(self, stage: str, model: str, items: list,
+                   task: Callable[[Any], Awaitable[Any]],
+                   on_result: Callable[[Any, Any, Optional[str]], None]) -> StageStats:
+        stats = StageStats(stage=stage, total=len(items))
+        limiter = self.limiter(model)
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait((item, 0))
+
+        def report(item: Any, result: Any, error: Optional[str]) -> None:
+            try:
+                on_result(item, result, error)
+            except Exception as e:
+                self.logger.error(f" └── [{stage}] Failed to store result: {e}")
+
+        async def worker() -> None:
+            while True:
+                item, attempt = await queue.get()
+                try:
+                    slot = RequestSlot(limiter)
+                    # 이 항목의 모델 호출 기록에 단계/페이지/재시도 수 + 요청 슬롯 전달 (processor/call_log.py)
+                    set_call_context(stage, item, attempt, slot.acquire)
+                    try:
+                        result = await task(item)
+                    except Exception as e:
+                        quota_error = is_quota_error(e)
+                        stats.requests += slot.release(quota_error=quota_error)
+                        if quota_error and attempt < self.max_quota_retries:
+                            stats.requeued += 1
+                            queue.put_nowait((item, attempt + 1))
+                        else:
+                            stats.failed += 1
+                            report(item, None, str(e))
+                    else:
+                        if slot.release():
+                            stats.requests += 1
+                        else:
+                            stats.cached += 1
+                        stats.succeeded += 1
+                        report(item, result, None)
+                finally:
+                    queue.task_done()
+
+        started = time.monotonic()
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, min(self.max_concurrency, len(items))))]
+        try:
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        stats.elapsed = time.monotonic() - started
+        return stats
+
+    def close(self) -> None:
+        self.loop.close()
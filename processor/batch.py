@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import glob
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from google import genai
+from google.genai import types
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from storage.gcs_client import GCSStorageClient
+from processor.extractor import build_text_request, build_summary_request
+from processor.image_encoding import mime_type_for
+from processor.context_sheet import CONTEXT_PAGES
+from db.repository import Repository
+from db.models import PDFDocument, PDFPage, PageStatus, TextSource
+from utils.logger import get_logger
+from config import (
+    LOG_LEVEL, EXTRACT_TEXT_MODEL, EXTRACT_SUMMARY_MODEL, BATCH_BACKEND, BATCH_GCS_PREFIX, BATCH_LOCAL_DIR, SUMMARY_CONTEXT_MODE,
+)
+
+# 단계별 배치 설정: (모델, 결과 컬럼, 상태 컬럼)
+STAGES = {
+    "extraction": (EXTRACT_TEXT_MODEL, "extracted_text", "extracted"),
+    "summary": (EXTRACT_SUMMARY_MODEL, "summary", "summarized"),
+}
+
+# 백엔드 공통 작업 상태
+RUNNING, SUCCEEDED, FAILED = "RUNNING", "SUCCEEDED", "FAILED"
+
+
+def to_batch_line(contents: List[types.Content], config: types.GenerateContentConfig) -> Dict:
+    """온라인 요청(contents, config) → 배치 예측 JSONL 한 줄 ({"request": GenerateContentRequest})"""
+    generation_config = config.model_dump(mode="json", by_alias=True, exclude_none=True)
+    safety_settings = generation_config.pop("safetySettings", None)
+    request = {
+        "contents": [content.model_dump(mode="json", by_alias=True, exclude_none=True) for content in contents],
+        "generationConfig": generation_config,
+    }
+    if safety_settings:
+        request["safetySettings"] = safety_settings
+    return {"request": request}
+
+
+def target_uri(line: Dict) -> Optional[str]:
+    """요청의 마지막 이미지 URI (= 대상 페이지) → manifest에서 page_id 조회용"""
+    uris = [
+        part["fileData"]["fileUri"]
+        for content in line.get("request", {}).get("contents", [])
+        for part in content.get("parts", [])
+        if "fileData" in part
+    ]
+    return uris[-1] if uris else None
+
+
+def response_text(line: Dict) -> Optional[str]:
+    candidates = (line.get("response") or {}).get("candidates") or []
+    if not candidates:
+        return None
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    texts = [part["text"] for part in parts if "text" in part]
+    return "".join(texts) if texts else None
+
+
+@dataclass
+class BatchJob:
+    """제출한 배치 작업 manifest (대상 이미지 URI → page_id)"""
+    name: str
+    stage: str
+    model: str
+    job_id: str
+    pages: Dict[str, str] = field(default_factory=dict)
+    created_at: str = ""
+    ingested_at: Optional[str] = None
+
+
+class LocalBatchBackend:
+    """
+    로컬 디렉터리 stand-in (테스트/개발용, 모델 호출 없음)
+    - 제출: <root>/jobs/<name>/input.jsonl
+    - 결과: <root>/jobs/<name>/output/*.jsonl 파일이 생기면 완료로 봄 (배치 예측 출력과 같은 형식)
+    """
+    def __init__(self, root: str = BATCH_LOCAL_DIR) -> None:
+        self.root = os.path.join(root, "jobs")
+
+    def submit(self, name: str, model: str, lines: List[Dict]) -> str:
+        job_dir = os.path.join(self.root, name)
+        os.makedirs(os.path.join(job_dir, "output"), exist_ok=True)
+        with open(os.path.join(job_dir, "input.jsonl"), "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        return name
+
+    def state(self, job_id: str) -> str:
+        return SUCCEEDED if glob.glob(os.path.join(self.root, job_id, "output", "*.jsonl")) else RUNNING
+
+    def read_results(self, job_id: str) -> Iterator[Dict]:
+        for path in sorted(glob.glob(os.path.join(self.root, job_id, "output", "*.jsonl"))):
+            with open(path, encoding="utf-8") as f:
+                for raw in f:
+                    if raw.strip():
+                        yield json.loads(raw)
+
+
+class VertexBatchBackend:
+    """
+    Vertex AI 배치 예측
+    - 요청 JSONL을 처리 버킷 <prefix><name>/input.jsonl에 업로드 후 client.batches.create
+    - 결과는 <prefix><name>/output/ 아래 predictions.jsonl
+    """
+    _FAILED_STATES = {
+        types.JobState.JOB_STATE_FAILED, types.JobState.JOB_STATE_CANCELLED, types.JobState.JOB_STATE_EXPIRED,
+    }
+    _SUCCEEDED_STATES = {types.JobState.JOB_STATE_SUCCEEDED, types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED}
+
+    def __init__(self, client: genai.Client, storage: GCSStorageClient, prefix: str = BATCH_GCS_PREFIX) -> None:
+        self.client = client
+        self.storage = storage
+        self.prefix = prefix
+
+    def _output_prefix(self, name: str) -> str:
+        return f"{self.prefix}{name}/output/"
+
+    def submit(self, name: str, model: str, lines: List[Dict]) -> str:
+        input_path = f"{self.prefix}{name}/input.jsonl"
+        data = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+        self.storage.upload_bytes(data, input_path, self.storage.target_bucket, "application/jsonl")
+
+        job = self.client.batches.create(
+            model=model,
+            src=f"gs://{self.storage.target_bucket}/{input_path}",
+            config=types.CreateBatchJobConfig(
+                display_name=name,
+                dest=f"gs://{self.storage.target_bucket}/{self._output_prefix(name)}",
+            ),
+        )
+        return job.name
+
+    def state(self, job_id: str) -> str:
+        job = self.client.batches.get(name=job_id)
+        if job.state in self._SUCCEEDED_STATES:
+            return SUCCEEDED
+        if job.state in self._FAILED_STATES:
+            return FAILED
+        return RUNNING
+
+    def read_results(self, job_id: str) -> Iterator[Dict]:
+        job = self.client.batches.get(name=job_id)
+        for path in self.storage.list_paths(self._output_prefix(job.display_name), self.storage.target_bucket):
+            if not path.endswith(".jsonl"):
+                continue
+            for raw in self.storage.download_bytes(path, self.storage.target_bucket).decode("utf-8").splitlines():
+                if raw.strip():
+                    yield json.loads(raw)
+
+
+def create_batch_backend(client: genai.Client, storage: GCSStorageClient, backend: str = BATCH_BACKEND):
+    if backend == "local":
+        return LocalBatchBackend()
+    if backend == "vertex":
+        return VertexBatchBackend(client, storage)
+    raise ValueError(f"알 수 없는 배치 백엔드: {backend} (사용 가능: vertex, local)")
+
+
+class BatchManager:
+    """
+    텍스트 추출/요약 배치 예측 (백필용)
+    - submit: 대상 페이지를 배치 JSONL로 변환해서 제출 (이미지는 gs:// URI 참조, 프롬프트/설정은 온라인 요청과 동일)
+    - ingest_finished: 끝난 작업의 결과를 PDFPage에 한 번에 반영
+    제출한 작업은 manifest(JSON)로 처리 버킷 <prefix>manifests/에 기록 → 결과 반영 전까지 같은 페이지를 다시 제출하지 않음
+    (로컬 디스크가 아니므로 다른 호스트나 새 컨테이너에서 실행해도 진행 중인 작업을 이어서 반영)
+    - 반영 전: <prefix>manifests/open/<name>.json, 반영 후: <prefix>manifests/ingested/<name>.json
+    """
+    def __init__(self, repo: Repository, storage: GCSStorageClient, backend, prefix: str = BATCH_GCS_PREFIX) -> None:
+        self.repo = repo
+        self.storage = storage
+        self.backend = backend
+        self.manifest_prefix = f"{prefix}manifests/"
+        self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
+
+    def _uri(self, gcs_path: str) -> str:
+        return f"gs://{self.storage.target_bucket}/{gcs_path}"
+
+    def _manifest_path(self, name: str, ingested: bool) -> str:
+        return f"{self.manifest_prefix}{'ingested' if ingested else 'open'}/{name}.json"
+
+    def _save(self, job: BatchJob) -> None:
+        """manifest 저장, 반영이 끝난 작업은 ingested/로 옮김 (open/ 목록에서 빠짐)"""
+        data = json.dumps(asdict(job), ensure_ascii=False).encode("utf-8")
+        ingested = job.ingested_at is not None
+        self.storage.upload_bytes(data, self._manifest_path(job.name, ingested), self.storage.target_bucket, "application/json")
+        if ingested:
+            self.storage.delete_file(self._manifest_path(job.name, False), self.storage.target_bucket)
+
+    def open_jobs(self, stage: str) -> List[BatchJob]:
+        """결과 반영 전인 작업"""
+        jobs = []
+        for path in sorted(self.storage.list_paths(f"{self.manifest_prefix}open/", self.storage.target_bucket)):
+            if not path.endswith(".json"):
+                continue
+            job = BatchJob(**json.loads(self.storage.download_bytes(path, self.storage.target_bucket)))
+            if job.stage == stage and job.ingested_at is None:
+                jobs.append(job)
+        return jobs
+
+    def build_lines(self, stage: str, pages: List[PDFPage]) -> List[Dict]:
+        lines = []
+        contexts: Dict[str, Tuple[List[str], Optional[str]]] = {}  # doc_id → (컨텍스트 이미지 URI, synopsis)
+        for page in pages:
+            mime_type = mime_type_for(page.gcs_path)
+            if stage == "extraction":
+                contents, config, _ = build_text_request(self._uri(page.gcs_path), mime_type)
+            else:
+                if page.doc_id not in contexts:
+                    contexts[page.doc_id] = self._summary_context(page.doc_id)
+                context, synopsis = contexts[page.doc_id]
+                contents, config, _ = build_summary_request(
+                    self._uri(page.gcs_path), context, page.gcs_path, mime_type,
+                    mime_type_for(context[0]) if context else None, synopsis,
+                )
+            lines.append(to_batch_line(contents, config))
+        return lines
+
+    def _summary_context(self, doc_id: str) -> Tuple[List[str], Optional[str]]:
+        """
+        요약 컨텍스트 (컨텍스트 이미지 URI, synopsis)
+        - "synopsis" 모드이고 synopsis가 있으면 이미지 없이 synopsis
+        - "sheet" 모드이고 contact sheet가 있으면 1장
+        - 그 외에는 첫 5페이지 (배치 제출 시에는 synopsis/contact sheet를 새로 만들지 않음)
+        """
+        doc = self.repo.session.get(PDFDocument, doc_id)
+        if doc is not None and SUMMARY_CONTEXT_MODE == "synopsis" and doc.synopsis_status == PageStatus.SUCCESS and doc.synopsis:
+            return [], doc.synopsis
+        if doc is not None and SUMMARY_CONTEXT_MODE == "sheet" and doc.context_image_path:
+            return [self._uri(doc.context_image_path)], None
+        return [self._uri(p) for p in self.repo.get_first_n_pages(doc_id, CONTEXT_PAGES)], None
+
+    def submit(self, stage: str, pages: List[PDFPage]) -> Optional[BatchJob]:
+        """pages 중 진행 중인 작업에 없는 페이지를 새 배치 작업으로 제출"""
+        submitted = {page_id for job in self.open_jobs(stage) for page_id in job.pages.values()}
+        pages = [page for page in pages if page.page_id not in submitted]
+        if not pages:
+            return None
+
+        model = STAGES[stage][0]
+        created_at = datetime.utcnow()
+        # 여러 호스트가 같은 시각에 제출해도 manifest가 겹치지 않도록 임의 접미사
+        name = f"{stage}-{created_at:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        job_id = self.backend.submit(name, model, self.build_lines(stage, pages))
+
+        job = BatchJob(
+            name=name, stage=stage, model=model, job_id=job_id,
+            pages={self._uri(page.gcs_path): page.page_id for page in pages},
+            created_at=created_at.isoformat(),
+        )
+        self._save(job)
+        self.logger.info(f" └── Submitted batch job {name}: {len(pages)} pages ({job_id})")
+        return job
+
+    def ingest(self, job: BatchJob) -> Optional[Dict[str, int]]:
+        """
+        끝난 작업의 결과를 PDFPage에 반영, 작업이 진행 중이면 None
+        결과가 없거나 오류인 페이지는 FAILED (다음 실행에서 다시 처리)
+        반환: {"succeeded": n, "failed": n}
+        """
+        state = self.backend.state(job.job_id)
+        if state == RUNNING:
+            return None
+
+        _, text_column, status_column = STAGES[job.stage]
+        mappings: Dict[str, Dict] = {}
+        if state == SUCCEEDED:
+            for line in self.backend.read_results(job.job_id):
+                page_id = job.pages.get(target_uri(line))
+                if page_id is None:
+                    continue
+                text = response_text(line)
+                if text is None:
+                    mappings[page_id] = {
+                        "page_id": page_id, status_column: PageStatus.FAILED,
+                        "error_message": f"Batch Error: {line.get('status') or 'empty response'}",
+                    }
+                    continue
+                mapping = {"page_id": page_id, text_column: text, status_column: PageStatus.SUCCESS, "error_message": None}
+                if job.stage == "extraction":
+                    mapping["text_source"] = TextSource.GEMINI
+                mappings[page_id] = mapping
+
+        for page_id in job.pages.values():
+            if page_id not in mappings:
+                mappings[page_id] = {
+                    "page_id": page_id, status_column: PageStatus.FAILED,
+                    "error_message": f"Batch Error: no result (job {state.lower()})",
+                }
+
+        self.repo.bulk_update_pages(list(mappings.values()))
+        job.ingested_at = datetime.utcnow().isoformat()
+        self._save(job)
+
+        succeeded = sum(1 for m in mappings.values() if m[status_column] == PageStatus.SUCCESS)
+        return {"succeeded": succeeded, "failed": len(mappings) - succeeded}
+
+    def ingest_finished(self, stage: str) -> Dict[str, int]:
+        """stage의 끝난 작업 결과를 모두 반영, 반환: 합계 {"jobs", "succeeded", "failed", "running"}"""
+        totals = {"jobs": 0, "succeeded": 0, "failed": 0, "running": 0}
+        for job in self.open_jobs(stage):
+            result = self.ingest(job)
+            if result is None:
+                totals["running"] += 1
+                continue
+            totals["jobs"] += 1
+            totals["succeeded"] += result["succeeded"]
+            totals["failed"] += result["failed"]
+            self.logger.info(f" └── Ingested batch job {job.name}: {result['succeeded']} succeeded, {result['failed']} failed")
+        return totals
@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import heapq
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google import genai
+from google.genai import types
+from sqlalchemy.orm import Session
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from db.models import ModelCallLog
+from utils.logger import get_logger
+from config import LOG_LEVEL, MODEL_CALL_LOG, MODEL_CALL_LOG_PATH
+
+# 호출 컨텍스트: AsyncEngine이 항목마다 설정 → 같은 태스크 안의 모델 호출(asyncio.gather/to_thread 포함)에 전달
+_stage: ContextVar[Optional[str]] = ContextVar("model_call_stage", default=None)
+_item: ContextVar[Any] = ContextVar("model_call_item", default=None)
+_retries: ContextVar[int] = ContextVar("model_call_retries", default=0)
+# AsyncEngine 요청 슬롯: 비동기 모델 호출 직전에 획득 → 결과 캐시 hit처럼 모델을 호출하지 않는 항목은 limiter를 쓰지 않음
+_acquire: ContextVar[Optional[Callable[[], Awaitable[None]]]] = ContextVar("model_call_acquire", default=None)
+
+_TOP_CALLS = 5  # 단계별로 보관하는 토큰 수 상위 호출 수
+
+
+def set_call_context(stage: Optional[str], item: Any = None, retries: int = 0,
+                     acquire: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+    """
+    현재 태스크의 모델 호출에 붙일 단계 이름 / 처리 항목(PDFPage, PDFDocument, 페이지 목록) / quota 재시도 수
+    acquire: 비동기 모델 호출 전에 기다릴 요청 슬롯 (AsyncEngine)
+    """
+    _stage.set(stage)
+    _item.set(item)
+    _retries.set(retries)
+    _acquire.set(acquire)
+
+
+async def _acquire_slot() -> None:
+    acquire = _acquire.get()
+    if acquire is not None:
+        await acquire()
+
+
+def _item_ids(item: Any) -> Tuple[Optional[str], Optional[str]]:
+    """(doc_id, page_id), 페이지 목록(여러 페이지 요청)이면 첫 페이지"""
+    if isinstance(item, (list, tuple)):
+        item = item[0] if item else None
+    return getattr(item, "doc_id", None), getattr(item, "page_id", None)
+
+
+def request_size(contents: list) -> Tuple[int, int]:
+    """(이미지 수, 요청 크기): inline 이미지 바이트 + 텍스트(UTF-8) + URI 길이 (base64 인코딩 전)"""
+    images, size = 0, 0
+    for content in contents:
+        if isinstance(content, str):  # embed_content의 텍스트 목록
+            size += len(content.encode("utf-8"))
+            continue
+        for part in content.parts or ():
+            if part.inline_data is not None:
+                images += 1
+                size += len(part.inline_data.data or b"")
+            elif part.file_data is not None:
+                images += 1
+                size += len(part.file_data.file_uri or "")
+            elif part.text is not None:
+                size += len(part.text.encode("utf-8"))
+    return images, size
+
+
+def _usage_tokens(response: Any) -> Tuple[int, int]:
+    """(입력 토큰, 출력 토큰), 출력에는 thinking 토큰 포함 (출력 단가로 과금)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return usage.prompt_token_count or 0, (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+    # embed_content: 입력별 token_count (Vertex AI)
+    embeddings = getattr(response, "embeddings", None) or []
+    return sum(int(e.statistics.token_count or 0) for e in embeddings if e.statistics is not None), 0
+
+
+@dataclass
+class ModelCall:
+    stage: Optional[str]
+    model: str
+    doc_id: Optional[str]
+    page_id: Optional[str]
+    input_tokens: int
+    output_tokens: int
+    image_count: int
+    request_bytes: int
+    latency_ms: int
+    retries: int
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class StageUsage:
+    """단계별 호출 집계 (지연 시간 분포, 토큰 수 상위 페이지 포함)"""
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.image_count = 0
+        self.request_bytes = 0
+        self.retries = 0
+        self.latencies: List[int] = []
+        self.top: List[Tuple[int, str]] = []  # (토큰 수, page_id 또는 doc_id) min-heap
+
+    def add(self, call: ModelCall) -> None:
+        self.calls += 1
+        self.errors += call.error is not None
+        self.input_tokens += call.input_tokens
+        self.output_tokens += call.output_tokens
+        self.image_count += call.image_count
+        self.request_bytes += call.request_bytes
+        self.retries += call.retries
+        self.latencies.append(call.latency_ms)
+
+        key = call.page_id or call.doc_id
+        if key is not None and call.error is None:
+            heapq.heappush(self.top, (call.input_tokens + call.output_tokens, key))
+            if len(self.top) > _TOP_CALLS:
+                heapq.heappop(self.top)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "image_count": self.image_count,
+            "request_bytes": self.request_bytes,
+            "retries": self.retries,
+            "p50_ms": latencies[len(latencies) // 2] if latencies else 0,
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0,
+            "top_tokens": [{"id": key, "tokens": tokens} for tokens, key in sorted(self.top, reverse=True)],
+        }
+
+
+class CallRecorder:
+    """
+    모델 호출 기록 (프로세스 내 1개, call_recorder)
+    - 호출마다 ModelCall을 쌓아 두고 flush()에서 DB 테이블(bulk insert) 또는 JSONL 파일에 추가
+    - 단계별 집계(StageUsage)는 실행 동안 유지 → usage_columns()로 PipelineStatus에 저장
+    """
+    def __init__(self, sink: str = MODEL_CALL_LOG, path: str = MODEL_CALL_LOG_PATH) -> None:
+        self.sink = sink  # "db" / "file" / "off"
+        self.path = path
+        self.run_id: Optional[int] = None
+        self.stages: Dict[str, StageUsage] = {}
+        self._pending: List[ModelCall] = []
+        self._lock = threading.Lock()
+        self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
+
+    def start_run(self, run_id: Optional[int]) -> None:
+        with self._lock:
+            self.run_id = run_id
+            self.stages.clear()
+            self._pending.clear()
+
+    def record(self, call: ModelCall) -> None:
+        with self._lock:
+            if self.sink != "off":
+                self._pending.append(call)
+            self.stages.setdefault(call.stage or "other", StageUsage()).add(call)
+
+    def flush(self, session: Session) -> int:
+        """쌓인 호출 기록 저장, 반환: 저장한 건수 (저장 실패는 경고만 남기고 버림)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        rows = [{"run_id": self.run_id, **asdict(call)} for call in pending]
+        try:
+            if self.sink == "db":
+                session.bulk_insert_mappings(ModelCallLog, rows)
+                session.commit()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+        except Exception as e:
+            if self.sink == "db":
+                session.rollback()
+            self.logger.warning(f" └── Failed to save model call log ({len(rows)} calls): {e}")
+            return 0
+        return len(rows)
+
+    def stage_usage(self, stage: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            usage = self.stages.get(stage)
+            return usage.to_dict() if usage is not None else None
+
+    def usage_columns(self) -> Dict[str, Any]:
+        """PipelineStatus 집계 컬럼 값 (Repository.update_pipeline_status kwargs)"""
+        with self._lock:
+            stages = {stage: usage.to_dict() for stage, usage in self.stages.items()}
+        return {
+            "model_calls": sum(usage["calls"] for usage in stages.values()),
+            "input_tokens": sum(usage["input_tokens"] for usage in stages.values()),
+            "output_tokens": sum(usage["output_tokens"] for usage in stages.values()),
+            "stage_usage": json.dumps(stages, ensure_ascii=False),
+        }
+
+
+call_recorder = CallRecorder()
+
+
+def _record(model: str, contents: list, started: float, response: Any = None, error: Optional[Exception] = None) -> None:
+    input_tokens, output_tokens = _usage_tokens(response) if response is not None else (0, 0)
+    image_count, request_bytes = request_size(contents)
+    doc_id, page_id = _item_ids(_item.get())
+    call_recorder.record(ModelCall(
+        stage=_stage.get(),
+        model=model,
+        doc_id=doc_id,
+        page_id=page_id,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        image_count=image_count,
+        request_bytes=request_bytes,
+        latency_ms=int((time.perf_counter() - started) * 1000),
+        retries=_retries.get(),
+        error=str(error)[:500] if error is not None else None,
+    ))
+
+
+def generate_content(client: genai.Client, model: str, contents: list,
+                     config: types.GenerateContentConfig) -> types.GenerateContentResponse:
+    """client.models.generate_content + 호출 기록 (오류도 기록 후 그대로 전달)"""
+    started = time.perf_counter()
+    try:
+        response = client.models.generate_content(model=model, contents=contents, config=config)
+    except Exception as e:
+        _record(model, contents, started, error=e)
+        raise
+    _record(model, contents, started, response)
+    return response
+
+
+async def generate_content_async(client: genai.Client, model: str, contents: list,
+                                 config: types.GenerateContentConfig) -> types.GenerateContentResponse:
+    """generate_content의 비동기 버전 (client.aio), AsyncEngine 안에서는 요청 슬롯을 얻은 뒤 호출"""
+    await _acquire_slot()
+    started = time.perf_counter()
+    try:
+        response = await client.aio.models.generate_content(model=model, contents=contents, config=config)
+    except Exception as e:
+        _record(model, contents, started, error=e)
+        raise
+    _record(model, contents, started, response)
+    return response
+
+
+def embed_content(client: genai.Client, model: str, contents: list,
+                  config: types.EmbedContentConfig) -> types.EmbedContentResponse:
+    """client.models.embed_content + 호출 기록"""
+    started = time.perf_counter()
+    try:
+        response = client.models.embed_content(model=model, contents=contents, config=config)
+    except Exception as e:
+        _record(model, contents, started, error=e)
+        raise
+    _record(model, contents, started, response)
+    return response
+
+
+async def embed_content_async(client: genai.Client, model: str, contents: list,
+                              config: types.EmbedContentConfig) -> types.EmbedContentResponse:
+    """embed_content의 비동기 버전 (client.aio), AsyncEngine 안에서는 요청 슬롯을 얻은 뒤 호출"""
+    await _acquire_slot()
+    started = time.perf_counter()
+    try:
+        response = await client.aio.models.embed_content(model=model, contents=contents, config=config)
+    except Exception as e:
+        _record(model, contents, started, error=e)
+        raise
+    _record(model, contents, started, response)
+    return response
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.image_encoding import mime_type_for
+from config import CONTEXT_CACHE_MAX_MB
+
+
+@dataclass
+class DocumentContext:
+    """
+    요약 컨텍스트: 문서의 앞 페이지(또는 contact sheet) 경로 + (필요할 때 채우는) 이미지 바이트 / md5 digest
+    synopsis가 있으면 이미지 없이 텍스트만 사용 (paths/images/digests는 빈 목록)
+    """
+    paths: List[str]
+    images: Optional[List[bytes]] = None
+    digests: Optional[List[str]] = None
+    synopsis: Optional[str] = None
+
+    @property
+    def mime_type(self) -> Optional[str]:
+        """컨텍스트 이미지 포맷 (페이지 이미지 또는 contact sheet)"""
+        return mime_type_for(self.paths[0]) if self.paths else None
+
+    @property
+    def size(self) -> int:
+        return sum(len(image) for image in self.images or ()) + sum(len(path) for path in self.paths) + len(self.synopsis or "")
+
+
+@dataclass
+class ContextCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    loaded_bytes: int = 0  # GCS에서 받은 컨텍스트 이미지 크기 합
+
+
+class ContextCache:
+    """
+    doc_id → DocumentContext LRU (프로세스 내, 실행 단위)
+    요약 단계에서 같은 문서의 페이지마다 첫 5페이지 조회/다운로드를 반복하지 않도록 문서별로 한 번만 가져옴
+    - 보관 중인 이미지 크기 합이 max_bytes를 넘으면 가장 오래 사용하지 않은 문서부터 제거
+    - max_bytes보다 큰 문서는 보관하지 않음 (매번 다시 가져옴)
+    """
+    def __init__(self, max_bytes: int = CONTEXT_CACHE_MAX_MB * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = ContextCacheStats()
+        self._entries: "OrderedDict[str, DocumentContext]" = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, doc_id: str) -> Optional[DocumentContext]:
+        with self._lock:
+            context = self._entries.get(doc_id)
+            if context is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(doc_id)
+            self.stats.hits += 1
+            return context
+
+    def put(self, doc_id: str, context: DocumentContext) -> None:
+        """추가 또는 갱신 (이미지를 나중에 채운 경우 크기 다시 계산)"""
+        with self._lock:
+            self._discard(doc_id)
+            size = context.size
+            if size > self.max_bytes:
+                return
+            self._entries[doc_id] = context
+            self._sizes[doc_id] = size
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.stats.evictions += 1
+
+    def _discard(self, doc_id: str) -> None:
+        if doc_id in self._entries:
+            del self._entries[doc_id]
+            self.size -= self._sizes.pop(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.size = 0
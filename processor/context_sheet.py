@@ -0,0 +1,62 @@
+import io
+import math
+from typing import List
+
+from PIL import Image, ImageDraw
+
+# 요약 컨텍스트로 쓰는 문서 앞 페이지 수 (Repository.get_first_n_pages와 동일)
+CONTEXT_PAGES = 5
+CONTEXT_SHEET_MIME_TYPE = "image/jpeg"
+_LABEL_HEIGHT = 24
+
+
+def context_sheet_path(page_path_prefix: str) -> str:
+    """
+    페이지 이미지와 같은 폴더에 저장 (페이지 경로 규칙 <prefix>-page-00001.<ext>과 겹치지 않음)
+    page_path_prefix: "<gcs_image_dir>/<pdf_basename>" (페이지 경로의 "-page-" 앞부분)
+    """
+    return f"{page_path_prefix}-context.jpg"
+
+
+def build_context_sheet(images: List[Image.Image], tile_px: int, quality: int = 80) -> bytes:
+    """
+    앞 페이지 이미지들을 축소해서 한 장의 contact sheet(JPEG)로 합침
+    - 각 페이지는 긴 변 tile_px 이하로 축소, ceil(sqrt(n))열 격자에 페이지 순서대로 배치
+    - 타일 위에 페이지 번호 표시 ("p.1" ...)
+    모델은 문서 전체 맥락만 훑어보면 되므로 원본 해상도(300dpi)가 필요 없음
+    """
+    if not images:
+        raise ValueError("contact sheet를 만들 페이지 이미지가 없음")
+
+    thumbnails = []
+    for image in images:
+        thumbnail = image.convert("RGB")
+        thumbnail.thumbnail((tile_px, tile_px), Image.Resampling.LANCZOS)
+        thumbnails.append(thumbnail)
+
+    columns = math.ceil(math.sqrt(len(thumbnails)))
+    rows = math.ceil(len(thumbnails) / columns)
+    cell_width = max(t.width for t in thumbnails)
+    cell_height = max(t.height for t in thumbnails) + _LABEL_HEIGHT
+
+    sheet = Image.new("RGB", (columns * cell_width, rows * cell_height), "white")
+    draw = ImageDraw.Draw(sheet)
+    for i, thumbnail in enumerate(thumbnails):
+        x, y = (i % columns) * cell_width, (i // columns) * cell_height
+        draw.text((x + 4, y + 4), f"p.{i + 1}", fill="black")
+        sheet.paste(thumbnail, (x, y + _LABEL_HEIGHT))
+        draw.rectangle([x, y + _LABEL_HEIGHT, x + thumbnail.width - 1, y + _LABEL_HEIGHT + thumbnail.height - 1], outline="gray")
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def build_context_sheet_from_bytes(images: List[bytes], tile_px: int, quality: int = 80) -> bytes:
+    """GCS에서 받은 페이지 이미지 바이트로 contact sheet 생성 (split 이전에 등록된 문서 backfill용)"""
+    opened = [Image.open(io.BytesIO(image)) for image in images]
+    try:
+        return build_context_sheet(opened, tile_px, quality)
+    finally:
+        for image in opened:
+            image.close()
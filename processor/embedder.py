@@ -8,22 +8,93 @@ from google.genai.types import EmbedContentConfig
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
-from config import EMBEDDING_MODEL
+from processor.call_log import embed_content, embed_content_async
+from config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS
+
+
+EMBEDDING_CONFIG = EmbedContentConfig(
+    task_type="RETRIEVAL_DOCUMENT",
+    output_dimensionality=768,
+    title="Content of Document"
+)
 
 
 def get_text_embedding(text: str, client: genai.Client) -> List[float]:
-    response = client.models.embed_content(
+    response = embed_content(
+        client,
         model=EMBEDDING_MODEL,
         contents=[text],
-        config=EmbedContentConfig(
-            task_type="RETRIEVAL_DOCUMENT",
-            output_dimensionality=768,
-            title="Content of Document"
-        )
+        config=EMBEDDING_CONFIG
     )
     return response.embeddings[0].values
 
 
+async def get_text_embedding_async(text: str, client: genai.Client) -> List[float]:
+    """get_text_embedding의 비동기 버전 (client.aio)"""
+    response = await embed_content_async(
+        client,
+        model=EMBEDDING_MODEL,
+        contents=[text],
+        config=EMBEDDING_CONFIG
+    )
+    return response.embeddings[0].values
+
+
+def estimate_tokens(text: str) -> int:
+    """임베딩 입력 토큰 수 추정 (한글은 글자당 토큰이 많으므로 보수적으로 2글자당 1토큰)"""
+    return len(text) // 2 + 1
+
+
+def batch_texts(texts: List[str], max_count: int = EMBEDDING_BATCH_SIZE,
+                max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS) -> List[List[int]]:
+    """
+    임베딩 요청 단위로 묶음 (순서 유지), 반환: 요청별 texts 인덱스 목록
+    요청당 최대 max_count개, 예상 토큰 합 max_tokens 이하 (혼자서 max_tokens를 넘는 텍스트는 단독 요청)
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for i, text in enumerate(texts):
+        estimate = estimate_tokens(text)
+        if current and (len(current) >= max_count or tokens + estimate > max_tokens):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(i)
+        tokens += estimate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _vectors(response, count: int) -> List[List[float]]:
+    vectors = [embedding.values for embedding in response.embeddings or []]
+    if len(vectors) != count:
+        raise ValueError(f"임베딩 결과 수 불일치: 요청 {count}개, 응답 {len(vectors)}개")
+    return vectors
+
+
+def get_text_embeddings(texts: List[str], client: genai.Client) -> List[List[float]]:
+    """여러 텍스트를 한 번 호출로 임베딩, 반환: texts 순서의 벡터 목록"""
+    response = embed_content(
+        client,
+        model=EMBEDDING_MODEL,
+        contents=texts,
+        config=EMBEDDING_CONFIG
+    )
+    return _vectors(response, len(texts))
+
+
+async def get_text_embeddings_async(texts: List[str], client: genai.Client) -> List[List[float]]:
+    """get_text_embeddings의 비동기 버전 (client.aio)"""
+    response = await embed_content_async(
+        client,
+        model=EMBEDDING_MODEL,
+        contents=texts,
+        config=EMBEDDING_CONFIG
+    )
+    return _vectors(response, len(texts))
+
+
 if __name__ == "__main__":
     ############### 함수 동작 테스트 ###############
     from config import PROJECT_ID, GENAI_LOCATION
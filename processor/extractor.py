@@ -1,148 +1,680 @@
 import os
 import sys
-from typing import Tuple, Optional, List
+import asyncio
+from typing import Dict, Tuple, Optional, List, Union
 
 from google import genai
 from google.genai import types
+from pydantic import BaseModel
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
-from processor.prompts import EXTRACT_TEXT_PROMPT, EXTRACT_SUMMARY_PROMPT_1, EXTRACT_SUMMARY_PROMPT_2, EXTRACT_SUMMARY_PROMPT_3
-from config import EXTRACT_TEXT_MODEL, EXTRACT_SUMMARY_MODEL
+from processor.result_cache import ResultCache
+from processor.call_log import generate_content, generate_content_async
+from processor.prompts import (
+    EXTRACT_TEXT_PROMPT, EXTRACT_MULTI_TEXT_PROMPT, EXTRACT_SUMMARY_PROMPT_1, EXTRACT_SUMMARY_PROMPT_1_SYNOPSIS, EXTRACT_SUMMARY_PROMPT_2, EXTRACT_SUMMARY_PROMPT_3,
+    EXTRACT_SYNOPSIS_PROMPT_1, EXTRACT_SYNOPSIS_PROMPT_2, EXTRACT_FUSED_PROMPT_3, VERIFY_TEXT_PROMPT,
+)
+from config import EXTRACT_TEXT_MODEL, EXTRACT_SUMMARY_MODEL, EXTRACT_FUSED_MODEL, OCR_GROUP_TOKEN_BUDGET
 
 def load_image_as_bytes(image_path: str) -> bytes:
     with open(image_path, "rb") as f:
         return f.read()
 
 
-def extract_text(image_path: str, client: genai.Client) -> Tuple[Optional[str], Optional[str]]:
+def _image_part(image: Union[bytes, str], mime_type: str) -> types.Part:
+    """이미지 바이트는 inline, 문자열은 gs:// URI 참조 (배치 요청 등)"""
+    if isinstance(image, str):
+        return types.Part.from_uri(file_uri=image, mime_type=mime_type)
+    return types.Part.from_bytes(data=image, mime_type=mime_type)
+
+
+def build_text_request(image: Union[bytes, str], mime_type: str) -> Tuple[list, types.GenerateContentConfig, List[str]]:
+    """텍스트 추출 요청 구성: (contents, config, 캐시 키용 프롬프트), image는 바이트 또는 gs:// URI"""
+    prompt = EXTRACT_TEXT_PROMPT.strip()
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+                _image_part(image, mime_type),
+            ]
+        )
+    ]
+
+    config = types.GenerateContentConfig(
+        temperature=0,
+        top_p=0.95,
+        max_output_tokens=8192,
+        response_modalities=["TEXT"],
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ]
+    )
+    return contents, config, [prompt]
+
+
+def _cache_lookup(cache: Optional[ResultCache], images: List[Union[bytes, str]], prompts: List[str], model: str,
+                  config: types.GenerateContentConfig,
+                  image_digests: Optional[List[str]] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    반환: (캐시 키, 캐시된 결과), 캐시를 사용하지 않으면 (None, None)
+    image_digests: gs:// URI 요청이면 GCS md5Hash 목록 (images 순서), 없으면 URI 요청은 캐시 미사용
+    """
+    if cache is None:
+        return None, None
+    if image_digests is not None:
+        cache_key = cache.make_key_from_digests(image_digests, prompts, model, config)
+    elif any(isinstance(image, str) for image in images):
+        return None, None
+    else:
+        cache_key = cache.make_key(images, prompts, model, config)
+    return cache_key, cache.get(cache_key)
+
+
+async def _cache_lookup_async(cache: Optional[ResultCache], images: List[Union[bytes, str]], prompts: List[str], model: str,
+                              config: types.GenerateContentConfig,
+                              image_digests: Optional[List[str]] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """_cache_lookup의 비동기 버전: 키 계산(이미지 해시)과 DB 조회를 스레드에서 실행 (이벤트 루프를 막지 않음)"""
+    if cache is None:
+        return None, None
+    return await asyncio.to_thread(_cache_lookup, cache, images, prompts, model, config, image_digests)
+
+
+async def _cache_put_async(cache: ResultCache, cache_key: dict, result: str) -> None:
+    await asyncio.to_thread(cache.put, cache_key, result)
+
+
+def extract_text(image: Union[bytes, str], client: genai.Client, mime_type: str = "image/png",
+                 cache: Optional[ResultCache] = None,
+                 image_digests: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[str]]:
     """
     Gemini를 이용해 이미지에서 Markdown 기반 텍스트 추출
+    image: 페이지 이미지 바이트 또는 gs:// URI (URI면 Gemini가 GCS에서 직접 읽음)
+    mime_type: 인코딩 프로파일에 따른 이미지 MIME 타입
+    cache: 있으면 같은 이미지/프롬프트/모델/설정의 이전 결과를 재사용
+    image_digests: URI 요청의 캐시 키용 [GCS md5Hash]
     """
     try:
-        prompt = EXTRACT_TEXT_PROMPT.strip()
-
-        image_bytes = load_image_as_bytes(image_path)
-
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=prompt),
-                    types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
-                ]
-            )
-        ]
+        contents, config, prompts = build_text_request(image, mime_type)
 
-        config = types.GenerateContentConfig(
-            temperature=0,
-            top_p=0.95,
-            max_output_tokens=8192,
-            response_modalities=["TEXT"],
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-            ]
-        )
+        cache_key, cached = _cache_lookup(cache, [image], prompts, EXTRACT_TEXT_MODEL, config, image_digests)
+        if cached is not None:
+            return cached, None
 
-        result = client.models.generate_content(
+        result = generate_content(
+            client,
             model=EXTRACT_TEXT_MODEL,
             contents=contents,
             config=config
         )
 
+        if cache_key is not None and result.text is not None:
+            cache.put(cache_key, result.text)
+
         return result.text, None
 
     except Exception as e:
         return None, f"텍스트 추출 오류: {e}"
 
 
-def extract_summary(target_image_path: str, context_image_paths: List[str], client: genai.Client) -> Tuple[Optional[str], Optional[str]]:
+async def extract_text_async(image: Union[bytes, str], client: genai.Client, mime_type: str = "image/png",
+                             cache: Optional[ResultCache] = None,
+                             image_digests: Optional[List[str]] = None) -> Optional[str]:
+    """extract_text의 비동기 버전 (client.aio), 오류는 예외로 전달 (AsyncEngine에서 quota 오류 구분)"""
+    contents, config, prompts = build_text_request(image, mime_type)
+
+    cache_key, cached = await _cache_lookup_async(cache, [image], prompts, EXTRACT_TEXT_MODEL, config, image_digests)
+    if cached is not None:
+        return cached
+
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_TEXT_MODEL,
+        contents=contents,
+        config=config
+    )
+
+    if cache_key is not None and result.text is not None:
+        await _cache_put_async(cache, cache_key, result.text)
+
+    return result.text
+
+
+class PageText(BaseModel):
+    page_number: int
+    markdown: str
+
+
+class MultiPageResult(BaseModel):
+    """여러 페이지 OCR 요청의 응답"""
+    pages: List[PageText]
+
+    def by_page(self, page_numbers: List[int]) -> Dict[int, str]:
+        """
+        반환: {페이지 번호: 추출된 텍스트}
+        요청한 페이지가 빠졌거나 중복/요청하지 않은 페이지가 있으면 ValueError (잘못된 응답 → 페이지별 요청으로 대체)
+        """
+        texts = {}
+        for page in self.pages:
+            if page.page_number not in page_numbers or page.page_number in texts:
+                raise ValueError(f"응답 페이지 번호 불일치: {page.page_number}")
+            texts[page.page_number] = page.markdown
+        missing = sorted(set(page_numbers) - set(texts))
+        if missing:
+            raise ValueError(f"응답에 없는 페이지: {missing}")
+        return texts
+
+
+# MultiPageResult와 같은 구조 (FUSED_RESPONSE_SCHEMA와 같은 이유로 Schema 사용)
+MULTI_TEXT_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "pages": types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "page_number": types.Schema(type=types.Type.INTEGER),
+                    "markdown": types.Schema(type=types.Type.STRING),
+                },
+                required=["page_number", "markdown"],
+                property_ordering=["page_number", "markdown"],
+            ),
+        ),
+    },
+    required=["pages"],
+)
+
+
+def build_multi_text_request(images: List[Union[bytes, str]], page_numbers: List[int], mime_type: str,
+                             max_output_tokens: int = OCR_GROUP_TOKEN_BUDGET) -> Tuple[list, types.GenerateContentConfig, List[str]]:
     """
-    Gemini를 이용해 이미지 내용 요약/설명 추출
+    여러 페이지 텍스트 추출 요청 구성: (contents, config, 캐시 키용 프롬프트)
+    페이지마다 "Page N" 라벨 + 이미지, 응답은 페이지별 Markdown (MultiPageResult)
     """
+    prompt = EXTRACT_MULTI_TEXT_PROMPT.strip().replace("{page_count}", str(len(images)))
+    labels = [f"Page {page_number}" for page_number in page_numbers]
 
-    def get_description(file_name: str):
-        description_mapping = {
-            '1. International Standards': 'Includes international standard and specification documents required for high voltage circuit breaker design and testing. Refer to the technical specifications of global standardization organizations such as IEC and IEEE. Required data for product development and design standard establishment.',
-            'IEC': 'Standard and specification documents on high-voltage equipment issued by the International Conference on Electrical Standards (IEC). Provide global standards for design, testing, safety standards, etc.',
-            'IEEE': 'The American Institute of Electrical and Electronics (IEEE) specifications and standards, including market-focused design standards and testing procedures in North America.',
-            '2. Type Test Reports': 'This is the type test result report of the actual manufactured circuit breaker. It is classified by model and year and details test items, insulation performance, and blocking performance.',
-            '145SP-3': 'Type test data for circuit breaker model 145SP-3.',
-            '145 kV 40 kA MS (2017)': 'A test report of a 145kV / 40kA class circuit breaker tested in 2017 of the model 145SP-3.',
-            '300SR': 'Type test data for circuit breaker model 300SR.',
-            '245 kV 50 kA MS (2020)': 'Test report of 245kV / 50kA circuit breaker tested in 2020 of Model 300SR.',
-            '245 kV 63 kA MS (2024)': 'Test report of 245kV / 63kA circuit breaker carried out in 2024 of Model 300SR.',
-            '3. Customer Standard Specifications': 'Standard Specifications by Country/Power Authority/Consumer.\nStandard Specification document provided by each country and customer. Refer to when delivering the product if you need a design that reflects customer requirements. This may include local application regulations and special requirements.',
-            'Endeavour Energy': 'Standard specifications of Endeavour Energy, Power company in Australia.',
-            'OETC': 'Standard specifications of OETC, Power company in Oman.',
-            'SEC': 'Standard specifications of SEC, Power company in Saudi Arabia.',
-            'Iberdrola': 'Standard specifications of Iberdrola, Power company in Spain.',
-            'REE': 'Standard specifications of REE, Power company in Spain.',
-        }
-        keys = file_name.split('/')
-        description = '\n'.join([description_mapping.get(k, "") for k in keys])
-        return description
+    parts = [types.Part.from_text(text=prompt)]
+    for label, image in zip(labels, images):
+        parts += [types.Part.from_text(text=label), _image_part(image, mime_type)]
+    contents = [types.Content(role="user", parts=parts)]
 
-    try:
-        parts = []
+    config = types.GenerateContentConfig(
+        temperature=0,
+        top_p=0.95,
+        max_output_tokens=max_output_tokens,
+        response_modalities=["TEXT"],
+        response_mime_type="application/json",
+        response_schema=MULTI_TEXT_RESPONSE_SCHEMA,
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ]
+    )
+    return contents, config, [prompt, *labels]
+
+
+async def extract_texts_async(images: List[Union[bytes, str]], page_numbers: List[int], client: genai.Client,
+                              mime_type: str = "image/png",
+                              cache: Optional[ResultCache] = None,
+                              image_digests: Optional[List[str]] = None,
+                              max_output_tokens: int = OCR_GROUP_TOKEN_BUDGET) -> Dict[int, str]:
+    """
+    같은 문서의 여러 페이지를 한 번 호출로 텍스트 추출, 반환: {페이지 번호: 추출된 텍스트}
+    오류는 예외로 전달, 응답이 스키마와 맞지 않거나(출력 토큰 초과로 잘린 JSON 포함) 페이지가 빠지면 ValidationError/ValueError
+    캐시에는 응답 JSON을 그대로 저장
+    """
+    contents, config, prompts = build_multi_text_request(images, page_numbers, mime_type, max_output_tokens)
+
+    cache_key, cached = await _cache_lookup_async(cache, images, prompts, EXTRACT_TEXT_MODEL, config, image_digests)
+    if cached is not None:
+        return MultiPageResult.model_validate_json(cached).by_page(page_numbers)
+
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_TEXT_MODEL,
+        contents=contents,
+        config=config
+    )
+    texts = MultiPageResult.model_validate_json(result.text or "").by_page(page_numbers)
+
+    if cache_key is not None:
+        await _cache_put_async(cache, cache_key, result.text)
+
+    return texts
+
+
+def _get_description(file_name: str):
+    description_mapping = {
+        '1. International Standards': 'Includes international standard and specification documents required for high voltage circuit breaker design and testing. Refer to the technical specifications of global standardization organizations such as IEC and IEEE. Required data for product development and design standard establishment.',
+        'IEC': 'Standard and specification documents on high-voltage equipment issued by the International Conference on Electrical Standards (IEC). Provide global standards for design, testing, safety standards, etc.',
+        'IEEE': 'The American Institute of Electrical and Electronics (IEEE) specifications and standards, including market-focused design standards and testing procedures in North America.',
+        '2. Type Test Reports': 'This is the type test result report of the actual manufactured circuit breaker. It is classified by model and year and details test items, insulation performance, and blocking performance.',
+        '145SP-3': 'Type test data for circuit breaker model 145SP-3.',
+        '145 kV 40 kA MS (2017)': 'A test report of a 145kV / 40kA class circuit breaker tested in 2017 of the model 145SP-3.',
+        '300SR': 'Type test data for circuit breaker model 300SR.',
+        '245 kV 50 kA MS (2020)': 'Test report of 245kV / 50kA circuit breaker tested in 2020 of Model 300SR.',
+        '245 kV 63 kA MS (2024)': 'Test report of 245kV / 63kA circuit breaker carried out in 2024 of Model 300SR.',
+        '3. Customer Standard Specifications': 'Standard Specifications by Country/Power Authority/Consumer.\nStandard Specification document provided by each country and customer. Refer to when delivering the product if you need a design that reflects customer requirements. This may include local application regulations and special requirements.',
+        'Endeavour Energy': 'Standard specifications of Endeavour Energy, Power company in Australia.',
+        'OETC': 'Standard specifications of OETC, Power company in Oman.',
+        'SEC': 'Standard specifications of SEC, Power company in Saudi Arabia.',
+        'Iberdrola': 'Standard specifications of Iberdrola, Power company in Spain.',
+        'REE': 'Standard specifications of REE, Power company in Spain.',
+    }
+    keys = file_name.split('/')
+    description = '\n'.join([description_mapping.get(k, "") for k in keys])
+    return description
+
+
+def build_summary_request(target_image: Union[bytes, str], context_images: List[Union[bytes, str]], file_name: str,
+                          mime_type: str, context_mime_type: Optional[str] = None,
+                          synopsis: Optional[str] = None) -> Tuple[list, types.GenerateContentConfig, List[str]]:
+    """
+    요약 요청 구성: (contents, config, 캐시 키용 프롬프트), 이미지는 바이트 또는 gs:// URI
+    context_mime_type: 컨텍스트 이미지 포맷이 대상 페이지와 다를 때 (contact sheet 등), 없으면 mime_type
+    synopsis: 문서 synopsis가 있으면 컨텍스트 이미지 대신 텍스트로 전달 (context_images는 보통 빈 목록)
+    """
+    parts = []
 
+    if synopsis:
+        prompt_1 = EXTRACT_SUMMARY_PROMPT_1_SYNOPSIS.format(
+            file_name=file_name,
+            description=_get_description(file_name),
+            synopsis=synopsis.strip(),
+        ).strip()
+    else:
         prompt_1 = EXTRACT_SUMMARY_PROMPT_1.format(
-            file_name=target_image_path,
-            description=get_description(target_image_path)
+            file_name=file_name,
+            description=_get_description(file_name)
         ).strip()
-        parts.append(types.Part.from_text(text=prompt_1))
-
-        for img_path in context_image_paths:
-            image_bytes = load_image_as_bytes(img_path)
-            parts.append(types.Part.from_bytes(data=image_bytes, mime_type="image/png"))
-
-        prompt_2 = EXTRACT_SUMMARY_PROMPT_2.strip()
-        parts.append(types.Part.from_text(text=prompt_2))
-
-        image_bytes = load_image_as_bytes(target_image_path)
-        parts.append(types.Part.from_bytes(data=image_bytes, mime_type="image/png"))
-        
-        prompt_3 = EXTRACT_SUMMARY_PROMPT_3.strip()
-        parts.append(types.Part.from_text(text=prompt_3))
-
-        contents = [
-            types.Content(
-                role="user",
-                parts=parts,
-            )
-        ]        
-
-        config = types.GenerateContentConfig(
-            temperature=0.2,
-            top_p=0.9,
-            max_output_tokens=512,
-            response_modalities=["TEXT"],
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-            ]
+    parts.append(types.Part.from_text(text=prompt_1))
+
+    for context_image in context_images:
+        parts.append(_image_part(context_image, context_mime_type or mime_type))
+
+    prompt_2 = EXTRACT_SUMMARY_PROMPT_2.strip()
+    parts.append(types.Part.from_text(text=prompt_2))
+
+    parts.append(_image_part(target_image, mime_type))
+    
+    prompt_3 = EXTRACT_SUMMARY_PROMPT_3.strip()
+    parts.append(types.Part.from_text(text=prompt_3))
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=parts,
         )
+    ]        
+
+    config = types.GenerateContentConfig(
+        temperature=0.2,
+        top_p=0.9,
+        max_output_tokens=512,
+        response_modalities=["TEXT"],
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ]
+    )
+    return contents, config, [prompt_1, prompt_2, prompt_3]
 
-        result = client.models.generate_content(
+
+def extract_summary(target_image: Union[bytes, str], context_images: List[Union[bytes, str]], client: genai.Client,
+                    file_name: str, mime_type: str = "image/png",
+                    cache: Optional[ResultCache] = None,
+                    image_digests: Optional[List[str]] = None,
+                    context_mime_type: Optional[str] = None,
+                    synopsis: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Gemini를 이용해 이미지 내용 요약/설명 추출
+    target_image / context_images: 페이지 이미지 바이트 또는 gs:// URI (mime_type 포맷, 컨텍스트가 다르면 context_mime_type)
+    file_name: 대상 페이지의 GCS 경로 (프롬프트의 파일명 및 폴더별 description 조회에 사용)
+    cache: 있으면 같은 이미지/프롬프트/모델/설정의 이전 결과를 재사용
+    image_digests: URI 요청의 캐시 키용 GCS md5Hash 목록 ([*context_images, target_image] 순서)
+    synopsis: 문서 synopsis (있으면 컨텍스트 이미지 대신 사용)
+    """
+    try:
+        contents, config, prompts = build_summary_request(
+            target_image, context_images, file_name, mime_type, context_mime_type, synopsis
+        )
+
+        cache_key, cached = _cache_lookup(
+            cache, [*context_images, target_image], prompts, EXTRACT_SUMMARY_MODEL, config, image_digests
+        )
+        if cached is not None:
+            return cached, None
+
+        result = generate_content(
+            client,
             model=EXTRACT_SUMMARY_MODEL,
             contents=contents,
             config=config
         )
 
+        if cache_key is not None and result.text is not None:
+            cache.put(cache_key, result.text)
+
         return result.text, None
 
     except Exception as e:
         return None, f"요약 추출 오류: {e}"
 
 
+async def extract_summary_async(target_image: Union[bytes, str], context_images: List[Union[bytes, str]],
+                                client: genai.Client, file_name: str, mime_type: str = "image/png",
+                                cache: Optional[ResultCache] = None,
+                                image_digests: Optional[List[str]] = None,
+                                context_mime_type: Optional[str] = None,
+                                synopsis: Optional[str] = None) -> Optional[str]:
+    """extract_summary의 비동기 버전 (client.aio), 오류는 예외로 전달"""
+    contents, config, prompts = build_summary_request(
+        target_image, context_images, file_name, mime_type, context_mime_type, synopsis
+    )
+
+    cache_key, cached = await _cache_lookup_async(
+        cache, [*context_images, target_image], prompts, EXTRACT_SUMMARY_MODEL, config, image_digests
+    )
+    if cached is not None:
+        return cached
+
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_SUMMARY_MODEL,
+        contents=contents,
+        config=config
+    )
+
+    if cache_key is not None and result.text is not None:
+        await _cache_put_async(cache, cache_key, result.text)
+
+    return result.text
+
+
+class FusedResult(BaseModel):
+    """텍스트 추출 + 요약 결합 요청의 응답"""
+    extracted_text: str
+    summary: str
+
+
+# FusedResult와 같은 구조 (pydantic 클래스 대신 Schema → 결과 캐시 키/배치 요청으로 직렬화 가능)
+FUSED_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "extracted_text": types.Schema(type=types.Type.STRING),
+        "summary": types.Schema(type=types.Type.STRING),
+    },
+    required=["extracted_text", "summary"],
+    property_ordering=["extracted_text", "summary"],
+)
+
+
+def build_fused_request(target_image: Union[bytes, str], context_images: List[Union[bytes, str]], file_name: str,
+                        mime_type: str, context_mime_type: Optional[str] = None,
+                        synopsis: Optional[str] = None) -> Tuple[list, types.GenerateContentConfig, List[str]]:
+    """
+    텍스트 추출 + 요약 결합 요청 구성: (contents, config, 캐시 키용 프롬프트)
+    요약 요청과 같은 컨텍스트(이미지 또는 synopsis) + 대상 페이지, 마지막 지시문만 JSON 응답(FusedResult)용으로 교체
+    """
+    contents, _, prompts = build_summary_request(
+        target_image, context_images, file_name, mime_type, context_mime_type, synopsis
+    )
+    prompt_3 = EXTRACT_FUSED_PROMPT_3.strip()
+    contents[0].parts[-1] = types.Part.from_text(text=prompt_3)
+
+    config = types.GenerateContentConfig(
+        temperature=0,
+        top_p=0.95,
+        max_output_tokens=8192 + 512,
+        response_modalities=["TEXT"],
+        response_mime_type="application/json",
+        response_schema=FUSED_RESPONSE_SCHEMA,
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ]
+    )
+    return contents, config, [*prompts[:-1], prompt_3]
+
+
+def extract_fused(target_image: Union[bytes, str], context_images: List[Union[bytes, str]], client: genai.Client,
+                  file_name: str, mime_type: str = "image/png",
+                  cache: Optional[ResultCache] = None,
+                  image_digests: Optional[List[str]] = None,
+                  context_mime_type: Optional[str] = None,
+                  synopsis: Optional[str] = None) -> Tuple[Optional[FusedResult], Optional[str]]:
+    """
+    Gemini 한 번 호출로 텍스트 추출(Markdown)과 요약을 함께 수행 (인자는 extract_summary와 동일)
+    캐시에는 응답 JSON을 그대로 저장
+    """
+    try:
+        contents, config, prompts = build_fused_request(
+            target_image, context_images, file_name, mime_type, context_mime_type, synopsis
+        )
+
+        cache_key, cached = _cache_lookup(
+            cache, [*context_images, target_image], prompts, EXTRACT_FUSED_MODEL, config, image_digests
+        )
+        if cached is not None:
+            return FusedResult.model_validate_json(cached), None
+
+        result = generate_content(
+            client,
+            model=EXTRACT_FUSED_MODEL,
+            contents=contents,
+            config=config
+        )
+        fused = FusedResult.model_validate_json(result.text or "")
+
+        if cache_key is not None:
+            cache.put(cache_key, result.text)
+
+        return fused, None
+
+    except Exception as e:
+        return None, f"텍스트 추출/요약 결합 오류: {e}"
+
+
+async def extract_fused_async(target_image: Union[bytes, str], context_images: List[Union[bytes, str]],
+                              client: genai.Client, file_name: str, mime_type: str = "image/png",
+                              cache: Optional[ResultCache] = None,
+                              image_digests: Optional[List[str]] = None,
+                              context_mime_type: Optional[str] = None,
+                              synopsis: Optional[str] = None) -> FusedResult:
+    """extract_fused의 비동기 버전 (client.aio), 오류는 예외로 전달 (응답 JSON 파싱 실패는 pydantic ValidationError)"""
+    contents, config, prompts = build_fused_request(
+        target_image, context_images, file_name, mime_type, context_mime_type, synopsis
+    )
+
+    cache_key, cached = await _cache_lookup_async(
+        cache, [*context_images, target_image], prompts, EXTRACT_FUSED_MODEL, config, image_digests
+    )
+    if cached is not None:
+        return FusedResult.model_validate_json(cached)
+
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_FUSED_MODEL,
+        contents=contents,
+        config=config
+    )
+    fused = FusedResult.model_validate_json(result.text or "")
+
+    if cache_key is not None:
+        await _cache_put_async(cache, cache_key, result.text)
+
+    return fused
+
+
+def build_synopsis_request(context_images: List[Union[bytes, str]], file_name: str,
+                           mime_type: str) -> Tuple[list, types.GenerateContentConfig, List[str]]:
+    """문서 synopsis 요청 구성: (contents, config, 캐시 키용 프롬프트), 이미지는 문서 앞 페이지 (또는 contact sheet)"""
+    prompt_1 = EXTRACT_SYNOPSIS_PROMPT_1.format(
+        file_name=file_name,
+        description=_get_description(file_name)
+    ).strip()
+    prompt_2 = EXTRACT_SYNOPSIS_PROMPT_2.strip()
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt_1),
+                *[_image_part(context_image, mime_type) for context_image in context_images],
+                types.Part.from_text(text=prompt_2),
+            ]
+        )
+    ]
+
+    config = types.GenerateContentConfig(
+        temperature=0.2,
+        top_p=0.9,
+        max_output_tokens=512,
+        response_modalities=["TEXT"],
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ]
+    )
+    return contents, config, [prompt_1, prompt_2]
+
+
+def extract_synopsis(context_images: List[Union[bytes, str]], client: genai.Client, file_name: str,
+                     mime_type: str = "image/png",
+                     cache: Optional[ResultCache] = None,
+                     image_digests: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Gemini를 이용해 문서 synopsis(제목, 범위, 모델, 연도 등) 추출 → 문서당 한 번, 페이지 요약의 텍스트 컨텍스트
+    file_name: PDF 또는 첫 페이지의 GCS 경로 (폴더별 description 조회에 사용)
+    """
+    try:
+        contents, config, prompts = build_synopsis_request(context_images, file_name, mime_type)
+
+        cache_key, cached = _cache_lookup(cache, context_images, prompts, EXTRACT_SUMMARY_MODEL, config, image_digests)
+        if cached is not None:
+            return cached, None
+
+        result = generate_content(
+            client,
+            model=EXTRACT_SUMMARY_MODEL,
+            contents=contents,
+            config=config
+        )
+
+        if cache_key is not None and result.text is not None:
+            cache.put(cache_key, result.text)
+
+        return result.text, None
+
+    except Exception as e:
+        return None, f"synopsis 추출 오류: {e}"
+
+
+async def extract_synopsis_async(context_images: List[Union[bytes, str]], client: genai.Client, file_name: str,
+                                 mime_type: str = "image/png",
+                                 cache: Optional[ResultCache] = None,
+                                 image_digests: Optional[List[str]] = None) -> Optional[str]:
+    """extract_synopsis의 비동기 버전 (client.aio), 오류는 예외로 전달"""
+    contents, config, prompts = build_synopsis_request(context_images, file_name, mime_type)
+
+    cache_key, cached = await _cache_lookup_async(cache, context_images, prompts, EXTRACT_SUMMARY_MODEL, config, image_digests)
+    if cached is not None:
+        return cached
+
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_SUMMARY_MODEL,
+        contents=contents,
+        config=config
+    )
+
+    if cache_key is not None and result.text is not None:
+        await _cache_put_async(cache, cache_key, result.text)
+
+    return result.text
+
+
+def _verify_request(image_bytes: bytes, candidate_text: str, mime_type: str) -> Tuple[list, types.GenerateContentConfig]:
+    prompt = VERIFY_TEXT_PROMPT.format(candidate_text=candidate_text).strip()
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+            ]
+        )
+    ]
+
+    config = types.GenerateContentConfig(
+        temperature=0,
+        max_output_tokens=8,
+        response_modalities=["TEXT"],
+    )
+    return contents, config
+
+
+def verify_text(image_bytes: bytes, candidate_text: str, client: genai.Client,
+                mime_type: str = "image/png") -> Tuple[Optional[bool], Optional[str]]:
+    """
+    유사 페이지의 기존 추출 텍스트가 이 페이지와 일치하는지 Gemini로 확인 (YES/NO)
+    전체 OCR 대비 출력 토큰이 거의 없음
+    반환: (일치 여부, 오류메시지)
+    """
+    try:
+        contents, config = _verify_request(image_bytes, candidate_text, mime_type)
+        result = generate_content(
+            client,
+            model=EXTRACT_TEXT_MODEL,
+            contents=contents,
+            config=config
+        )
+        answer = (result.text or "").strip().upper()
+        return answer.startswith("YES"), None
+
+    except Exception as e:
+        return None, f"텍스트 검증 오류: {e}"
+
+
+async def verify_text_async(image_bytes: bytes, candidate_text: str, client: genai.Client,
+                            mime_type: str = "image/png") -> bool:
+    """verify_text의 비동기 버전 (client.aio), 오류는 예외로 전달"""
+    contents, config = _verify_request(image_bytes, candidate_text, mime_type)
+    result = await generate_content_async(
+        client,
+        model=EXTRACT_TEXT_MODEL,
+        contents=contents,
+        config=config
+    )
+    return (result.text or "").strip().upper().startswith("YES")
+
+
 if __name__ == "__main__":
     ###################### 함수동작 TEST ###################
+    from config import PROJECT_ID, GENAI_LOCATION
+    genai_client = genai.Client(
+        vertexai=True,
+        project=PROJECT_ID,
+        location=GENAI_LOCATION,
+    )
+
     image_path = "sample.png"
-    res = extract_text(image_path=image_path)
+    res = extract_text(load_image_as_bytes(image_path), client=genai_client)
     print(res)
\ No newline at end of file
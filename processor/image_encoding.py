@@ -0,0 +1,70 @@
+import io
+import os
+from dataclasses import dataclass, field
+from typing import Dict
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """
+    페이지 이미지 인코딩 설정 (split 단계)
+    이미지 크기는 GCS 저장, 단계별 다운로드, Gemini 요청 페이로드에 모두 영향을 줌
+    """
+    name: str
+    format: str                 # PIL 저장 포맷: PNG / WEBP / JPEG
+    dpi: int = 300
+    grayscale: bool = False     # poppler에서 바로 grayscale로 래스터화
+    save_options: Dict = field(default_factory=dict)
+
+    @property
+    def extension(self) -> str:
+        return {"PNG": "png", "WEBP": "webp", "JPEG": "jpg"}[self.format]
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{'jpeg' if self.format == 'JPEG' else self.format.lower()}"
+
+    def encode(self, image: Image.Image) -> bytes:
+        """PIL 이미지 → 인코딩된 바이트 (디스크에 쓰지 않음)"""
+        if self.grayscale and image.mode != "L":
+            image = image.convert("L")
+        elif self.format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        buffer = io.BytesIO()
+        image.save(buffer, self.format, **self.save_options)
+        return buffer.getvalue()
+
+
+ENCODING_PROFILES: Dict[str, EncodingProfile] = {
+    profile.name: profile for profile in [
+        # 기존 출력과 동일 (300dpi RGB PNG, 기본 압축)
+        EncodingProfile("png", "PNG"),
+        # 무손실, 압축 레벨만 조정 (인코딩 시간 ↑, 크기 ↓)
+        EncodingProfile("png_compressed", "PNG", save_options={"compress_level": 9}),
+        # 무손실 grayscale (컬러 정보가 필요 없는 문서)
+        EncodingProfile("png_gray", "PNG", grayscale=True, save_options={"compress_level": 9}),
+        # 고품질 손실 압축
+        EncodingProfile("webp", "WEBP", save_options={"quality": 90, "method": 4}),
+        EncodingProfile("jpeg", "JPEG", save_options={"quality": 90, "optimize": True, "subsampling": 0}),
+        # 텍스트 위주 페이지용 저해상도 grayscale
+        EncodingProfile("png_gray_200dpi", "PNG", dpi=200, grayscale=True, save_options={"compress_level": 9}),
+    ]
+}
+
+
+def get_encoding_profile(name: str) -> EncodingProfile:
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"알 수 없는 인코딩 프로파일: {name} (사용 가능: {', '.join(ENCODING_PROFILES)})")
+    return ENCODING_PROFILES[name]
+
+
+def mime_type_for(gcs_path: str) -> str:
+    """페이지 이미지 경로의 확장자로 MIME 타입 결정 (프로파일 도입 전 페이지는 .png)"""
+    extension = os.path.splitext(gcs_path)[1].lstrip(".").lower()
+    for profile in ENCODING_PROFILES.values():
+        if profile.extension == extension:
+            return profile.mime_type
+    return "image/png"
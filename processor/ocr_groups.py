@@ -0,0 +1,51 @@
+import os
+import sys
+from typing import Dict, List, Optional
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from db.models import PDFPage
+from config import OCR_BYTES_PER_TOKEN
+
+# 페이지당 JSON 응답 항목(page_number, 따옴표/이스케이프) 여유분
+_PAGE_OVERHEAD_TOKENS = 32
+
+
+def estimate_page_tokens(image_size: int, bytes_per_token: int = OCR_BYTES_PER_TOKEN) -> int:
+    """
+    페이지 이미지 크기로 OCR 출력 토큰 수 추정
+    같은 인코딩 프로파일이면 글자가 많은 페이지일수록 압축 후 크기가 큼 (빈 페이지/짧은 페이지는 작음)
+    """
+    return image_size // max(1, bytes_per_token) + _PAGE_OVERHEAD_TOKENS
+
+
+def group_pages(pages: List[PDFPage], image_sizes: Dict[str, int], max_pages: int, token_budget: int,
+                bytes_per_token: int = OCR_BYTES_PER_TOKEN) -> List[List[PDFPage]]:
+    """
+    여러 페이지 OCR 요청 단위로 묶음 (문서/페이지 번호 순)
+    - 같은 문서의 연속 페이지만, 최대 max_pages장
+    - 예상 출력 토큰 합이 token_budget 이하 (글자가 많은 페이지는 혼자 요청)
+    image_sizes: {gcs_path: 이미지 크기}, 크기를 모르는 페이지는 묶지 않음
+    """
+    groups: List[List[PDFPage]] = []
+    current: List[PDFPage] = []
+    tokens = 0
+    for page in sorted(pages, key=lambda p: (p.doc_id, int(p.page_number))):
+        size: Optional[int] = image_sizes.get(page.gcs_path)
+        estimate = token_budget if size is None else estimate_page_tokens(size, bytes_per_token)
+        fits = (
+            current
+            and current[-1].doc_id == page.doc_id
+            and int(current[-1].page_number) + 1 == int(page.page_number)
+            and len(current) < max_pages
+            and tokens + estimate <= token_budget
+        )
+        if current and not fits:
+            groups.append(current)
+            current, tokens = [], 0
+        current.append(page)
+        tokens += estimate
+    if current:
+        groups.append(current)
+    return groups
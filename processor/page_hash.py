@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# 16x16 dHash = 256bit (64 hex). 8x8(64bit)은 레이아웃이 같은 텍스트 페이지끼리 구분하지 못함
+HASH_SIZE = 16
+# LSH 밴드 수: 해밍 거리가 BANDS 미만이면 최소 한 밴드는 완전히 일치 (비둘기집 원리) → 후보 누락 없음
+BANDS = 16
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> str:
+    """
+    difference hash: 축소한 grayscale 이미지에서 가로로 인접한 픽셀 밝기 비교
+    래스터화 노이즈/해상도/압축 차이에는 거의 변하지 않음
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+class PageHashIndex:
+    """
+    페이지 dHash 근접 검색 (banded LSH)
+    - 해시를 BANDS개 구간으로 나눠서 구간 값이 같은 페이지만 후보로 보고 해밍 거리 계산
+    - max_distance < BANDS 이면 거리 이내의 페이지는 반드시 후보에 포함됨
+    """
+    def __init__(self, bands: int = BANDS) -> None:
+        self.bands = bands
+        self._buckets: List[Dict[str, List[str]]] = [{} for _ in range(bands)]
+        self._hashes: Dict[str, str] = {}  # page_id → hash
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _band_keys(self, page_hash: str) -> List[str]:
+        width = len(page_hash) // self.bands
+        return [page_hash[i * width:(i + 1) * width] for i in range(self.bands)]
+
+    def add(self, page_id: str, page_hash: str) -> None:
+        if page_id in self._hashes:
+            return
+        self._hashes[page_id] = page_hash
+        for band, key in enumerate(self._band_keys(page_hash)):
+            self._buckets[band].setdefault(key, []).append(page_id)
+
+    def query(self, page_hash: str, max_distance: int, exclude: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """가장 가까운 페이지 (page_id, distance), max_distance 초과면 None"""
+        best: Optional[Tuple[str, int]] = None
+        seen = set()
+        for band, key in enumerate(self._band_keys(page_hash)):
+            for page_id in self._buckets[band].get(key, ()):
+                if page_id in seen or page_id == exclude:
+                    continue
+                seen.add(page_id)
+                distance = hamming_distance(page_hash, self._hashes[page_id])
+                if distance <= max_distance and (best is None or distance < best[1]):
+                    best = (page_id, distance)
+        return best
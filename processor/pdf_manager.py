@@ -1,25 +1,51 @@
+import io
 import os
 import sys
 import json
+import asyncio
 import tempfile
-from typing import List, Optional, Tuple, Dict
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Dict
 
-from pdf2image import convert_from_path
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
 from google import genai
 from google.genai import types
+from google.genai import errors as genai_errors
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
 from storage.gcs_client import GCSStorageClient
-from processor.extractor import extract_text, extract_summary
-from processor.embedder import get_text_embedding
+from processor.extractor import (
+    extract_text, extract_summary, verify_text, extract_synopsis, extract_fused,
+    extract_text_async, extract_summary_async, verify_text_async, extract_synopsis_async, extract_fused_async,
+    extract_texts_async,
+)
+from processor.embedder import get_text_embedding, get_text_embedding_async, get_text_embeddings_async, batch_texts
+from processor.async_engine import is_quota_error
 from processor.elastic import ESConnector
+from processor.split_engine import SplitEngine, page_windows
+from processor.image_encoding import EncodingProfile, get_encoding_profile, mime_type_for
+from processor.text_layer import TextLayerResult, extract_text_layers
+from processor.result_cache import ResultCache
+from processor.page_hash import PageHashIndex, dhash
+from processor.context_cache import ContextCache, DocumentContext
+from processor.ocr_groups import group_pages
+from processor.context_sheet import (
+    CONTEXT_PAGES, CONTEXT_SHEET_MIME_TYPE, context_sheet_path, build_context_sheet, build_context_sheet_from_bytes,
+)
 from db.repository import Repository
+from db.session import SessionLocal
 from db.models import PDFPage, PageStatus, PDFDocument
 from utils.utils import split_file_path
 from utils.logger import get_logger
-from config import LOG_LEVEL, INDEX_NAME
+from config import (
+    LOG_LEVEL, INDEX_NAME, SPLIT_PAGE_WINDOW, SPLIT_ENCODING_PROFILE, TEXT_LAYER_MODE, TEXT_LAYER_MIN_SCORE,
+    PHASH_REUSE_MODE, PHASH_MAX_DISTANCE, GENAI_IMAGE_SOURCE, SUMMARY_CONTEXT_MODE, CONTEXT_SHEET_DPI, CONTEXT_SHEET_TILE_PX,
+    OCR_PAGES_PER_REQUEST, OCR_GROUP_TOKEN_BUDGET,
+)
 
 
 
@@ -28,68 +54,412 @@ class PDFManager:
                  storage_client: GCSStorageClient, 
                  repository: Repository, 
                  genai_client: genai.Client,
-                 els_client: ESConnector) -> None:
+                 els_client: ESConnector,
+                 split_window: int = SPLIT_PAGE_WINDOW,
+                 split_engine: Optional[SplitEngine] = None,
+                 encoding_profile: str = SPLIT_ENCODING_PROFILE,
+                 text_layer_mode: str = TEXT_LAYER_MODE,
+                 result_cache: Optional[ResultCache] = None,
+                 phash_reuse_mode: str = PHASH_REUSE_MODE,
+                 phash_max_distance: int = PHASH_MAX_DISTANCE,
+                 image_source: str = GENAI_IMAGE_SOURCE,
+                 context_cache: Optional[ContextCache] = None,
+                 summary_context_mode: str = SUMMARY_CONTEXT_MODE,
+                 ocr_pages_per_request: int = OCR_PAGES_PER_REQUEST,
+                 ocr_group_token_budget: int = OCR_GROUP_TOKEN_BUDGET,
+                 session_factory: Callable[..., Session] = SessionLocal) -> None:
         self.storage = storage_client
         self.repo = repository
+        self.session_factory = session_factory  # 비동기 경로의 DB 작업용 (self.repo의 Session은 이벤트 루프 스레드 전용)
         self.genai = genai_client
         self.els =  els_client
+        self.split_window = max(1, split_window)  # 한 번에 래스터화할 페이지 수
+        self.split_engine = split_engine  # 있으면 프로세스 풀 래스터화 + 병렬 업로드
+        self.encoding_profile: EncodingProfile = get_encoding_profile(encoding_profile)
+        self.text_layer_mode = text_layer_mode  # "auto"면 split 시 텍스트 레이어 추출
+        self.result_cache = result_cache  # 있으면 OCR/요약 결과 재사용
+        self.phash_reuse_mode = phash_reuse_mode  # off / verify / reuse
+        self.phash_max_distance = phash_max_distance
+        self.page_index: Optional[PageHashIndex] = None  # build_page_index()로 생성
+        self.image_source = image_source  # "bytes" / "uri" (Gemini 요청에 이미지를 넣는 방식)
+        self.context_cache = context_cache if context_cache is not None else ContextCache()  # 요약 컨텍스트 (문서별)
+        self._context_locks: Dict[str, asyncio.Lock] = {}
+        self._context_waiters: Dict[str, int] = {}  # 문서별 잠금을 기다리거나 잡고 있는 요청 수
+        self.summary_context_mode = summary_context_mode  # "pages" / "sheet" / "synopsis"
+        self.ocr_pages_per_request = max(1, ocr_pages_per_request)  # 1이면 페이지마다 OCR 요청
+        self.ocr_group_token_budget = ocr_group_token_budget  # 여러 페이지 OCR 응답의 출력 토큰 상한
         self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
 
 
-    def invoke_split(self, gcs_pdf_path: str) -> Dict[str, str]:
+    def invoke_split(self, gcs_pdf_path: str,
+                     source_generation: Optional[int] = None,
+                     completed_pages: Optional[Dict[int, str]] = None,
+                     on_pages: Optional[Callable[[Dict[int, str], Dict[int, Tuple[str, float]], Dict[int, str]], None]] = None,
+                     on_context_image: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
         """
         GCS에 있는 PDF를 이미지로 분할한 후 GCS에 업로드
         {page_number: gcs_image_path} 딕셔너리 형태로 반환
+        메모리 사용량이 문서 길이가 아닌 split_window(페이지 수)에 비례하도록 구간 단위로 변환
+        페이지 이미지는 메모리에서 바로 업로드 (poppler가 파일 경로를 요구하므로 PDF만 임시 파일로 받음)
+        이미지 포맷/DPI/색상은 self.encoding_profile을 따름 (확장자도 프로파일에 맞춤)
+
+        중단된 split 재개:
+        - completed_pages: 이미 DB에 등록된 페이지 → 건너뜀
+        - source_generation: 원본 PDF generation. 업로드 객체 메타데이터에 기록하고,
+          같은 generation으로 이미 업로드된 페이지(등록 전 중단)는 다시 변환하지 않음
+          (dHash도 메타데이터에 기록 → 복구한 페이지도 dHash와 함께 등록)
+        - on_pages: 업로드가 끝난 페이지를 구간 단위로 전달 (체크포인트 등록용)
+          on_pages(page_infos, text_layers, page_hashes)
+          → text_layers는 text_layer_mode="auto"일 때 해당 페이지의 (텍스트 레이어, 품질 점수), page_hashes는 페이지 dHash
+        - on_context_image: summary_context_mode="sheet"이면 앞 페이지 contact sheet 업로드 후 경로 전달
         """
+        profile = self.encoding_profile
         with tempfile.TemporaryDirectory() as tmpdir:
             # PDF 임시 다운로드
             local_pdf_path = os.path.join(tmpdir, "doc.pdf")
             self.storage.download_file(gcs_pdf_path, local_pdf_path, self.storage.source_bucket)
-
-            # PDF → 이미지 변환
-            images = convert_from_path(local_pdf_path, dpi=300)
+            page_count = pdfinfo_from_path(local_pdf_path)["Pages"]
 
             # 이미지 GCS 업로드 경로 설정
             parent_dir, pdf_filename = split_file_path(gcs_pdf_path)
             pdf_basename = os.path.splitext(pdf_filename)[0]
             gcs_image_dir = f"{parent_dir}/{pdf_basename}" if parent_dir else pdf_basename
             
-            page_infos: Dict[int, str] = {}  # {page_number: gcs_image_path}
+            def gcs_path_for(page_number: int) -> str:
+                return f"{gcs_image_dir}/{pdf_basename}-page-{page_number:05}.{profile.extension}"
+
+            page_infos: Dict[int, str] = {  # {page_number: gcs_image_path}
+                page_number: gcs_path for page_number, gcs_path in (completed_pages or {}).items()
+                if page_number <= page_count
+            }
+            metadata = {"source_generation": str(source_generation)} if source_generation else None
+
+            # 텍스트 레이어 추출 (아직 등록되지 않은 페이지만, 로컬 처리)
+            text_layers: Dict[int, TextLayerResult] = {}
+            if self.text_layer_mode == "auto":
+                text_layers = extract_text_layers(
+                    local_pdf_path, [page_number for page_number in range(1, page_count + 1) if page_number not in page_infos]
+                )
+                usable = sum(1 for layer in text_layers.values() if layer.score >= TEXT_LAYER_MIN_SCORE)
+                self.logger.debug(f" └── Text layer usable for {usable}/{len(text_layers)} pages: {gcs_pdf_path}")
+
+            def checkpoint(window_infos: Dict[int, str], page_hashes: Optional[Dict[int, str]] = None) -> None:
+                if on_pages is not None:
+                    on_pages(
+                        window_infos,
+                        {p: (text_layers[p].text, text_layers[p].score) for p in window_infos if p in text_layers},
+                        page_hashes or {},
+                    )
+
+            # 업로드는 끝났지만 등록 전에 중단된 페이지 복구
+            if metadata:
+                uploaded = self.storage.list_custom_metadata(f"{gcs_image_dir}/", self.storage.target_bucket)
+                recovered = {
+                    page_number: gcs_path_for(page_number)
+                    for page_number in range(1, page_count + 1)
+                    if page_number not in page_infos
+                    and uploaded.get(gcs_path_for(page_number), {}).get("source_generation") == metadata["source_generation"]
+                }
+                if recovered:
+                    recovered_hashes = {
+                        page_number: uploaded[gcs_path].get("phash") or self._download_dhash(gcs_path)
+                        for page_number, gcs_path in recovered.items()
+                    }
+                    checkpoint(recovered, recovered_hashes)
+                    page_infos.update(recovered)
+
+            missing_pages = [page_number for page_number in range(1, page_count + 1) if page_number not in page_infos]
+            if len(missing_pages) < page_count:
+                self.logger.debug(f" └── Resuming split: {page_count - len(missing_pages)}/{page_count} pages already done: {gcs_pdf_path}")
+
+            if self.split_engine is not None:
+                page_infos.update(
+                    self.split_engine.split(local_pdf_path, missing_pages, profile, gcs_path_for, metadata, checkpoint)
+                )
+                missing_pages = []
+
+            for first_page, last_page in page_windows(missing_pages, self.split_window):
+                # PDF → 이미지 변환 (현재 구간만 메모리에 올림)
+                images = convert_from_path(
+                    local_pdf_path, dpi=profile.dpi, first_page=first_page, last_page=last_page, grayscale=profile.grayscale
+                )
 
-            # 이미지 저장 및 GCS 업로드
-            for i, image in enumerate(images, start=1):
-                local_image_path = os.path.join(tmpdir, f"page-{i:05d}.png")
-                image.save(local_image_path, "PNG")
+                # 이미지 인코딩 후 GCS 업로드 → 다음 구간 변환 전에 메모리 해제
+                window_infos: Dict[int, str] = {}
+                window_hashes: Dict[int, str] = {}
+                for i, image in enumerate(images, start=first_page):
+                    image_bytes = profile.encode(image)
+                    window_hashes[i] = dhash(image)
+                    image.close()
 
-                gcs_image_path = f"{gcs_image_dir}/{pdf_basename}-page-{i:05}.png"
-                uploaded_path = self.storage.upload_file(local_image_path, gcs_image_path, self.storage.target_bucket)
+                    uploaded_path = self.storage.upload_bytes(
+                        image_bytes, gcs_path_for(i), self.storage.target_bucket, profile.mime_type,
+                        {**(metadata or {}), "phash": window_hashes[i]}
+                    )
 
-                page_infos[i] = uploaded_path
+                    window_infos[i] = uploaded_path
+
+                del images
+                checkpoint(window_infos, window_hashes)
+                page_infos.update(window_infos)
+                self.logger.debug(f" └── Split pages {first_page}-{last_page}/{page_count}: {gcs_pdf_path}")
+
+            # 로컬 PDF가 있을 때 contact sheet 생성 (앞 페이지만 저해상도로 다시 래스터화)
+            if on_context_image is not None and self.summary_context_mode == "sheet" and page_count > 0:
+                sheet_path = self._upload_context_sheet(
+                    local_pdf_path, min(page_count, CONTEXT_PAGES), context_sheet_path(f"{gcs_image_dir}/{pdf_basename}")
+                )
+                if sheet_path is not None:
+                    on_context_image(sheet_path)
         
             return page_infos
 
 
+    def _download_dhash(self, gcs_path: str) -> Optional[str]:
+        """업로드된 페이지 이미지의 dHash (메타데이터에 dHash가 없는 이전 업로드용), 실패하면 None"""
+        try:
+            with Image.open(io.BytesIO(self.storage.download_bytes(gcs_path, self.storage.target_bucket))) as image:
+                return dhash(image)
+        except Exception as e:
+            self.logger.warning(f" └── Failed to hash recovered page {gcs_path}: {e}")
+            return None
+
+
+    def _upload_context_sheet(self, local_pdf_path: str, last_page: int, gcs_path: str) -> Optional[str]:
+        """앞 페이지 contact sheet 업로드, 반환: GCS 경로 (실패해도 split은 성공 처리 → 요약 시 다시 생성)"""
+        try:
+            images = convert_from_path(local_pdf_path, dpi=CONTEXT_SHEET_DPI, first_page=1, last_page=last_page)
+            sheet = build_context_sheet(images, CONTEXT_SHEET_TILE_PX)
+            for image in images:
+                image.close()
+            return self.storage.upload_bytes(sheet, gcs_path, self.storage.target_bucket, CONTEXT_SHEET_MIME_TYPE)
+        except Exception as e:
+            self.logger.warning(f" └── Failed to create context sheet: {gcs_path} ({e})")
+            return None
+
+
     def invoke_extraction(self, gcs_image_path: str) -> Tuple[str, str | None, PageStatus]:
         """
         Gemini를 이용해서 텍스트 추출 수행
         반환: (추출된 텍스트, 오류메시지, 상태)
         """
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                # 이미지 임시 다운로드
-                local_image_path = os.path.join(tmpdir, os.path.basename(gcs_image_path))
-                self.storage.download_file(gcs_image_path, local_image_path, self.storage.target_bucket)
+            if self.image_source == "uri":
+                # Gemini가 GCS에서 직접 읽음 (워커를 거치는 이미지 바이트 없음)
+                text, error = extract_text(
+                    self._uri(gcs_image_path), self.genai, mime_type=mime_type_for(gcs_image_path),
+                    cache=self.result_cache, image_digests=self._digests([gcs_image_path]),
+                )
+                if error is None:
+                    return text or "", None, PageStatus.SUCCESS
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {gcs_image_path} ({error})")
+
+            # 이미지를 메모리로 다운로드
+            image_bytes = self.storage.download_bytes(gcs_image_path, self.storage.target_bucket)
 
-                # 텍스트 추출
-                text, error = extract_text(local_image_path, self.genai)
-                status = PageStatus.SUCCESS if error is None else PageStatus.FAILED
+            # 텍스트 추출
+            text, error = extract_text(image_bytes, self.genai, mime_type=mime_type_for(gcs_image_path), cache=self.result_cache)
+            status = PageStatus.SUCCESS if error is None else PageStatus.FAILED
 
-                return text or "", error, status
+            return text or "", error, status
         
         except Exception as e:
             return "", f"Extraction Exception: {e}", PageStatus.FAILED
 
 
+    async def invoke_extraction_async(self, gcs_image_path: str) -> str:
+        """invoke_extraction의 비동기 버전 (AsyncEngine용), 오류는 예외로 전달"""
+        if self.image_source == "uri":
+            try:
+                text = await extract_text_async(
+                    self._uri(gcs_image_path), self.genai, mime_type=mime_type_for(gcs_image_path),
+                    cache=self.result_cache, image_digests=await self._digests_async([gcs_image_path]),
+                )
+                return text or ""
+            except Exception as e:
+                if is_quota_error(e):
+                    raise
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {gcs_image_path} ({e})")
+
+        image_bytes = await asyncio.to_thread(self.storage.download_bytes, gcs_image_path, self.storage.target_bucket)
+        text = await extract_text_async(image_bytes, self.genai, mime_type=mime_type_for(gcs_image_path), cache=self.result_cache)
+        return text or ""
+
+
+    def group_pages_for_ocr(self, pages: List[PDFPage]) -> List[List[PDFPage]]:
+        """
+        OCR 요청 단위로 페이지 묶음 (같은 문서의 연속 페이지, 예상 출력 토큰 합 ≤ ocr_group_token_budget)
+        페이지 이미지 크기는 문서마다 목록 조회 1회 (본문 다운로드 없음), 조회 실패한 문서의 페이지는 묶지 않음
+        """
+        if self.ocr_pages_per_request <= 1:
+            return [[page] for page in pages]
+
+        image_sizes: Dict[str, int] = {}
+        for prefix in {page.gcs_path.rsplit("-page-", 1)[0] for page in pages}:
+            try:
+                image_sizes.update(self.storage.list_sizes(f"{prefix}-page-", self.storage.target_bucket))
+            except Exception as e:
+                self.logger.warning(f" └── Failed to list page image sizes: {prefix} ({e})")
+        return group_pages(pages, image_sizes, self.ocr_pages_per_request, self.ocr_group_token_budget)
+
+
+    async def invoke_extraction_group_async(self, pages: List[PDFPage]) -> Optional[Dict[str, str]]:
+        """
+        같은 문서의 연속 페이지를 한 요청으로 텍스트 추출 (AsyncEngine용), 반환: {page_id: 추출된 텍스트}
+        응답이 잘못되면(JSON 형식 오류, 출력 토큰 초과로 잘린 응답, 페이지 누락) None → 호출한 쪽에서 페이지별 항목으로 다시 처리
+        (페이지별 요청이 묶음 요청 하나의 요청 슬롯 안에서 실행되지 않도록), 그 외 오류는 예외로 전달
+        """
+        if len(pages) <= 1:
+            return {page.page_id: await self.invoke_extraction_async(page.gcs_path) for page in pages}
+
+        page_numbers = [int(page.page_number) for page in pages]
+        try:
+            texts = await self._extract_group_async(pages, page_numbers)
+            return {page.page_id: texts[page_number] or "" for page, page_number in zip(pages, page_numbers)}
+        except ValueError as e:  # pydantic ValidationError 포함
+            self.logger.warning(f" └── Invalid multi-page response, falling back to per-page extraction: {pages[0].gcs_path} +{len(pages) - 1} pages ({e})")
+            return None
+
+
+    async def _extract_group_async(self, pages: List[PDFPage], page_numbers: List[int]) -> Dict[int, str]:
+        """여러 페이지 OCR 요청 (uri 모드는 실패하면 inline bytes로 재시도), 반환: {페이지 번호: 텍스트}"""
+        gcs_paths = [page.gcs_path for page in pages]
+        # 같은 문서의 페이지는 같은 프로파일로 split 됨
+        mime_type = mime_type_for(gcs_paths[0])
+        if self.image_source == "uri":
+            try:
+                return await extract_texts_async(
+                    [self._uri(p) for p in gcs_paths], page_numbers, self.genai, mime_type=mime_type,
+                    cache=self.result_cache, image_digests=await self._digests_async(gcs_paths),
+                    max_output_tokens=self.ocr_group_token_budget,
+                )
+            except ValueError:
+                raise
+            except Exception as e:
+                if is_quota_error(e):
+                    raise
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {gcs_paths[0]} +{len(gcs_paths) - 1} pages ({e})")
+
+        images = await asyncio.gather(*[
+            asyncio.to_thread(self.storage.download_bytes, gcs_path, self.storage.target_bucket) for gcs_path in gcs_paths
+        ])
+        return await extract_texts_async(
+            list(images), page_numbers, self.genai, mime_type=mime_type,
+            cache=self.result_cache, max_output_tokens=self.ocr_group_token_budget,
+        )
+
+
+    async def _db_async(self, work: Callable[[Repository], Any]) -> Any:
+        """
+        비동기 경로의 DB 조회/갱신: 호출마다 새 Session으로 스레드에서 실행 (이벤트 루프와 self.repo의 Session을 막지 않음)
+        Session을 닫은 뒤에도 반환된 객체의 컬럼 값은 그대로 읽을 수 있음 (expire_on_commit=False)
+        """
+        def run() -> Any:
+            with self.session_factory(expire_on_commit=False) as session:
+                return work(Repository(session))
+        return await asyncio.to_thread(run)
+
+
+    def _uri(self, gcs_path: str) -> str:
+        return f"gs://{self.storage.target_bucket}/{gcs_path}"
+
+
+    def _digests(self, gcs_paths: List[str]) -> Optional[List[str]]:
+        """URI 요청의 결과 캐시 키용 md5Hash (메타데이터만 조회), 캐시를 사용하지 않거나 md5가 없으면 None"""
+        if self.result_cache is None:
+            return None
+        digests = [self.storage.get_md5(gcs_path, self.storage.target_bucket) for gcs_path in gcs_paths]
+        return None if None in digests else digests
+
+
+    async def _digests_async(self, gcs_paths: List[str]) -> Optional[List[str]]:
+        if self.result_cache is None:
+            return None
+        digests = await asyncio.gather(*[
+            asyncio.to_thread(self.storage.get_md5, gcs_path, self.storage.target_bucket) for gcs_path in gcs_paths
+        ])
+        return None if None in digests else list(digests)
+
+
+    def build_page_index(self) -> int:
+        """추출이 끝난 페이지의 dHash로 유사 페이지 인덱스 생성, 반환: 인덱스 크기"""
+        self.page_index = PageHashIndex()
+        for page_id, phash in self.repo.get_phash_sources():
+            self.page_index.add(page_id, phash)
+        return len(self.page_index)
+
+
+    def index_page(self, page: PDFPage) -> None:
+        """추출에 성공한 페이지를 인덱스에 추가 (같은 실행의 이후 페이지도 재사용 가능)"""
+        if self.page_index is not None and page.phash:
+            self.page_index.add(page.page_id, page.phash)
+
+
+    def find_reusable_page(self, page: PDFPage) -> Tuple[Optional[PDFPage], str | None]:
+        """
+        dHash 거리가 phash_max_distance 이하인 추출 완료 페이지 조회
+        verify 모드면 Gemini로 후보 텍스트가 이 페이지와 일치하는지 확인 (전체 OCR보다 출력 토큰이 훨씬 적음)
+        반환: (재사용할 원본 페이지 또는 None, 오류메시지)
+        """
+        source = self._reuse_candidate(page)
+        if source is None:
+            return None, None
+
+        if self.phash_reuse_mode == "verify":
+            try:
+                image_bytes = self.storage.download_bytes(page.gcs_path, self.storage.target_bucket)
+                verified, error = verify_text(image_bytes, source.extracted_text, self.genai, mime_type=mime_type_for(page.gcs_path))
+            except Exception as e:
+                verified, error = None, f"Verification Exception: {e}"
+            if not verified:
+                return None, error
+
+        return source, None
+
+
+    async def find_reusable_page_async(self, page: PDFPage) -> Optional[PDFPage]:
+        """
+        find_reusable_page의 비동기 버전 (AsyncEngine용)
+        quota 오류는 예외로 전달 (다시 큐에 넣음), 그 외 검증 오류는 재사용하지 않고 OCR 진행
+        """
+        if self.page_index is None or not page.phash:
+            return None
+        source = await self._db_async(lambda repo: self._reuse_candidate(page, repo))
+        if source is None:
+            return None
+
+        if self.phash_reuse_mode == "verify":
+            try:
+                image_bytes = await asyncio.to_thread(self.storage.download_bytes, page.gcs_path, self.storage.target_bucket)
+                verified = await verify_text_async(image_bytes, source.extracted_text, self.genai, mime_type=mime_type_for(page.gcs_path))
+            except Exception as e:
+                if is_quota_error(e):
+                    raise
+                self.logger.warning(f" └── Near-duplicate verification failed: {page.gcs_path} - {e}")
+                return None
+            if not verified:
+                return None
+
+        return source
+
+
+    def _reuse_candidate(self, page: PDFPage, repo: Optional[Repository] = None) -> Optional[PDFPage]:
+        """dHash 인덱스에서 가장 가까운 추출 완료 페이지 (검증 전), repo: 조회할 Repository (기본 self.repo)"""
+        if self.page_index is None or not page.phash:
+            return None
+
+        match = self.page_index.query(page.phash, self.phash_max_distance, exclude=page.page_id)
+        if match is None:
+            return None
+
+        source = (repo or self.repo).session.get(PDFPage, match[0])
+        if source is None or source.extracted != PageStatus.SUCCESS or not source.extracted_text:
+            return None
+
+        self.logger.debug(f" └── Near-duplicate of {source.page_id} (distance {match[1]}): {page.gcs_path}")
+        return source
+
+
     def invoke_summary(self, gcs_image_path: str) -> Tuple[str, str | None, PageStatus]:
         """
         Gemini를 이용해서 해당 이미지의 문서의 첫 5페이지를 참고해서 해당 페이지의 요약 수행
@@ -101,31 +471,289 @@ class PDFManager:
             if not page:
                 return "", f"DB에 해당 페이지 정보 없음: {gcs_image_path}", PageStatus.FAILED
 
-            # 첫 5페이지 GCS Path 조회
-            doc_id = page.doc_id
-            gcs_context_paths = self.repo.get_first_n_pages(doc_id, 5)
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                # 현재 페이지 다운로드
-                local_image_path = os.path.join(tmpdir, os.path.basename(gcs_image_path))
-                self.storage.download_file(gcs_image_path, local_image_path, self.storage.target_bucket)
-
-                # 컨텍스트 페이지 다운로드
-                local_context_paths = []
-                for gcs_path in gcs_context_paths:
-                    local_path = os.path.join(tmpdir, os.path.basename(gcs_path))
-                    self.storage.download_file(gcs_path, local_path, self.storage.target_bucket)
-                    local_context_paths.append(local_path)
-
-                # 요약 추출
-                summary, error = extract_summary(local_image_path, local_context_paths, self.genai)
-                status = PageStatus.SUCCESS if error is None else PageStatus.FAILED
-                return summary or "", error, status
+            summary, error = self._request_with_context(page, extract_summary)
+            status = PageStatus.SUCCESS if error is None else PageStatus.FAILED
+            return summary or "", error, status
         
         except Exception as e:
             return "", f"Summary Exception: {e}", PageStatus.FAILED
 
 
+    async def invoke_summary_async(self, page: PDFPage) -> str:
+        """invoke_summary의 비동기 버전 (AsyncEngine용), 오류는 예외로 전달"""
+        summary = await self._request_with_context_async(page, extract_summary_async)
+        return summary or ""
+
+
+    def invoke_fused(self, gcs_image_path: str) -> Tuple[str, str | None, str | None, PageStatus]:
+        """
+        Gemini 한 번 호출로 텍스트 추출 + 요약 (FUSED_OCR_SUMMARY)
+        결합 요청이 실패하면 텍스트 추출만 다시 수행 (요약은 None → 요약 단계에서 처리)
+        반환: (추출된 텍스트, 요약 또는 None, 오류메시지, 상태)
+        """
+        try:
+            page = self.repo.session.query(PDFPage).filter_by(gcs_path=gcs_image_path).first()
+            if not page:
+                return "", None, f"DB에 해당 페이지 정보 없음: {gcs_image_path}", PageStatus.FAILED
+
+            fused, error = self._request_with_context(page, extract_fused)
+            if error is None:
+                return fused.extracted_text, fused.summary, None, PageStatus.SUCCESS
+            self.logger.warning(f" └── Fused request failed, falling back to text extraction: {gcs_image_path} ({error})")
+
+            text, error, status = self.invoke_extraction(gcs_image_path)
+            return text, None, error, status
+
+        except Exception as e:
+            return "", None, f"Extraction Exception: {e}", PageStatus.FAILED
+
+
+    async def invoke_fused_async(self, page: PDFPage) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        invoke_fused의 비동기 버전 (AsyncEngine용), 반환: (추출된 텍스트, 요약 또는 None)
+        응답 JSON이 스키마와 맞지 않으면 None → 호출한 쪽에서 텍스트 추출 항목으로 다시 처리
+        (대체 요청이 결합 요청 모델의 요청 슬롯 안에서 실행되지 않도록), 그 외 오류는 예외로 전달
+        """
+        try:
+            fused = await self._request_with_context_async(page, extract_fused_async)
+            return fused.extracted_text, fused.summary
+        except ValidationError as e:
+            self.logger.warning(f" └── Invalid fused response, falling back to text extraction: {page.gcs_path} ({e})")
+            return None
+
+
+    def _request_with_context(self, page: PDFPage, request: Callable) -> Tuple[Any, str | None]:
+        """
+        문서 컨텍스트(이미지 또는 synopsis) + 대상 페이지로 요약 계열 요청 (extract_summary / extract_fused)
+        반환: request의 (결과, 오류메시지), uri 모드는 실패하면 inline bytes로 재시도
+        """
+        gcs_image_path = page.gcs_path
+        if self.image_source == "uri":
+            context = self._document_context(page.doc_id, images=False)
+            target_digest = self._digests([gcs_image_path])
+            result, error = request(
+                self._uri(gcs_image_path), [self._uri(p) for p in context.paths], self.genai,
+                file_name=gcs_image_path, mime_type=mime_type_for(gcs_image_path),
+                cache=self.result_cache,
+                image_digests=None if context.digests is None or target_digest is None else [*context.digests, *target_digest],
+                context_mime_type=context.mime_type, synopsis=context.synopsis,
+            )
+            if error is None:
+                return result, None
+            self.logger.warning(f" └── URI request failed, retrying with inline bytes: {gcs_image_path} ({error})")
+
+        # 현재 페이지 다운로드 (컨텍스트 페이지는 문서별로 한 번만)
+        image_bytes = self.storage.download_bytes(gcs_image_path, self.storage.target_bucket)
+        context = self._document_context(page.doc_id, images=True)
+
+        # 같은 문서의 페이지는 같은 프로파일로 split 됨
+        return request(
+            image_bytes, context.images, self.genai, file_name=gcs_image_path, mime_type=mime_type_for(gcs_image_path),
+            cache=self.result_cache, context_mime_type=context.mime_type, synopsis=context.synopsis,
+        )
+
+
+    async def _request_with_context_async(self, page: PDFPage, request: Callable[..., Awaitable[Any]]) -> Any:
+        """_request_with_context의 비동기 버전, 오류는 예외로 전달 (quota/응답 형식 오류는 bytes로 재시도하지 않음)"""
+        if self.image_source == "uri":
+            try:
+                context = await self._document_context_async(page.doc_id, images=False)
+                target_digest = await self._digests_async([page.gcs_path])
+                return await request(
+                    self._uri(page.gcs_path), [self._uri(p) for p in context.paths], self.genai,
+                    file_name=page.gcs_path, mime_type=mime_type_for(page.gcs_path), cache=self.result_cache,
+                    image_digests=None if context.digests is None or target_digest is None else [*context.digests, *target_digest],
+                    context_mime_type=context.mime_type, synopsis=context.synopsis,
+                )
+            except ValidationError:
+                raise
+            except Exception as e:
+                if is_quota_error(e):
+                    raise
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {page.gcs_path} ({e})")
+
+        # 대상 페이지 다운로드 + 컨텍스트 페이지 (문서별로 한 번만 다운로드) 동시 진행
+        image_bytes, context = await asyncio.gather(
+            asyncio.to_thread(self.storage.download_bytes, page.gcs_path, self.storage.target_bucket),
+            self._document_context_async(page.doc_id, images=True),
+        )
+
+        return await request(
+            image_bytes, context.images, self.genai, file_name=page.gcs_path, mime_type=mime_type_for(page.gcs_path),
+            cache=self.result_cache, context_mime_type=context.mime_type, synopsis=context.synopsis,
+        )
+
+
+    def _context_paths(self, doc_id: str) -> List[str]:
+        """
+        요약 컨텍스트 이미지 경로: "sheet" 모드면 contact sheet 1장, 아니면 문서 첫 5페이지
+        contact sheet가 없는 문서(split 시 생성 실패, 모드 변경 전에 split된 문서)는 페이지 이미지로 생성해서 기록
+        """
+        if self.summary_context_mode == "sheet":
+            doc = self.repo.session.get(PDFDocument, doc_id)
+            if doc is not None and doc.context_image_path:
+                return [doc.context_image_path]
+        page_paths = self.repo.get_first_n_pages(doc_id, CONTEXT_PAGES)
+        if self.summary_context_mode != "sheet" or not page_paths:
+            return page_paths
+
+        try:
+            sheet_path = self._backfill_context_sheet(page_paths)
+        except Exception as e:
+            self.logger.warning(f" └── Failed to create context sheet, using full pages: {doc_id} ({e})")
+            return page_paths
+        self.repo.update_context_image(doc_id, sheet_path)
+        return [sheet_path]
+
+
+    async def _context_paths_async(self, doc_id: str) -> List[str]:
+        """_context_paths의 비동기 버전 (DB 작업과 다운로드/업로드 모두 스레드에서 실행)"""
+        if self.summary_context_mode == "sheet":
+            context_image_path = await self._db_async(
+                lambda repo: getattr(repo.session.get(PDFDocument, doc_id), "context_image_path", None)
+            )
+            if context_image_path:
+                return [context_image_path]
+        page_paths = await self._db_async(lambda repo: list(repo.get_first_n_pages(doc_id, CONTEXT_PAGES)))
+        if self.summary_context_mode != "sheet" or not page_paths:
+            return page_paths
+
+        try:
+            sheet_path = await asyncio.to_thread(self._backfill_context_sheet, page_paths)
+        except Exception as e:
+            self.logger.warning(f" └── Failed to create context sheet, using full pages: {doc_id} ({e})")
+            return page_paths
+        await self._db_async(lambda repo: repo.update_context_image(doc_id, sheet_path))
+        return [sheet_path]
+
+
+    def _backfill_context_sheet(self, page_paths: List[str]) -> str:
+        """이미 업로드된 페이지 이미지로 contact sheet 생성/업로드 (DB 접근 없음)"""
+        images = [self.storage.download_bytes(p, self.storage.target_bucket) for p in page_paths]
+        sheet = build_context_sheet_from_bytes(images, CONTEXT_SHEET_TILE_PX)
+        gcs_path = context_sheet_path(page_paths[0].rsplit("-page-", 1)[0])
+        self.logger.debug(f" └── Created context sheet: {gcs_path}")
+        return self.storage.upload_bytes(sheet, gcs_path, self.storage.target_bucket, CONTEXT_SHEET_MIME_TYPE)
+
+
+    def _synopsis_context(self, doc_id: str, repo: Optional[Repository] = None) -> Optional[DocumentContext]:
+        """synopsis 모드이고 문서 synopsis가 있으면 이미지 없는 컨텍스트 (없으면 None → 컨텍스트 이미지 사용)"""
+        if self.summary_context_mode != "synopsis":
+            return None
+        doc = (repo or self.repo).session.get(PDFDocument, doc_id)
+        if doc is None or doc.synopsis_status != PageStatus.SUCCESS or not doc.synopsis:
+            return None
+        return DocumentContext(paths=[], images=[], digests=[], synopsis=doc.synopsis)
+
+
+    def invoke_synopsis(self, doc: PDFDocument) -> Tuple[str, str | None, PageStatus]:
+        """
+        Gemini를 이용해서 문서 첫 5페이지로 문서 synopsis 생성 (문서당 한 번)
+        반환: (synopsis, 오류메시지, 상태)
+        """
+        try:
+            paths = self.repo.get_first_n_pages(doc.doc_id, CONTEXT_PAGES)
+            if not paths:
+                return "", f"DB에 해당 문서의 페이지 정보 없음: {doc.gcs_path}", PageStatus.FAILED
+
+            if self.image_source == "uri":
+                synopsis, error = extract_synopsis(
+                    [self._uri(p) for p in paths], self.genai, file_name=doc.gcs_path, mime_type=mime_type_for(paths[0]),
+                    cache=self.result_cache, image_digests=self._digests(paths),
+                )
+                if error is None and synopsis:
+                    return synopsis, None, PageStatus.SUCCESS
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {doc.gcs_path} ({error})")
+
+            images = [self.storage.download_bytes(p, self.storage.target_bucket) for p in paths]
+            synopsis, error = extract_synopsis(
+                images, self.genai, file_name=doc.gcs_path, mime_type=mime_type_for(paths[0]), cache=self.result_cache,
+            )
+            if error is None and not synopsis:
+                error = "synopsis 응답이 비어있음"
+            status = PageStatus.SUCCESS if error is None else PageStatus.FAILED
+            return synopsis or "", error, status
+
+        except Exception as e:
+            return "", f"Synopsis Exception: {e}", PageStatus.FAILED
+
+
+    async def invoke_synopsis_async(self, doc: PDFDocument) -> str:
+        """invoke_synopsis의 비동기 버전 (AsyncEngine용), 오류는 예외로 전달"""
+        paths = await self._db_async(lambda repo: list(repo.get_first_n_pages(doc.doc_id, CONTEXT_PAGES)))
+        if not paths:
+            raise ValueError(f"DB에 해당 문서의 페이지 정보 없음: {doc.gcs_path}")
+
+        if self.image_source == "uri":
+            try:
+                synopsis = await extract_synopsis_async(
+                    [self._uri(p) for p in paths], self.genai, file_name=doc.gcs_path, mime_type=mime_type_for(paths[0]),
+                    cache=self.result_cache, image_digests=await self._digests_async(paths),
+                )
+                if synopsis:
+                    return synopsis
+            except Exception as e:
+                if is_quota_error(e):
+                    raise
+                self.logger.warning(f" └── URI request failed, retrying with inline bytes: {doc.gcs_path} ({e})")
+
+        images = await asyncio.gather(*[
+            asyncio.to_thread(self.storage.download_bytes, p, self.storage.target_bucket) for p in paths
+        ])
+        synopsis = await extract_synopsis_async(
+            list(images), self.genai, file_name=doc.gcs_path, mime_type=mime_type_for(paths[0]), cache=self.result_cache,
+        )
+        if not synopsis:
+            raise ValueError("synopsis 응답이 비어있음")
+        return synopsis
+
+
+    def _document_context(self, doc_id: str, images: bool) -> DocumentContext:
+        """
+        요약 컨텍스트 (synopsis 또는 문서 첫 5페이지/contact sheet): context_cache에 없을 때만 DB 조회
+        images=True면 이미지 바이트, False면 (결과 캐시 키용) md5 digest를 채움 → 문서별로 한 번만 가져옴
+        """
+        context = (
+            self.context_cache.get(doc_id) or self._synopsis_context(doc_id)
+            or DocumentContext(paths=self._context_paths(doc_id))
+        )
+        if images and context.images is None:
+            context.images = [self.storage.download_bytes(p, self.storage.target_bucket) for p in context.paths]
+            self.context_cache.stats.loaded_bytes += sum(len(image) for image in context.images)
+        if not images and context.digests is None:
+            context.digests = self._digests(context.paths)
+        self.context_cache.put(doc_id, context)
+        return context
+
+
+    async def _document_context_async(self, doc_id: str, images: bool) -> DocumentContext:
+        """_document_context의 비동기 버전: 같은 문서의 페이지가 동시에 요청되면 먼저 온 요청이 가져올 때까지 대기"""
+        # 잠금은 같은 문서를 기다리는 요청이 있는 동안만 유지 (문서마다 남기지 않음)
+        lock = self._context_locks.setdefault(doc_id, asyncio.Lock())
+        self._context_waiters[doc_id] = self._context_waiters.get(doc_id, 0) + 1
+        try:
+            async with lock:
+                context = self.context_cache.get(doc_id)
+                if context is None and self.summary_context_mode == "synopsis":
+                    context = await self._db_async(lambda repo: self._synopsis_context(doc_id, repo))
+                if context is None:
+                    context = DocumentContext(paths=await self._context_paths_async(doc_id))
+                if images and context.images is None:
+                    context.images = list(await asyncio.gather(*[
+                        asyncio.to_thread(self.storage.download_bytes, p, self.storage.target_bucket) for p in context.paths
+                    ]))
+                    self.context_cache.stats.loaded_bytes += sum(len(image) for image in context.images)
+                if not images and context.digests is None:
+                    context.digests = await self._digests_async(context.paths)
+                self.context_cache.put(doc_id, context)
+        finally:
+            self._context_waiters[doc_id] -= 1
+            if not self._context_waiters[doc_id]:
+                del self._context_waiters[doc_id]
+                del self._context_locks[doc_id]
+        return context
+
+
 
     def invoke_embedding(self, gcs_image_path: str) -> Tuple[List[float] | None, str | None, PageStatus]:
         """
@@ -148,6 +776,65 @@ class PDFManager:
             return embedding, None, PageStatus.SUCCESS
         except Exception as e:
             return None, f"임베딩 오류: {e}", PageStatus.FAILED
+
+
+    async def invoke_embedding_async(self, page: PDFPage) -> List[float]:
+        """invoke_embedding의 비동기 버전 (AsyncEngine용), 오류는 예외로 전달"""
+        combined_text = self._embedding_text(page)
+        if not combined_text.strip():
+            raise ValueError("임베딩 대상 텍스트가 비어있음")
+        return await get_text_embedding_async(combined_text, self.genai)
+
+
+    @staticmethod
+    def _embedding_text(page: PDFPage) -> str:
+        return (page.summary or "") + "\n\n" + (page.extracted_text or "")
+
+
+    def group_pages_for_embedding(self, pages: List[PDFPage]) -> List[List[PDFPage]]:
+        """임베딩 요청 단위로 페이지 묶음 (EMBEDDING_BATCH_SIZE개, 예상 토큰 합 EMBEDDING_BATCH_MAX_TOKENS 이하)"""
+        texts = [self._embedding_text(page) for page in pages]
+        return [[pages[i] for i in batch] for batch in batch_texts(texts)]
+
+
+    async def invoke_embedding_batch_async(self, pages: List[PDFPage]) -> Dict[str, Tuple[Optional[List[float]], Optional[str]]]:
+        """
+        여러 페이지를 한 요청으로 임베딩 (AsyncEngine용), 반환: {page_id: (임베딩 벡터, 오류메시지)}
+        요청 내용 때문에 거절되면(429가 아닌 4xx) 절반씩 나눠서 다시 요청 → 실패 원인이 된 페이지만 오류로 기록
+        quota 오류(묶음 전체를 다시 큐에 넣음), 서버 오류/타임아웃 등 일시적인 오류는 나누지 않고 예외로 전달
+        """
+        results: Dict[str, Tuple[Optional[List[float]], Optional[str]]] = {}
+        targets = []
+        for page in pages:
+            if self._embedding_text(page).strip():
+                targets.append(page)
+            else:
+                results[page.page_id] = (None, "임베딩 대상 텍스트가 비어있음")
+
+        await self._embed_split_async(targets, results)
+        return results
+
+
+    async def _embed_split_async(self, pages: List[PDFPage],
+                                 results: Dict[str, Tuple[Optional[List[float]], Optional[str]]]) -> None:
+        if not pages:
+            return
+        try:
+            vectors = await get_text_embeddings_async([self._embedding_text(page) for page in pages], self.genai)
+        except genai_errors.ClientError as e:
+            if is_quota_error(e):
+                raise
+            if len(pages) == 1:
+                results[pages[0].page_id] = (None, str(e))
+                return
+            self.logger.debug(f" └── Embedding batch of {len(pages)} failed, splitting: {e}")
+            middle = len(pages) // 2
+            await self._embed_split_async(pages[:middle], results)
+            await self._embed_split_async(pages[middle:], results)
+            return
+
+        for page, vector in zip(pages, vectors):
+            results[page.page_id] = (vector, None)
     
 
     def invoke_indexing(self, page: PDFPage) -> Tuple[str, str, PageStatus, Optional[str]]:
@@ -63,6 +63,19 @@ $$
 # Here is an image of document. Proceed with the transcription.
 """
 
+# 여러 페이지 OCR (OCR_PAGES_PER_REQUEST > 1): EXTRACT_TEXT_PROMPT와 같은 지시사항, 마지막 줄만 여러 페이지/JSON 응답용으로 교체
+EXTRACT_MULTI_TEXT_PROMPT=EXTRACT_TEXT_PROMPT.replace(
+    "# Here is an image of document. Proceed with the transcription.",
+    """# Output
+You will receive {page_count} pages of one document in page order, each image preceded by its label "Page <number>".
+Transcribe every page separately following the instructions above, and return one entry per page in the JSON response:
+- page_number: the number from the label
+- markdown: the Markdown transcription of that page only (an empty string if the page is blank)
+Do not merge content across pages and do not skip any page.
+
+# Here are the pages of document. Proceed with the transcription.""",
+)
+
 EXTRACT_SUMMARY_PROMPT_1="""
 # Here is a basic information about document.
 - file_name: {file_name}
@@ -71,6 +84,16 @@ EXTRACT_SUMMARY_PROMPT_1="""
 # Here is the first 5 pages of the documents.
 """
 
+# synopsis 모드: 컨텍스트 이미지 대신 문서 synopsis(텍스트)로 페이지를 문서 안에 위치시킴
+EXTRACT_SUMMARY_PROMPT_1_SYNOPSIS="""
+# Here is a basic information about document.
+- file_name: {file_name}
+- description: {description}
+
+# Here is a synopsis of the whole document.
+{synopsis}
+"""
+
 EXTRACT_SUMMARY_PROMPT_2="""
 # Here is the chunk we want to situate within the whole document
 """
@@ -79,4 +102,47 @@ EXTRACT_SUMMARY_PROMPT_3="""
 # Task 
 Please give a short succinct context to situate this chunk within the overall document for the purposes of improving search retrieval of the chunk. 
 Answer only with the succinct context and nothing else.
+"""
+
+# 텍스트 추출 + 요약 결합 요청 (FUSED_OCR_SUMMARY): EXTRACT_SUMMARY_PROMPT_1(_SYNOPSIS), _2 다음에 사용, 응답은 JSON (response_schema)
+EXTRACT_FUSED_PROMPT_3="""
+# Task
+For the chunk (the page image right above), return both fields of the JSON response.
+
+## extracted_text
+Transcribe all visible text of the chunk into Markdown, preserving headings, paragraphs, lists and inline formatting.
+- Enclose images, charts and graphs in <image>...</image> with their caption, legend or a brief description inside (empty if purely visual).
+- Enclose tables in <table>...</table> using Markdown table syntax, with the caption or a short description inside. Add extra columns/rows for merged cells.
+- Use LaTeX for mathematical expressions ($ ... $ inline, $$ ... $$ block).
+- Remove characters used only for spacing or alignment (repeated dots, underscores) and excessive line breaks, but keep all meaningful text, numbers and symbols.
+- Use an empty string if the page is blank or has no extractable text.
+
+## summary
+A short succinct context to situate this chunk within the overall document for the purposes of improving search retrieval of the chunk.
+"""
+
+VERIFY_TEXT_PROMPT="""
+# Here is a candidate transcription of the document page shown below.
+<transcription>
+{candidate_text}
+</transcription>
+
+# Task
+Does the transcription match the content of the page exactly (same text, numbers, tables and structure)?
+Answer only with YES or NO.
+"""
+
+EXTRACT_SYNOPSIS_PROMPT_1="""
+# Here is a basic information about document.
+- file_name: {file_name}
+- description: {description}
+
+# Here is the first pages of the document.
+"""
+
+EXTRACT_SYNOPSIS_PROMPT_2="""
+# Task
+Write a compact synopsis of the whole document. It will be given as context when summarizing each page of the document, instead of these images.
+Include, when present: title, document / standard number and edition, issuing organization or customer, scope, equipment type and model, ratings (voltage, current), main test items or chapters, and year.
+Answer in plain text within 120 words and nothing else.
 """
\ No newline at end of file
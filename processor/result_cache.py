@@ -0,0 +1,152 @@
+import os
+import sys
+import base64
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Sequence
+
+from google.genai import types
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from db.models import ModelResultCache
+from db.session import SessionLocal
+from utils.logger import get_logger
+from config import LOG_LEVEL, RESULT_CACHE_TTL_DAYS, RESULT_CACHE_MAX_ENTRIES
+
+
+def image_digest(image_bytes: bytes) -> str:
+    """이미지 digest: base64 md5 (GCS 객체 md5Hash와 같은 형식 → 다운로드 없이 비교 가능)"""
+    return base64.b64encode(hashlib.md5(image_bytes).digest()).decode("ascii")
+
+
+def _sha256(*values: str) -> str:
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Gemini OCR/요약 결과 캐시 (MySQL)
+    키: (이미지 digest 목록, 프롬프트 digest, 모델명, 생성 설정 digest)
+    → 바이트가 같은 페이지(표지, 빈 페이지, 반복 양식, 재업로드/이름 변경 문서)는 모델을 다시 호출하지 않음
+    - ttl_days 동안 사용되지 않은 항목과 max_entries 초과분(오래 사용하지 않은 순)은 evict()에서 삭제
+    - 전용 Session 사용 (commit/rollback이 파이프라인 Session의 진행 중인 작업에 영향을 주지 않음), 사용 후 close()
+    """
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 ttl_days: int = RESULT_CACHE_TTL_DAYS,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 evict_chunk_size: int = 1000) -> None:
+        self.session = session_factory()
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.evict_chunk_size = evict_chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
+
+    @staticmethod
+    def make_key(images: Sequence[bytes], prompts: Sequence[str], model: str,
+                 config: Optional[types.GenerateContentConfig]) -> dict:
+        """캐시 키 구성요소 (cache_key + 디버깅용 digest 컬럼)"""
+        return ResultCache.make_key_from_digests([image_digest(image) for image in images], prompts, model, config)
+
+    @staticmethod
+    def make_key_from_digests(image_digests: Sequence[str], prompts: Sequence[str], model: str,
+                              config: Optional[types.GenerateContentConfig]) -> dict:
+        """이미지 바이트 없이 digest(GCS md5Hash)로 키 구성 (gs:// URI로 요청하는 경우)"""
+        prompt_digest = _sha256(*prompts)
+        config_digest = _sha256(config.model_dump_json(exclude_none=True) if config is not None else "")
+        return {
+            "cache_key": _sha256(*image_digests, prompt_digest, model, config_digest),
+            "image_digest": ",".join(image_digests)[:255],
+            "prompt_digest": prompt_digest,
+            "model": model,
+            "config_digest": config_digest,
+        }
+
+    def get(self, key: dict) -> Optional[str]:
+        with self._lock:
+            try:
+                entry = self.session.get(ModelResultCache, key["cache_key"])
+                if entry is None:
+                    self.misses += 1
+                    return None
+
+                entry.hit_count = (entry.hit_count or 0) + 1
+                entry.last_used_at = datetime.utcnow()
+                self.session.commit()
+            except Exception as e:
+                # 캐시 조회 실패 시 모델 호출로 진행
+                self.session.rollback()
+                self.misses += 1
+                self.logger.warning(f" └── Failed to read model result cache: {e}")
+                return None
+
+            self.hits += 1
+            return entry.result
+
+    def put(self, key: dict, result: str) -> None:
+        with self._lock:
+            stmt = mysql_insert(ModelResultCache).values(**key, result=result)
+            stmt = stmt.on_duplicate_key_update(result=stmt.inserted.result, last_used_at=stmt.inserted.last_used_at)
+            try:
+                self.session.execute(stmt)
+                self.session.commit()
+            except Exception as e:
+                # 캐시 저장 실패가 추출 결과 저장을 막으면 안 됨
+                self.session.rollback()
+                self.logger.warning(f" └── Failed to store model result cache: {e}")
+
+    def evict(self) -> int:
+        """만료 항목 + 최대 개수 초과분 삭제, 반환: 삭제한 항목 수"""
+        with self._lock:
+            expired_before = datetime.utcnow() - timedelta(days=self.ttl_days)
+            deleted = self.session.execute(
+                delete(ModelResultCache).where(ModelResultCache.last_used_at < expired_before)
+            ).rowcount
+
+            excess = self.session.scalar(select(func.count()).select_from(ModelResultCache)) - self.max_entries
+            if excess > 0:
+                # 오래 사용하지 않은 순으로 초과분 키를 조회 후 키로 삭제
+                # (MySQL은 서브쿼리 LIMIT 미지원, last_used_at은 초 단위라 시각 기준 삭제는 초과분보다 많이 지울 수 있음)
+                keys = self.session.scalars(
+                    select(ModelResultCache.cache_key)
+                    .order_by(ModelResultCache.last_used_at.asc(), ModelResultCache.cache_key.asc())
+                    .limit(excess)
+                ).all()
+                for start in range(0, len(keys), self.evict_chunk_size):
+                    deleted += self.session.execute(
+                        delete(ModelResultCache).where(
+                            ModelResultCache.cache_key.in_(keys[start:start + self.evict_chunk_size])
+                        )
+                    ).rowcount
+
+            self.session.commit()
+            return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self.session.close()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+        }
+
+    def reset_stats(self) -> None:
+        """단계별 hit rate 집계용"""
+        self.hits = 0
+        self.misses = 0
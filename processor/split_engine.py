@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pdf2image import convert_from_path
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from storage.gcs_client import GCSStorageClient
+from processor.image_encoding import EncodingProfile
+from processor.page_hash import dhash
+from utils.logger import get_logger
+from config import LOG_LEVEL, SPLIT_PAGE_WINDOW, SPLIT_PROCESSES, SPLIT_UPLOAD_WORKERS, SPLIT_MAX_BUFFERED_PAGES
+
+
+def render_window(local_pdf_path: str, first_page: int, last_page: int, profile: EncodingProfile) -> List[Tuple[int, bytes, str]]:
+    """
+    워커 프로세스에서 실행: 페이지 구간 래스터화 + 이미지 인코딩 + dHash
+    반환: [(page_number, image_bytes, phash)]
+    """
+    images = convert_from_path(
+        local_pdf_path, dpi=profile.dpi, first_page=first_page, last_page=last_page, grayscale=profile.grayscale
+    )
+    rendered = []
+    for i, image in enumerate(images, start=first_page):
+        rendered.append((i, profile.encode(image), dhash(image)))
+        image.close()
+    return rendered
+
+
+def page_windows(pages: List[int], window: int) -> List[Tuple[int, int]]:
+    """
+    래스터화할 페이지 목록 → 연속 구간 [(first_page, last_page)] (구간당 최대 window 페이지)
+    split 재개 시 이미 처리된 페이지는 빠지므로 구간이 끊길 수 있음
+    """
+    windows = []
+    for page_number in sorted(pages):
+        if windows and windows[-1][1] == page_number - 1 and page_number - windows[-1][0] < window:
+            windows[-1] = (windows[-1][0], page_number)
+        else:
+            windows.append((page_number, page_number))
+    return windows
+
+
+class SplitEngine:
+    """
+    래스터화/이미지 인코딩(CPU)은 프로세스 풀, GCS 업로드(I/O)는 스레드 풀에서 동시에 수행
+    업로드 대기 페이지 수를 max_buffered_pages로 제한해서 메모리 사용량을 제한 (backpressure)
+    """
+    def __init__(self,
+                 storage_client: GCSStorageClient,
+                 processes: int = SPLIT_PROCESSES,
+                 upload_workers: int = SPLIT_UPLOAD_WORKERS,
+                 window: int = SPLIT_PAGE_WINDOW,
+                 max_buffered_pages: int = SPLIT_MAX_BUFFERED_PAGES) -> None:
+        self.storage = storage_client
+        self.processes = max(1, processes)
+        self.window = max(1, window)
+        self.max_buffered_pages = max(self.window, max_buffered_pages)
+        self.logger = get_logger(self.__class__.__name__, LOG_LEVEL)
+
+        # fork 대신 spawn: 부모 프로세스의 DB 커넥션/스레드 상태를 복제하지 않음
+        self.render_pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+        self.upload_pool = ThreadPoolExecutor(max_workers=max(1, upload_workers))
+
+    def split(self, local_pdf_path: str, pages: List[int], profile: EncodingProfile,
+              gcs_path_for: Callable[[int], str],
+              metadata: Optional[Dict[str, str]] = None,
+              on_pages: Optional[Callable[[Dict[int, str], Dict[int, str]], None]] = None) -> Dict[int, str]:
+        """
+        local_pdf_path의 pages를 페이지 이미지로 변환해서 업로드
+        gcs_path_for(page_number) → 업로드할 GCS 경로
+        metadata: 업로드 객체에 붙일 사용자 정의 메타데이터 (페이지 dHash는 "phash"로 추가)
+        on_pages: 업로드가 끝난 페이지를 window 단위로 전달 (메인 스레드에서 호출, 체크포인트용)
+                  on_pages({page_number: gcs_image_path}, {page_number: phash})
+        반환: {page_number: gcs_image_path}
+        """
+        started = time.perf_counter()
+        windows = page_windows(pages, self.window)
+        windows.reverse()  # pop()으로 앞 구간부터 꺼냄
+
+        page_infos: Dict[int, str] = {}
+        unflushed: Dict[int, str] = {}  # 업로드 완료 ~ on_pages 전달 전
+        page_hashes: Dict[int, str] = {}
+
+        def flush() -> None:
+            if on_pages is not None and unflushed:
+                on_pages(dict(unflushed), {p: page_hashes[p] for p in unflushed if p in page_hashes})
+            unflushed.clear()
+
+        renders: Dict[Future, Tuple[int, int]] = {}
+        uploads: Dict[Future, int] = {}
+        buffered_pages = 0  # 래스터화 완료 ~ 업로드 완료 전 페이지 수
+        unrendered: List[int] = []  # 변환 결과에 없는 페이지 (손상된 PDF 등)
+
+        try:
+            while windows or renders or uploads:
+                # 업로드가 밀리면 래스터화 제출을 멈춤
+                while windows and len(renders) < self.processes and buffered_pages < self.max_buffered_pages:
+                    first_page, last_page = windows.pop()
+                    future = self.render_pool.submit(render_window, local_pdf_path, first_page, last_page, profile)
+                    renders[future] = (first_page, last_page)
+                    buffered_pages += last_page - first_page + 1
+
+                if not renders and not uploads:
+                    # 제출할 수 없는데 진행 중인 작업도 없음 → 대기하면 무한 루프
+                    raise RuntimeError(
+                        f"Split engine stalled: {len(windows)} windows left, {buffered_pages} pages buffered"
+                    )
+
+                done, _ = wait(list(renders) + list(uploads), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in renders:
+                        first_page, last_page = renders.pop(future)
+                        rendered = future.result()
+                        returned = {page_number for page_number, _, _ in rendered}
+                        missing = [p for p in range(first_page, last_page + 1) if p not in returned]
+                        if missing:
+                            # 업로드로 빠져나가지 않을 페이지는 버퍼 계산에서 제외
+                            buffered_pages -= len(missing)
+                            unrendered.extend(missing)
+                            self.logger.warning(f" └── Render returned no image for pages {missing}: {local_pdf_path}")
+                        for page_number, image_bytes, phash in rendered:
+                            page_hashes[page_number] = phash
+                            upload = self.upload_pool.submit(
+                                self.storage.upload_bytes, image_bytes, gcs_path_for(page_number),
+                                self.storage.target_bucket, profile.mime_type, {**(metadata or {}), "phash": phash}
+                            )
+                            uploads[upload] = page_number
+                    else:
+                        page_number = uploads.pop(future)
+                        page_infos[page_number] = unflushed[page_number] = future.result()
+                        buffered_pages -= 1
+                        if len(unflushed) >= self.window:
+                            flush()
+
+            flush()
+
+            if unrendered:
+                raise RuntimeError(f"Failed to render {len(unrendered)} pages: {sorted(unrendered)}")
+
+        except Exception:
+            for future in list(renders) + list(uploads):
+                future.cancel()
+            wait(list(uploads))  # 진행 중인 업로드가 끝난 뒤 예외 전달
+
+            # 업로드까지 끝난 페이지는 기록해서 재실행 시 건너뜀
+            for future, page_number in uploads.items():
+                if not future.cancelled() and future.exception() is None:
+                    unflushed[page_number] = future.result()
+            try:
+                flush()
+            except Exception as e:
+                self.logger.warning(f" └── Failed to checkpoint split pages: {e}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        self.logger.debug(
+            f" └── Split engine: {len(pages)} pages in {elapsed:.1f}s "
+            f"({len(pages) / elapsed if elapsed > 0 else 0:.1f} pages/s, processes: {self.processes}, profile: {profile.name})"
+        )
+        return page_infos
+
+    def close(self) -> None:
+        self.render_pool.shutdown(cancel_futures=True)
+        self.upload_pool.shutdown(cancel_futures=True)
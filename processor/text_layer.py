@@ -0,0 +1,129 @@
+import re
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator
+
+from PyPDF2 import PdfReader
+
+# 이보다 글자가 적으면 스캔 문서/그림 페이지로 보고 Gemini OCR 사용
+MIN_CHARS = 50
+# 텍스트로 꽉 찬 페이지의 절반 정도 밀도 (글자/제곱인치) → coverage 1.0 기준
+CHARS_PER_SQ_INCH = 15
+# 이 픽셀 수 이상인 이미지만 그림으로 판단 (머리글 로고 등은 제외)
+MIN_FIGURE_PIXELS = 200_000
+# 선/사각형 그리기 연산이 이보다 많으면 표(괘선)가 있는 페이지로 판단
+MIN_TABLE_PATH_OPS = 20
+
+_GARBAGE_PATTERN = re.compile(r"\(cid:\d+\)|[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]")
+_PATH_OP_PATTERN = re.compile(rb"(?<![A-Za-z])(?:re|l)(?=\s)")
+
+_pypdf2_logger = logging.getLogger("PyPDF2")
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+_saved_level = logging.NOTSET
+
+
+@dataclass
+class TextLayerResult:
+    """페이지 텍스트 레이어와 품질 점수 (0~1, 높을수록 Gemini OCR 없이 사용 가능)"""
+    text: str
+    score: float
+    char_count: int
+    garbage_ratio: float
+    coverage: float
+    has_figures: bool
+    has_tables: bool
+
+
+def score_text_layer(text: str, page_area_sq_inch: float, has_figures: bool, has_tables: bool) -> TextLayerResult:
+    """
+    텍스트 레이어 품질 점수
+    - garbage_ratio: 매핑되지 않은 글리프((cid:N), U+FFFD, 사용자 정의 영역, 제어문자) 비율
+    - coverage: 페이지 면적 대비 글자 밀도
+    - 그림/표가 있으면 Gemini가 <image>/<table> 구조로 추출해야 하므로 감점
+    """
+    char_count = sum(1 for c in text if not c.isspace())
+    garbage_count = sum(len(m.group()) for m in _GARBAGE_PATTERN.finditer(text))
+    garbage_ratio = min(1.0, garbage_count / char_count) if char_count else 1.0
+    coverage = min(1.0, char_count / (page_area_sq_inch * CHARS_PER_SQ_INCH)) if page_area_sq_inch > 0 else 0.0
+
+    if char_count < MIN_CHARS:
+        score = 0.0
+    else:
+        score = (1 - garbage_ratio) * (0.5 + 0.5 * coverage)
+        if has_figures:
+            score *= 0.5
+        if has_tables:
+            score *= 0.5
+
+    return TextLayerResult(
+        text=text,
+        score=round(score, 4),
+        char_count=char_count,
+        garbage_ratio=garbage_ratio,
+        coverage=coverage,
+        has_figures=has_figures,
+        has_tables=has_tables,
+    )
+
+
+def _has_figures(page) -> bool:
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if not xobjects:
+        return False
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        if xobject.get("/Subtype") == "/Image":
+            if int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0)) >= MIN_FIGURE_PIXELS:
+                return True
+    return False
+
+
+def _has_tables(page) -> bool:
+    contents = page.get_contents()
+    if contents is None:
+        return False
+    return len(_PATH_OP_PATTERN.findall(contents.get_data())) >= MIN_TABLE_PATH_OPS
+
+
+@contextmanager
+def _quiet_pypdf2() -> Iterator[None]:
+    """
+    추출하는 동안만 PyPDF2 warning 로그를 숨김 (깨진 content stream마다 warning을 많이 남김)
+    여러 스레드에서 동시에 추출해도 마지막 호출이 끝날 때 원래 레벨로 되돌림
+    """
+    global _quiet_depth, _saved_level
+    with _quiet_lock:
+        if _quiet_depth == 0:
+            _saved_level = _pypdf2_logger.level
+            _pypdf2_logger.setLevel(logging.ERROR)
+        _quiet_depth += 1
+    try:
+        yield
+    finally:
+        with _quiet_lock:
+            _quiet_depth -= 1
+            if _quiet_depth == 0:
+                _pypdf2_logger.setLevel(_saved_level)
+
+
+def extract_text_layers(local_pdf_path: str, pages: Iterable[int]) -> Dict[int, TextLayerResult]:
+    """
+    PDF 텍스트 레이어 추출 + 품질 점수 (로컬, 모델 호출 없음)
+    반환: {page_number: TextLayerResult} (읽을 수 없는 페이지는 점수 0)
+    """
+    results: Dict[int, TextLayerResult] = {}
+    with _quiet_pypdf2():
+        reader = PdfReader(local_pdf_path)
+        for page_number in pages:
+            try:
+                page = reader.pages[page_number - 1]
+                area = float(page.mediabox.width) * float(page.mediabox.height) / (72 * 72)
+                text = page.extract_text() or ""
+                results[page_number] = score_text_layer(text, area, _has_figures(page), _has_tables(page))
+            except Exception:
+                results[page_number] = score_text_layer("", 0, False, False)
+    return results
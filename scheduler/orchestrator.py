@@ -2,7 +2,7 @@ import os
 import sys
 import json
 import time
-from typing import List, Tuple
+from typing import List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from google.cloud import storage
@@ -10,14 +10,19 @@ from google import genai
 
 
 from db.initialize import initialize_tables
-from db.models import PageStatus
+from db.models import PageStatus, PipelineStatusEnum, TextSource
 from db.session import get_db_session
 from db.repository import Repository
-from storage.gcs_client import GCSStorageClient
+from storage.gcs_client import GCSStorageClient, create_storage_client
 from processor.pdf_manager import PDFManager
 from processor.elastic import ESConnector
 from utils.logger import get_logger
-from utils.utils import compute_doc_hash
+from sync.change_detector import ChangeDetector, FileInfo
+from utils.hash_cache import HashCache
+from processor.result_cache import ResultCache
+from processor.async_engine import AsyncEngine
+from processor.call_log import call_recorder
+from processor.batch import BatchManager, create_batch_backend
 from config import (
     GCS_SOURCE_BUCKET,
     GCS_PROCESSED_BUCKET,
@@ -28,6 +33,14 @@ from config import (
     ES_PWD,
     INDEX_NAME,
     LOG_LEVEL,
+    SCAN_MAX_WORKERS,
+    RESULT_CACHE_ENABLED,
+    EXTRACT_TEXT_MODEL,
+    EXTRACT_FUSED_MODEL,
+    FUSED_OCR_SUMMARY,
+    EXTRACT_SUMMARY_MODEL,
+    EMBEDDING_MODEL,
+    BATCH_MODE,
 )
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
@@ -43,10 +56,15 @@ def run_pipeline() -> None:
 
     db_gen = get_db_session()
     session = next(db_gen)
+    hash_cache = None
+    result_cache = None
+    engine = None
+    pipeline_run = None
 
     try:
         # ── 초기화
-        gcs_client = storage.Client()
+        hash_cache = HashCache()
+        gcs_client = create_storage_client(pool_size=SCAN_MAX_WORKERS)
         storage_client = GCSStorageClient(
             GCS_SOURCE_BUCKET, GCS_PROCESSED_BUCKET, gcs_client
         )
@@ -56,54 +74,118 @@ def run_pipeline() -> None:
         )
         els = ESConnector(hosts=ES_HOST, credentials=(ES_USER, ES_PWD))
 
-        manager = PDFManager(storage_client, repo, genai_client, els)
+        if RESULT_CACHE_ENABLED:
+            result_cache = ResultCache()
+            evicted = result_cache.evict()
+            if evicted:
+                logger.info(" └── Evicted %d model result cache entries", evicted)
+
+        manager = PDFManager(storage_client, repo, genai_client, els, result_cache=result_cache)
+        engine = AsyncEngine()
+        # 실행 등록 + 모델 호출 기록/집계 시작 (processor/call_log.py)
+        pipeline_run = repo.create_pipeline_run()
+        call_recorder.start_run(pipeline_run.id)
+
+        def save_usage(stage: str) -> None:
+            # 모델 호출 기록 저장 + 실행/단계별 집계를 PipelineStatus에 반영
+            call_recorder.flush(session)
+            repo.update_pipeline_status(
+                PipelineStatusEnum.RUNNING, stage=stage, run_id=pipeline_run.id, **call_recorder.usage_columns()
+            )
+            usage = call_recorder.stage_usage(stage)
+            if usage is not None:
+                logger.info(
+                    " └── [%s] Model calls: %d (errors: %d, quota retries: %d), tokens in %d / out %d, %.1f MB sent, p50 %d ms, p95 %d ms",
+                    stage, usage["calls"], usage["errors"], usage["retries"], usage["input_tokens"], usage["output_tokens"],
+                    usage["request_bytes"] / 1024 / 1024, usage["p50_ms"], usage["p95_ms"],
+                )
+
+        batch_manager = None
+        if BATCH_MODE:
+            batch_manager = BatchManager(repo, storage_client, create_batch_backend(genai_client, storage_client))
 
         # ─────────────────────────────────────────────────────────
         # 1. 신규문서 Detection
         # ─────────────────────────────────────────────────────────
         logger.info("[Step 1] Scanning GCS for new PDF documents")
-        pdf_paths = storage_client.list_pdfs()
-        logger.info(" └── Found %d PDF files in GCS", len(pdf_paths))
+        # 메타데이터(generation/md5/size)가 DB와 일치하는 PDF는 다운로드 생략
+        detector = ChangeDetector(storage_client, repo, hash_cache=hash_cache)
+        current_files = detector.scan_current_files()
+        logger.info(" └── Found %d PDF files in GCS", len(current_files))
 
         known_doc_ids = repo.list_all_document_hashes()
-        new_docs: List[Tuple[str, str]] = []
-
-        for path in pdf_paths:
-            try:
-                doc_hash = compute_doc_hash(storage_client, path)
-                if doc_hash not in known_doc_ids:
-                    new_docs.append((doc_hash, path))
-            except Exception as e:
-                logger.warning(" └── Hash computation failed for %s (%s)", path, e)
+        new_docs: List[FileInfo] = [
+            file_info for file_info in current_files.values()
+            if file_info.doc_id not in known_doc_ids
+        ]
 
         logger.info(" └── Detected %d new documents", len(new_docs))
+        # 2~6단계는 비활성화 → COMPLETED 행에는 실제로 끝난 마지막 단계를 기록
+        finished_stage = "scan"
 
         # ─────────────────────────────────────────────────────────
         # 2. 신규문서 Split해서 DB 등록
         # ─────────────────────────────────────────────────────────
         # logger.info("[Step 2] Splitting new documents and saving page metadata")
 
+        # # 신규 문서 등록 (split_status=PENDING) → split 도중 중단되어도 다음 실행에서 이어서 처리
+        # for file_info in new_docs:
+        #     if not repo.exists_document(file_info.doc_id):
+        #         repo.create_document(file_info.doc_id, file_info.path, content_hash=file_info.content_hash, blob=file_info.blob)
+
+        # # split 대상: 신규 + 이전 실행에서 중단/실패한 문서
+        # split_docs = repo.get_documents_for_split()
+        # logger.info(" └── Documents to split: %d (new: %d)", len(split_docs), len(new_docs))
+
         # # 병렬처리 미적용
-        # for i, (doc_id, gcs_pdf_path) in enumerate(new_docs):
+        # for i, doc in enumerate(split_docs):
+        #     doc_id, gcs_pdf_path = doc.doc_id, doc.gcs_path
+        #     register_times: List[float] = []
+
+        #     def register_pages(page_infos, text_layers, page_hashes):
+        #         # 업로드가 끝난 구간마다 PDFPage Table 등록 (체크포인트)
+        #         started = time.perf_counter()
+        #         repo.register_pages(
+        #             doc_id, gcs_pdf_path, page_infos,
+        #             encoding_profile=manager.encoding_profile.name, text_layers=text_layers, page_hashes=page_hashes,
+        #         )
+        #         register_times.append(time.perf_counter() - started)
+
         #     try:
-        #         # PDFDocument Table 등록
-        #         if not repo.exists_document(doc_id):
-        #             repo.create_document(doc_id, gcs_pdf_path)
-
-        #         # PDFPage Table 등록
-        #         gcs_page_infos = manager.invoke_split(gcs_pdf_path) # {page_number: gcs_image_path}
-        #         for page_number, gcs_image_path in gcs_page_infos.items():
-        #             repo.create_page_record(
-        #                 doc_id=doc_id,
-        #                 page_number=page_number,
-        #                 gcs_path=gcs_image_path,
-        #                 gcs_pdf_path=gcs_pdf_path,
-        #             )
-
-        #         logger.info(" └── [%d/%d] Split and saved %d pages: %s", i + 1, len(new_docs), len(gcs_page_infos), gcs_pdf_path)
+        #         completed_pages = repo.get_page_paths(doc_id)
+        #         gcs_page_infos = manager.invoke_split(
+        #             gcs_pdf_path,
+        #             source_generation=doc.generation,
+        #             completed_pages=completed_pages,
+        #             on_pages=register_pages,
+        #             on_context_image=lambda sheet_path: repo.update_context_image(doc_id, sheet_path),
+        #         ) # {page_number: gcs_image_path}
+        #         repo.update_split_status(doc_id, PageStatus.SUCCESS, page_count=len(gcs_page_infos))
+
+        #         logger.info(" └── [%d/%d] Split and saved %d pages (already registered: %d): %s (registered in %.2fs)",
+        #                     i + 1, len(split_docs), len(gcs_page_infos), len(completed_pages), gcs_pdf_path, sum(register_times))
 
         #     except Exception as e:
-        #         logger.warning(" └── [%d/%d] Failed to split or save: %s (%s)", i + 1, len(new_docs), gcs_pdf_path, e)
+        #         repo.session.rollback()
+        #         repo.update_split_status(doc_id, PageStatus.FAILED)
+        #         logger.warning(" └── [%d/%d] Failed to split or save: %s (%s)", i + 1, len(split_docs), gcs_pdf_path, e)
+
+        # ─────────────────────────────────────────────────────────
+        # 2-1. 문서 synopsis (SUMMARY_CONTEXT_MODE=synopsis, 문서당 한 번)
+        # ─────────────────────────────────────────────────────────
+        # # 페이지 요약(4단계, 또는 FUSED_OCR_SUMMARY면 3단계)보다 먼저 생성 → 페이지 요약은 컨텍스트 이미지 대신 synopsis 사용
+        # if manager.summary_context_mode == "synopsis":
+        #     logger.info("[Step 2-1] Generating document synopses")
+        #     synopsis_docs = repo.get_documents_for_synopsis()
+        #     logger.info("Documents queued for synopsis generation: %d", len(synopsis_docs))
+
+        #     def on_synopsis(doc, synopsis, error):
+        #         repo.update_synopsis(doc.doc_id, synopsis, PageStatus.SUCCESS if error is None else PageStatus.FAILED)
+        #         if error is not None:
+        #             logger.warning(" └── Synopsis generation failed: %s - %s (page summaries use context images)", doc.gcs_path, error)
+
+        #     engine.run("synopsis", EXTRACT_SUMMARY_MODEL, synopsis_docs, manager.invoke_synopsis_async, on_synopsis)
+        #     save_usage("synopsis")
 
         # ─────────────────────────────────────────────────────────
         # 3. 텍스트 추출
@@ -114,27 +196,111 @@ def run_pipeline() -> None:
         # retry   = [p for p in extraction_pages if p.extracted == PageStatus.FAILED]
         # logger.info("Pages queued for text extraction: %d (new: %d, retry: %d)", len(extraction_pages), len(pending), len(retry))
 
-        # # 병렬처리 미적용
-        # for i, page in enumerate(extraction_pages, 1):
-        #     try:
-        #         tag = "new" if page.extracted == PageStatus.PENDING else "retry"
-        #         text, error, status = manager.invoke_extraction(page.gcs_path)
-
+        # # 유사 페이지(dHash) 재사용: 다른 문서에서 이미 추출한 거의 같은 페이지의 텍스트 사용
+        # reused_count = 0
+        # if manager.phash_reuse_mode != "off":
+        #     logger.info(" └── Near-duplicate page index (%s): %d pages", manager.phash_reuse_mode, manager.build_page_index())
+
+        # # asyncio 엔진 (동시 요청 + 모델별 요청 속도 제한, quota 오류는 다시 큐에 넣음)
+        # async def extract_page(page):
+        #     # 유사 페이지가 있으면 OCR 생략 → (텍스트, 원본 페이지, 요약)
+        #     source = await manager.find_reusable_page_async(page)
+        #     if source is not None:
+        #         return source.extracted_text, source, None
+        #     if FUSED_OCR_SUMMARY and page.summarized != PageStatus.SUCCESS:
+        #         # 텍스트 추출 + 요약을 한 번에 (응답 형식 오류면 None → 텍스트 추출 항목으로 다시 처리, 요약은 4단계에서)
+        #         fused = await manager.invoke_fused_async(page)
+        #         if fused is None:
+        #             return None
+        #         text, summary = fused
+        #         return text, None, summary
+        #     return await extract_text_only(page)
+
+        # async def extract_text_only(page):
+        #     return await manager.invoke_extraction_async(page.gcs_path), None, None
+
+        # fallback_pages = []  # 응답 형식 오류로 텍스트 추출만 다시 할 페이지
+
+        # def on_extracted(page, result, error):
+        #     nonlocal reused_count
+        #     tag = "new" if page.extracted == PageStatus.PENDING else "retry"
+        #     if error is not None:
+        #         repo.update_page_record(page_id=page.page_id, extracted=PageStatus.FAILED, error_message=f"Extraction Exception: {error}")
+        #         logger.warning(" └── Text extraction failed (%s): %s - %s", tag, page.gcs_path, error)
+        #         return
+        #     if result is None:
+        #         fallback_pages.append(page)
+        #         return
+
+        #     text, source, summary = result
+        #     if source is not None:
         #         repo.update_page_record(
         #             page_id=page.page_id,
         #             extracted_text=text,
-        #             extracted=status,
-        #             error_message=error
+        #             extracted=PageStatus.SUCCESS,
+        #             text_source=TextSource.REUSED,
+        #             reused_from=source.page_id,
         #         )
-
-        #         if status == PageStatus.SUCCESS:
-        #             logger.debug(" └── [%d/%d] Text extraction succeeded (%s): %s", i, len(extraction_pages), tag, page.gcs_path)
-        #         else:
-        #             logger.warning(" └── [%d/%d] Text extraction failed (%s): %s - %s", i, len(extraction_pages), tag, page.gcs_path, error)
-        #             time.sleep(60)
-
-        #     except Exception as e:
-        #         logger.error(" └── [%d/%d] Text extraction exception (%s): %s - %s", i, len(extraction_pages), tag, page.gcs_path, e)
+        #         reused_count += 1
+        #         logger.debug(" └── Reused text of %s (%s): %s", source.page_id, tag, page.gcs_path)
+        #     else:
+        #         repo.update_page_record(
+        #             page_id=page.page_id,
+        #             extracted_text=text,
+        #             extracted=PageStatus.SUCCESS,
+        #             text_source=TextSource.GEMINI,
+        #             summary=summary,
+        #             summarized=PageStatus.SUCCESS if summary is not None else None,
+        #         )
+        #         manager.index_page(page)
+        #         logger.debug(" └── Text extraction succeeded (%s%s): %s", tag, ", with summary" if summary is not None else "", page.gcs_path)
+
+        # async def extract_group(group):
+        #     # 여러 페이지 OCR: 재사용할 페이지를 뺀 나머지를 한 요청으로 → {page_id: (텍스트, 원본 페이지, 요약)}
+        #     # 응답 형식 오류면 해당 페이지는 None → on_extracted에서 페이지별 항목으로 다시 처리
+        #     results = {}
+        #     for page in group:
+        #         source = await manager.find_reusable_page_async(page)
+        #         if source is not None:
+        #             results[page.page_id] = (source.extracted_text, source, None)
+        #     remaining = [p for p in group if p.page_id not in results]
+        #     texts = await manager.invoke_extraction_group_async(remaining)
+        #     if texts is None:
+        #         results.update({page.page_id: None for page in remaining})
+        #     else:
+        #         results.update({page_id: (text, None, None) for page_id, text in texts.items()})
+        #     return results
+
+        # def on_group_extracted(group, results, error):
+        #     for page in group:
+        #         on_extracted(page, results[page.page_id] if error is None else None, error)
+
+        # if batch_manager is not None:
+        #     # 배치 모드: 끝난 배치 작업 결과 반영 후 남은 페이지를 새 배치 작업으로 제출 (온라인 호출 없음)
+        #     totals = batch_manager.ingest_finished("extraction")
+        #     logger.info(" └── Batch jobs ingested: %d (succeeded: %d, failed: %d), running: %d", totals["jobs"], totals["succeeded"], totals["failed"], totals["running"])
+        #     batch_manager.submit("extraction", repo.get_pages_for_extraction())
+        # elif FUSED_OCR_SUMMARY or manager.ocr_pages_per_request <= 1:
+        #     engine.run("text extraction", EXTRACT_FUSED_MODEL if FUSED_OCR_SUMMARY else EXTRACT_TEXT_MODEL,
+        #                extraction_pages, extract_page, on_extracted)
+        # else:
+        #     # 여러 페이지 OCR: 같은 문서의 연속 페이지를 한 요청으로 (엔진 통계는 요청 단위)
+        #     groups = manager.group_pages_for_ocr(extraction_pages)
+        #     logger.info(" └── Multi-page OCR: %d requests for %d pages (up to %d pages/request)", len(groups), len(extraction_pages), manager.ocr_pages_per_request)
+        #     engine.run("text extraction", EXTRACT_TEXT_MODEL, groups, extract_group, on_group_extracted)
+        # if fallback_pages:
+        #     # 대체 요청도 텍스트 추출 모델의 요청 제한을 받는 페이지별 항목으로 처리
+        #     logger.info(" └── Falling back to per-page text extraction: %d pages", len(fallback_pages))
+        #     engine.run("text extraction", EXTRACT_TEXT_MODEL, fallback_pages, extract_text_only, on_extracted)
+        # save_usage("text extraction")
+
+        # if manager.phash_reuse_mode != "off":
+        #     logger.info(" └── Reused text from near-duplicate pages: %d", reused_count)
+
+        # if result_cache is not None:
+        #     stats = result_cache.stats()
+        #     logger.info(" └── Result cache (text extraction): hits %d, misses %d (hit rate %.1f%%)", stats["hits"], stats["misses"], stats["hit_rate"])
+        #     result_cache.reset_stats()
 
         # ─────────────────────────────────────────────────────────
         # 4. 요약 추출
@@ -145,27 +311,35 @@ def run_pipeline() -> None:
         # retry   = [p for p in summary_pages if p.summarized == PageStatus.FAILED]
         # logger.info("Pages queued for summary generation: %d (new: %d, retry: %d)", len(summary_pages), len(pending), len(retry))
 
-        # # 병렬처리 미적용
-        # for i, page in enumerate(summary_pages, 1):
-        #     try:
-        #         tag = "new" if page.summarized == PageStatus.PENDING else "retry"
-        #         summary, error, status = manager.invoke_summary(page.gcs_path)
-
-        #         repo.update_page_record(
-        #             page_id=page.page_id,
-        #             summary=summary,
-        #             summarized=status,
-        #             error_message=error
-        #         )
-
-        #         if status == PageStatus.SUCCESS:
-        #             logger.debug(" └── [%d/%d] Summary generation succeeded (%s): %s", i, len(summary_pages), tag, page.gcs_path)
-        #         else:
-        #             logger.warning(" └── [%d/%d] Summary generation failed (%s): %s - %s", i, len(summary_pages), tag, page.gcs_path, error)
-        #             time.sleep(60)
-
-        #     except Exception as e:
-        #         logger.error(" └── [%d/%d] Summary generation exception (%s): %s - %s", i, len(summary_pages), tag, page.gcs_path, e)
+        # # asyncio 엔진
+        # def on_summarized(page, summary, error):
+        #     tag = "new" if page.summarized == PageStatus.PENDING else "retry"
+        #     repo.update_page_record(
+        #         page_id=page.page_id,
+        #         summary=summary,
+        #         summarized=PageStatus.SUCCESS if error is None else PageStatus.FAILED,
+        #         error_message=f"Summary Exception: {error}" if error is not None else None,
+        #     )
+        #     if error is None:
+        #         logger.debug(" └── Summary generation succeeded (%s): %s", tag, page.gcs_path)
+        #     else:
+        #         logger.warning(" └── Summary generation failed (%s): %s - %s", tag, page.gcs_path, error)
+
+        # if batch_manager is not None:
+        #     totals = batch_manager.ingest_finished("summary")
+        #     logger.info(" └── Batch jobs ingested: %d (succeeded: %d, failed: %d), running: %d", totals["jobs"], totals["succeeded"], totals["failed"], totals["running"])
+        #     batch_manager.submit("summary", repo.get_pages_for_summary())
+        # else:
+        #     engine.run("summary", EXTRACT_SUMMARY_MODEL, summary_pages, manager.invoke_summary_async, on_summarized)
+        #     context_stats = manager.context_cache.stats
+        #     logger.info(" └── Context cache: hits %d, misses %d, evictions %d, downloaded %.1f MB", context_stats.hits, context_stats.misses, context_stats.evictions, context_stats.loaded_bytes / 1024 / 1024)
+        #     manager.context_cache.clear()
+        # save_usage("summary")
+
+        # if result_cache is not None:
+        #     stats = result_cache.stats()
+        #     logger.info(" └── Result cache (summary): hits %d, misses %d (hit rate %.1f%%)", stats["hits"], stats["misses"], stats["hit_rate"])
+        #     result_cache.reset_stats()
 
         # ─────────────────────────────────────────────────────────
         # 5. 임베딩 벡터 생성
@@ -176,27 +350,26 @@ def run_pipeline() -> None:
         # retry   = [p for p in embedding_pages if p.embedded == PageStatus.FAILED]
         # logger.info("Pages queued for embedding: %d (new: %d, retry: %d)", len(embedding_pages), len(pending), len(retry))
 
-        # # 병렬처리 미적용
-        # for i, page in enumerate(embedding_pages, 1):
-        #     try:
+        # # asyncio 엔진: 여러 페이지를 한 요청으로 임베딩 (EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS)
+        # def on_embedded(batch, results, error):
+        #     # 묶음 결과를 한 트랜잭션으로 반영 (요청 실패 시 묶음 전체 실패)
+        #     mappings = []
+        #     for page in batch:
         #         tag = "new" if page.embedded == PageStatus.PENDING else "retry"
-        #         embedding, error, status = manager.invoke_embedding(page.gcs_path)
-
-        #         repo.update_page_record(
-        #             page_id=page.page_id,
-        #             embedding=json.dumps(embedding), # 리스트를 문자열로 변환
-        #             embedded=status,
-        #             error_message=error
-        #         )
-
-        #         if status == PageStatus.SUCCESS:
-        #             logger.debug(" └── [%d/%d] Embedding succeeded (%s): %s", i, len(embedding_pages), tag, page.gcs_path)
+        #         embedding, page_error = results[page.page_id] if error is None else (None, error)
+        #         if page_error is None:
+        #             mappings.append({"page_id": page.page_id, "embedding": json.dumps(embedding), "embedded": PageStatus.SUCCESS})  # 리스트를 문자열로 변환
+        #             logger.debug(" └── Embedding succeeded (%s): %s", tag, page.gcs_path)
         #         else:
-        #             logger.warning(" └── [%d/%d] Embedding failed (%s): %s - %s", i, len(embedding_pages), tag, page.gcs_path, error)
-        #             time.sleep(60)
+        #             mappings.append({"page_id": page.page_id, "embedded": PageStatus.FAILED, "error_message": f"임베딩 오류: {page_error}"})
+        #             logger.warning(" └── Embedding failed (%s): %s - %s", tag, page.gcs_path, page_error)
+        #     repo.bulk_update_pages(mappings)
+
+        # embedding_batches = manager.group_pages_for_embedding(embedding_pages)
+        # logger.info(" └── Embedding requests: %d for %d pages", len(embedding_batches), len(embedding_pages))
+        # engine.run("embedding", EMBEDDING_MODEL, embedding_batches, manager.invoke_embedding_batch_async, on_embedded)
+        # save_usage("embedding")
 
-        #     except Exception as e:
-        #         logger.error(" └── [%d/%d] Embedding exception (%s): %s - %s", i, len(embedding_pages), tag, page.gcs_path, e)
 
         # ─────────────────────────────────────────────────────────
         # 6. 인덱싱
@@ -227,6 +400,26 @@ def run_pipeline() -> None:
         #     except Exception as e:
         #         logger.error(" └── [%d/%d] Indexing exception (%s): %s - %s", i, len(indexing_pages), tag, page.gcs_path, e)
 
+        # finished_stage = "done"
+
+        call_recorder.flush(session)
+        repo.update_pipeline_status(PipelineStatusEnum.COMPLETED, stage=finished_stage, run_id=pipeline_run.id, **call_recorder.usage_columns())
+
+    except Exception as e:
+        if pipeline_run is not None:
+            session.rollback()
+            call_recorder.flush(session)
+            repo.update_pipeline_status(
+                PipelineStatusEnum.FAILED, run_id=pipeline_run.id, error_message=str(e), **call_recorder.usage_columns()
+            )
+        raise
+
     finally:
+        if engine is not None:
+            engine.close()
+        if hash_cache is not None:
+            hash_cache.close()
+        if result_cache is not None:
+            result_cache.close()
         session.close()
         logger.info("\nPipeline execution finished")
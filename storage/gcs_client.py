@@ -1,5 +1,54 @@
-from typing import List
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+
+# 목록 조회 시 필요한 필드만 요청 (응답 페이로드 축소)
+_LIST_FIELDS = "items(name,size,generation,md5Hash,crc32c,updated),nextPageToken"
+_LIST_FIELDS_WITH_PREFIXES = f"{_LIST_FIELDS},prefixes"
+_SHARD_DONE = object()
+
+
+@dataclass(frozen=True)
+class BlobMetadata:
+    """GCS 객체 메타데이터 (다운로드 없이 변경 여부 판단용)"""
+    name: str
+    size: int
+    generation: int
+    md5_hash: Optional[str] = None  # composite 객체는 md5 없음 → crc32c 사용
+    crc32c: Optional[str] = None
+    updated: Optional[datetime] = None
+
+    @classmethod
+    def from_blob(cls, blob: storage.Blob) -> "BlobMetadata":
+        return cls(
+            name=blob.name,
+            size=int(blob.size or 0),
+            generation=int(blob.generation or 0),
+            md5_hash=blob.md5_hash,
+            crc32c=blob.crc32c,
+            updated=blob.updated,
+        )
+
+
+def create_storage_client(pool_size: int = 10) -> storage.Client:
+    """
+    여러 스레드가 공유할 storage.Client 생성
+    기본 HTTP 커넥션 풀(10개)보다 동시 요청이 많으면 커넥션이 재사용되지 않으므로 pool_size만큼 확장
+    """
+    credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
 
 class GCSStorageClient:
     def __init__(self, source_bucket: str, target_bucket: str, client: storage.Client) -> None:
@@ -8,9 +57,84 @@ class GCSStorageClient:
         self.client: storage.Client = client
     
     def list_pdfs(self, prefix: str = "") -> List[str]:
+        return [blob.name for blob in self.list_pdf_blobs(prefix)]
+
+    def list_pdf_blobs(self, prefix: str = "") -> List[BlobMetadata]:
+        return list(self.iter_pdf_blobs(prefix))
+
+    def iter_pdf_blobs(self, prefix: str = "", page_size: int = 1000) -> Iterator[BlobMetadata]:
+        """목록 페이지가 도착하는 대로 PDF 메타데이터를 yield (전체 목록을 기다리지 않음)"""
         bucket = self.client.bucket(self.source_bucket)
-        blobs = bucket.list_blobs(prefix=prefix)
-        return [blob.name for blob in blobs if blob.name.lower().endswith(".pdf")]
+        blobs = bucket.list_blobs(prefix=prefix, fields=_LIST_FIELDS, page_size=page_size)
+        for blob in blobs:
+            if blob.name.lower().endswith(".pdf"):
+                yield BlobMetadata.from_blob(blob)
+
+    def iter_pdf_blobs_sharded(self, prefix: str = "", max_workers: int = 8,
+                               page_size: int = 1000) -> Iterator[BlobMetadata]:
+        """
+        최상위 prefix (예: "1. International Standards/", "2. Type Test Reports/") 별로 병렬 목록 조회
+        샤드 간 순서는 보장하지 않음 (각 샤드 내부는 이름순)
+        """
+        bucket = self.client.bucket(self.source_bucket)
+        top_level = bucket.list_blobs(
+            prefix=prefix, delimiter="/", fields=_LIST_FIELDS_WITH_PREFIXES, page_size=page_size
+        )
+        # prefix 바로 아래 객체 먼저 → 순회가 끝나야 top_level.prefixes가 채워짐
+        for blob in top_level:
+            if blob.name.lower().endswith(".pdf"):
+                yield BlobMetadata.from_blob(blob)
+
+        shards = sorted(top_level.prefixes)
+        if not shards:
+            return
+
+        results: queue.Queue = queue.Queue(maxsize=page_size * max_workers)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # 소비자가 중단(generator close)하면 생산자도 종료
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_shard(shard_prefix: str) -> None:
+            try:
+                for blob_meta in self.iter_pdf_blobs(shard_prefix, page_size):
+                    if not put(blob_meta):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(_SHARD_DONE)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            for shard_prefix in shards:
+                executor.submit(list_shard, shard_prefix)
+
+            try:
+                remaining = len(shards)
+                while remaining:
+                    item = results.get()
+                    if item is _SHARD_DONE:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+    
+    def open_stream(self, gcs_path: str, bucket_name: str,
+                    chunk_size: Optional[int] = None, generation: Optional[int] = None) -> BinaryIO:
+        """임시 파일 없이 객체를 스트리밍으로 읽기 (chunk_size 단위 ranged read, generation 고정 가능)"""
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.blob(gcs_path, generation=generation)
+        return blob.open("rb", chunk_size=chunk_size)
     
     def download_file(self, gcs_path: str, local_path: str, bucket_name: str) -> str:
         bucket = self.client.bucket(bucket_name)
@@ -24,6 +148,57 @@ class GCSStorageClient:
         blob.upload_from_filename(local_image_path)
         return gcs_path
     
+    def download_bytes(self, gcs_path: str, bucket_name: str) -> bytes:
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.blob(gcs_path)
+        return blob.download_as_bytes()
+    
+    def upload_bytes(self, data: bytes, gcs_path: str, bucket_name: str,
+                     content_type: str = "application/octet-stream",
+                     metadata: Optional[Dict[str, str]] = None) -> str:
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.blob(gcs_path)
+        if metadata:
+            blob.metadata = metadata
+        blob.upload_from_string(data, content_type=content_type)
+        return gcs_path
+    
+    def upload_stream(self, stream: BinaryIO, gcs_path: str, bucket_name: str,
+                      content_type: str = "application/octet-stream") -> str:
+        """파일 객체(BytesIO 등)를 임시 파일 없이 업로드 (현재 위치부터 끝까지)"""
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.blob(gcs_path)
+        blob.upload_from_file(stream, content_type=content_type)
+        return gcs_path
+    
+    def list_custom_metadata(self, prefix: str, bucket_name: str) -> Dict[str, Dict[str, str]]:
+        """prefix 아래 객체별 사용자 정의 메타데이터 {name: metadata} (본문 다운로드 없음)"""
+        bucket = self.client.bucket(bucket_name)
+        blobs = bucket.list_blobs(prefix=prefix, fields="items(name,metadata),nextPageToken")
+        return {blob.name: blob.metadata or {} for blob in blobs}
+
+    def get_md5(self, gcs_path: str, bucket_name: str) -> Optional[str]:
+        """객체 md5Hash (base64, 메타데이터만 조회), 없으면 None"""
+        bucket = self.client.bucket(bucket_name)
+        blob = bucket.get_blob(gcs_path)
+        return blob.md5_hash if blob is not None else None
+
+    def delete_file(self, gcs_path: str, bucket_name: str) -> None:
+        bucket = self.client.bucket(bucket_name)
+        bucket.blob(gcs_path).delete()
+
+    def list_paths(self, prefix: str, bucket_name: str) -> List[str]:
+        """prefix 아래 객체 경로 목록 (이름만 조회)"""
+        bucket = self.client.bucket(bucket_name)
+        blobs = bucket.list_blobs(prefix=prefix, fields="items(name),nextPageToken")
+        return [blob.name for blob in blobs]
+
+    def list_sizes(self, prefix: str, bucket_name: str) -> Dict[str, int]:
+        """prefix 아래 객체별 크기 {name: bytes} (이름/크기만 조회)"""
+        bucket = self.client.bucket(bucket_name)
+        blobs = bucket.list_blobs(prefix=prefix, fields="items(name,size),nextPageToken")
+        return {blob.name: blob.size for blob in blobs}
+
     def make_output_path(self, src_gcs_path: str, page_num: int) -> str:
         parts = src_gcs_path.rsplit("/", 1)
         dirs = parts[0] if len(parts) > 1 else ""
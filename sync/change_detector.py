@@ -1,17 +1,21 @@
 import os
 import sys
-from typing import Dict, List, Set, Tuple
+import time
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
-from storage.gcs_client import GCSStorageClient
+from storage.gcs_client import GCSStorageClient, BlobMetadata
 from db.repository import Repository
 from db.models import PDFDocument, DocumentStatus
-from utils.utils import compute_doc_hash, compute_content_hash
+from utils.utils import compute_doc_hashes, DocHashResult
+from utils.hash_cache import HashCache
 from utils.logger import get_logger
-from config import LOG_LEVEL
+from config import LOG_LEVEL, CHANGE_DETECTION_MODE, SCAN_MAX_WORKERS, GCS_LIST_SHARDED, GCS_LIST_SHARD_WORKERS
 
 logger = get_logger(__name__, LOG_LEVEL)
 
@@ -20,33 +24,178 @@ class FileInfo:
     path: str
     doc_id: str
     content_hash: str
+    blob: Optional[BlobMetadata] = None
+
+
+def is_same_object(blob: BlobMetadata, doc: PDFDocument) -> bool:
+    """GCS 메타데이터만으로 DB 문서와 동일한 객체인지 판단 (판단 불가 시 False)"""
+    if doc.generation and doc.generation == blob.generation:
+        return True
+    if doc.file_size is None or doc.file_size != blob.size:
+        return False
+    if blob.md5_hash and doc.md5_hash:
+        return blob.md5_hash == doc.md5_hash
+    if blob.crc32c and doc.crc32c:
+        return blob.crc32c == doc.crc32c
+    return False
+
 
 class ChangeDetector:
-    def __init__(self, storage_client: GCSStorageClient, repo: Repository):
+    def __init__(self, storage_client: GCSStorageClient, repo: Repository,
+                 mode: str = CHANGE_DETECTION_MODE, hash_cache: Optional[HashCache] = None,
+                 max_workers: int = SCAN_MAX_WORKERS, sharded: bool = GCS_LIST_SHARDED):
         self.storage = storage_client
         self.repo = repo
+        self.mode = mode
+        self.hash_cache = hash_cache
+        self.max_workers = max(1, max_workers)
+        self.sharded = sharded
     
     def scan_current_files(self) -> Dict[str, FileInfo]:
-        logger.info("GCS 파일 스캔 중...")
-        current_files = {}
-        pdf_paths = self.storage.list_pdfs()
-        
-        for i, path in enumerate(pdf_paths, 1):
+        # GCS 목록은 이름순 → 완료 순서/샤드 순서와 무관하게 이름순으로 반환
+        current_files = {file_info.path: file_info for file_info in self.iter_current_files()}
+        return dict(sorted(current_files.items()))
+
+    def iter_current_files(self) -> Iterator[FileInfo]:
+        """
+        목록 조회와 해시 계산을 겹쳐서 수행하고, 확정되는 대로 FileInfo를 yield
+        yield와 DB 쓰기(backfill)는 호출 스레드에서만 일어나므로 소비 측에서 같은 세션 사용 가능
+        """
+        logger.info(f"GCS 파일 스캔 중... (mode: {self.mode}, workers: {self.max_workers}, sharded: {self.sharded})")
+        docs_by_path = self.repo.get_documents_by_path() if self.mode == "metadata" else {}
+        completed: queue.Queue = queue.Queue()
+        listed = 0
+        scanned = 0
+        in_flight = 0
+        downloaded = 0
+        hashed_bytes = 0
+        hashed_seconds = 0.0
+        started = time.perf_counter()
+
+        def collect(blob: BlobMetadata, future: Future) -> Optional[FileInfo]:
+            nonlocal scanned, downloaded, hashed_bytes, hashed_seconds
+            scanned += 1
             try:
-                doc_id = compute_doc_hash(self.storage, path)
-                content_hash = compute_content_hash(self.storage, path)  # 추가
-                current_files[path] = FileInfo(
-                    path=path, 
-                    doc_id=doc_id, 
-                    content_hash=content_hash  # 추가
-                )
-                if i % 10 == 0:
-                    logger.info(f"  스캔 진행: {i}/{len(pdf_paths)}")
+                file_info, hashed = future.result()
+                if hashed is not None:
+                    downloaded += 1
+                    hashed_bytes += hashed.size
+                    hashed_seconds += hashed.elapsed
+                self._backfill_metadata(file_info, docs_by_path.get(blob.name, []))
+                return file_info
             except Exception as e:
-                logger.warning(f"파일 해시 계산 실패: {path} - {e}")
-        
-        logger.info(f"GCS 스캔 완료: {len(current_files)}개 파일")
-        return current_files
+                logger.warning(f"파일 해시 계산 실패: {blob.name} - {e}")
+                return None
+            finally:
+                if scanned % 10 == 0:
+                    logger.info(f"  스캔 진행: {scanned}/{listed}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for blob in self._iter_blobs():
+                listed += 1
+
+                # 1) DB 메타데이터 일치 → 네트워크 없이 바로 처리
+                file_info = self._match_metadata(blob, docs_by_path.get(blob.name, []))
+                if file_info is not None:
+                    scanned += 1
+                    if scanned % 10 == 0:
+                        logger.info(f"  스캔 진행: {scanned}/{listed}")
+                    yield file_info
+                else:
+                    # 2) 캐시 조회/해시 계산은 스레드풀에서 (목록 조회는 계속 진행)
+                    future = executor.submit(self._resolve_blob, blob)
+                    future.add_done_callback(lambda f, b=blob: completed.put((b, f)))
+                    in_flight += 1
+
+                # 목록 조회 중에도 끝난 작업은 바로 넘김
+                while not completed.empty():
+                    in_flight -= 1
+                    file_info = collect(*completed.get())
+                    if file_info is not None:
+                        yield file_info
+
+            # 목록 조회 완료 → 남은 작업 대기
+            while in_flight:
+                in_flight -= 1
+                file_info = collect(*completed.get())
+                if file_info is not None:
+                    yield file_info
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"GCS 스캔 완료: {listed}개 파일 (다운로드: {downloaded}개, "
+            f"{elapsed:.1f}s, {listed / elapsed if elapsed > 0 else 0:.1f} files/s)"
+        )
+        if downloaded:
+            # 스레드별 소요 시간 합계 기준 → 파일당 평균 스트리밍 속도
+            logger.info(
+                f"  해시 계산: {hashed_bytes / 1024 ** 2:.1f} MB, {hashed_seconds:.1f}s "
+                f"({hashed_bytes / 1024 ** 2 / hashed_seconds if hashed_seconds > 0 else 0:.1f} MB/s per worker, "
+                f"{hashed_bytes / 1024 ** 2 / elapsed if elapsed > 0 else 0:.1f} MB/s total)"
+            )
+        if self.hash_cache is not None:
+            stats = self.hash_cache.stats()
+            logger.info(
+                f"  해시 캐시: hit {stats['hits']}, miss {stats['misses']} "
+                f"({stats['hit_rate']:.1f}%), 저장 {stats['entries']}개"
+            )
+
+    def resolve_file(self, blob: BlobMetadata) -> FileInfo:
+        """단일 객체의 FileInfo 계산 (이벤트 기반 수집용, DB 메타데이터 → 캐시 → 해시 순)"""
+        known_docs = self.repo.get_documents_at_path(blob.name) if self.mode == "metadata" else []
+        file_info = self._match_metadata(blob, known_docs)
+        if file_info is None:
+            file_info, _ = self._resolve_blob(blob)
+            self._backfill_metadata(file_info, known_docs)
+        return file_info
+
+    def _iter_blobs(self) -> Iterator[BlobMetadata]:
+        if self.sharded:
+            return self.storage.iter_pdf_blobs_sharded(max_workers=GCS_LIST_SHARD_WORKERS)
+        return self.storage.iter_pdf_blobs()
+
+    def _resolve_blob(self, blob: BlobMetadata) -> Tuple[FileInfo, Optional[DocHashResult]]:
+        """캐시 조회 후 없으면 해시 계산 (워커 스레드에서 실행, DB 접근 금지)"""
+        file_info = self._match_cache(blob)
+        if file_info is not None:
+            return file_info, None
+        return self._hash_file(blob)
+
+    def _match_metadata(self, blob: BlobMetadata, known_docs: List[PDFDocument]) -> Optional[FileInfo]:
+        """같은 경로의 DB 문서와 메타데이터가 일치하면 다운로드 없이 FileInfo 반환"""
+        for doc in known_docs:
+            if doc.content_hash and is_same_object(blob, doc):
+                return FileInfo(path=blob.name, doc_id=doc.doc_id, content_hash=doc.content_hash, blob=blob)
+        return None
+
+    def _match_cache(self, blob: BlobMetadata) -> Optional[FileInfo]:
+        """로컬 해시 캐시에 같은 (bucket, name, generation, size)가 있으면 다운로드 생략"""
+        if self.hash_cache is None:
+            return None
+        cached = self.hash_cache.get(self.storage.source_bucket, blob)
+        if cached is None:
+            return None
+        doc_id, content_hash = cached
+        return FileInfo(path=blob.name, doc_id=doc_id, content_hash=content_hash, blob=blob)
+
+    def _hash_file(self, blob: BlobMetadata) -> Tuple[FileInfo, DocHashResult]:
+        """신규/모호한 파일은 한 번 스트리밍으로 읽어서 doc_id, content_hash 계산"""
+        hashed = compute_doc_hashes(self.storage, blob.name, generation=blob.generation or None)
+        logger.debug(
+            f"  해시 계산: {blob.name} ({hashed.size / 1024 ** 2:.1f} MB, "
+            f"{hashed.bytes_per_sec / 1024 ** 2:.1f} MB/s)"
+        )
+
+        if self.hash_cache is not None:
+            self.hash_cache.put(self.storage.source_bucket, blob, hashed.doc_id, hashed.content_hash)
+
+        file_info = FileInfo(path=blob.name, doc_id=hashed.doc_id, content_hash=hashed.content_hash, blob=blob)
+        return file_info, hashed
+
+    def _backfill_metadata(self, file_info: FileInfo, known_docs: List[PDFDocument]):
+        """메타데이터가 없던 기존 문서면 backfill → 다음 실행부터는 DB 메타데이터만으로 판단"""
+        if self.mode == "metadata" and any(doc.doc_id == file_info.doc_id for doc in known_docs):
+            self.repo.update_document_metadata(file_info.doc_id, file_info.blob)
 
     def get_db_files(self) -> Dict[str, FileInfo]:
         logger.info("DB 상태 조회 중...")
@@ -93,7 +242,7 @@ class ChangeDetector:
             else:
                 # 같은 content_hash가 이미 DB에 있다면 이동된 것
                 old_path = db_content_hashes[file_info.content_hash]
-                changes['moved'].append((old_path, path, file_info.content_hash))
+                changes['moved'].append((old_path, path, file_info.content_hash, file_info))
         
         # 삭제된 파일 감지
         deleted_paths = db_paths - current_paths
@@ -0,0 +1,133 @@
+# sync/notifications.py
+import os
+import sys
+import json
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from storage.gcs_client import BlobMetadata
+from utils.logger import get_logger
+from config import LOG_LEVEL, NOTIFICATION_SUBSCRIPTION, LOCAL_EVENT_DIR
+
+logger = get_logger(__name__, LOG_LEVEL)
+
+# GCS Pub/Sub 알림 eventType
+OBJECT_FINALIZE = "OBJECT_FINALIZE"
+OBJECT_DELETE = "OBJECT_DELETE"
+OBJECT_ARCHIVE = "OBJECT_ARCHIVE"  # 버전 관리 버킷에서 live 버전이 교체/삭제됨
+
+
+@dataclass
+class ObjectChangeEvent:
+    event_type: str
+    bucket: str
+    blob: BlobMetadata
+    overwritten_by_generation: Optional[int] = None  # 같은 경로에 새 버전이 올라와서 삭제된 경우
+
+    @property
+    def is_finalize(self) -> bool:
+        return self.event_type == OBJECT_FINALIZE
+
+    @property
+    def is_delete(self) -> bool:
+        return self.event_type in (OBJECT_DELETE, OBJECT_ARCHIVE)
+
+
+def parse_gcs_notification(attributes: Dict[str, str], data: bytes) -> Optional[ObjectChangeEvent]:
+    """
+    GCS Pub/Sub 알림 메시지 → ObjectChangeEvent
+    attributes: eventType, bucketId, objectId, objectGeneration, overwrittenByGeneration ...
+    data: JSON_API_V1 형식의 객체 리소스 (payload 없는 알림이면 attributes만 사용)
+    """
+    event_type = attributes.get("eventType")
+    if event_type not in (OBJECT_FINALIZE, OBJECT_DELETE, OBJECT_ARCHIVE):
+        return None
+
+    resource = json.loads(data) if data else {}
+    updated = resource.get("updated")
+
+    blob = BlobMetadata(
+        name=resource.get("name") or attributes["objectId"],
+        size=int(resource.get("size") or 0),
+        generation=int(resource.get("generation") or attributes.get("objectGeneration") or 0),
+        md5_hash=resource.get("md5Hash"),
+        crc32c=resource.get("crc32c"),
+        updated=datetime.fromisoformat(updated.replace("Z", "+00:00")) if updated else None,
+    )
+    overwritten_by = attributes.get("overwrittenByGeneration")
+
+    return ObjectChangeEvent(
+        event_type=event_type,
+        bucket=resource.get("bucket") or attributes.get("bucketId", ""),
+        blob=blob,
+        overwritten_by_generation=int(overwritten_by) if overwritten_by else None,
+    )
+
+
+class LocalEventSource:
+    """
+    Pub/Sub 대신 로컬 디렉토리를 큐로 사용 (테스트/개발용)
+    - {"attributes": {...}, "data": {...}} 형식의 .json 파일 하나가 메시지 하나
+    - ack 된 파일은 processed/ 로 이동
+    """
+    def __init__(self, directory: str = LOCAL_EVENT_DIR) -> None:
+        self.directory = directory
+        self.processed_dir = os.path.join(directory, "processed")
+        os.makedirs(self.processed_dir, exist_ok=True)
+
+    def pull(self, max_messages: int = 100) -> List[Tuple[str, Optional[ObjectChangeEvent]]]:
+        file_names = sorted(
+            f for f in os.listdir(self.directory)
+            if f.endswith(".json") and os.path.isfile(os.path.join(self.directory, f))
+        )
+        messages = []
+        for file_name in file_names[:max_messages]:
+            with open(os.path.join(self.directory, file_name), "r", encoding="utf-8") as f:
+                message = json.load(f)
+            data = message.get("data")
+            payload = json.dumps(data).encode("utf-8") if isinstance(data, dict) else (data or b"")
+            messages.append((file_name, parse_gcs_notification(message.get("attributes", {}), payload)))
+        return messages
+
+    def ack(self, ack_ids: List[str]) -> None:
+        for file_name in ack_ids:
+            shutil.move(os.path.join(self.directory, file_name), os.path.join(self.processed_dir, file_name))
+
+
+class PubSubEventSource:
+    """GCS 버킷 알림(Pub/Sub) 구독에서 이벤트 pull (google-cloud-pubsub 필요)"""
+    def __init__(self, subscription_path: str = NOTIFICATION_SUBSCRIPTION) -> None:
+        try:
+            from google.cloud import pubsub_v1
+        except ImportError as e:
+            raise ImportError("Pub/Sub 알림을 사용하려면 google-cloud-pubsub 설치 필요") from e
+
+        self.subscription_path = subscription_path
+        self.subscriber = pubsub_v1.SubscriberClient()
+
+    def pull(self, max_messages: int = 100) -> List[Tuple[str, Optional[ObjectChangeEvent]]]:
+        response = self.subscriber.pull(
+            request={"subscription": self.subscription_path, "max_messages": max_messages},
+            timeout=30,
+        )
+        return [
+            (received.ack_id, parse_gcs_notification(dict(received.message.attributes), received.message.data))
+            for received in response.received_messages
+        ]
+
+    def ack(self, ack_ids: List[str]) -> None:
+        if ack_ids:
+            self.subscriber.acknowledge(request={"subscription": self.subscription_path, "ack_ids": ack_ids})
+
+
+def create_event_source():
+    """NOTIFICATION_SUBSCRIPTION이 설정되어 있으면 Pub/Sub, 아니면 로컬 디렉토리 큐"""
+    if NOTIFICATION_SUBSCRIPTION:
+        return PubSubEventSource(NOTIFICATION_SUBSCRIPTION)
+    logger.info(f"NOTIFICATION_SUBSCRIPTION 미설정 → 로컬 이벤트 디렉토리 사용: {LOCAL_EVENT_DIR}")
+    return LocalEventSource(LOCAL_EVENT_DIR)
@@ -1,29 +1,32 @@
 # sync/sync_manager.py
 import os
 import sys
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
-from sync.change_detector import ChangeDetector
+from sync.change_detector import ChangeDetector, FileInfo
 from sync.file_sync import FileSyncManager
-from storage.gcs_client import GCSStorageClient
+from sync.notifications import ObjectChangeEvent, create_event_source
+from storage.gcs_client import GCSStorageClient, BlobMetadata
 from db.repository import Repository
 from db.models import DocumentStatus
 from processor.pdf_manager import PDFManager
+from utils.hash_cache import HashCache
 from utils.logger import get_logger
-from utils.utils import compute_doc_hash
-from config import LOG_LEVEL
+from config import LOG_LEVEL, EVENT_POLL_INTERVAL_SEC, RECONCILE_INTERVAL_SEC
 
 logger = get_logger(__name__, LOG_LEVEL)
 
 class SyncManager:
-    def __init__(self, storage_client: GCSStorageClient, repo: Repository, manager: PDFManager = None):
+    def __init__(self, storage_client: GCSStorageClient, repo: Repository, manager: PDFManager = None,
+                 hash_cache: HashCache = None):
         self.storage = storage_client
         self.repo = repo
         self.manager = manager  # 인덱싱 시에만 필요
-        self.detector = ChangeDetector(storage_client, repo)
+        self.detector = ChangeDetector(storage_client, repo, hash_cache=hash_cache)
         self.file_sync = FileSyncManager()
     
     def sync_with_gcs(self) -> Dict:
@@ -48,9 +51,7 @@ class SyncManager:
             
             # 3. Document 상태 변경
             logger.info("Step 3: Document 상태 변경")
-            self._handle_deleted_files(changes['deleted'])
-            self._handle_moved_files(changes['moved'])
-            self._handle_new_files(changes['new'])
+            self._apply_document_changes(changes)
             
             # 4. Document ↔ Page 상태 동기화 (핵심!)
             logger.info("Step 4: Document ↔ Page 상태 동기화")
@@ -71,10 +72,151 @@ class SyncManager:
             logger.error(f"동기화 중 오류 발생: {e}")
             raise
     
-    def _handle_deleted_files(self, deleted_files):
-        """삭제된 파일들 처리 - Document 상태만 변경"""
+    def reconcile(self) -> Dict:
+        """전체 재스캔으로 이벤트 누락분 보정 (로컬 → GCS 파일 동기화 없이 감지/반영만)"""
+        changes = self.detector.detect_changes()
+        self._apply_document_changes(changes)
+        self.repo.sync_page_status_with_documents()
+        return changes
+
+    def sync_from_events(self, source, max_messages: int = 100) -> Dict:
+        """
+        객체 변경 알림(FINALIZE/DELETE)으로 받은 경로만 처리 → 전체 재스캔 없이 O(변경 수)
+        처리에 실패한 메시지는 ack 하지 않아서 다음 pull에서 다시 처리됨
+        """
+        changes = {'new': [], 'deleted': [], 'moved': [], 'unchanged': []}
+        messages = source.pull(max_messages)
+        if not messages:
+            return changes
+
+        ack_ids = []
+        applied: List[tuple] = []  # (ack_id, 경로): DB 반영이 끝난 뒤 ack
+        finalized: List[tuple] = []
+        deleted: List[tuple] = []
+        finalized_docs: Dict[Tuple[str, int], str] = {}  # (경로, generation) → doc_id, 덮어쓰기 판단용
+        for ack_id, event in messages:
+            if event is None or event.bucket != self.storage.source_bucket or not event.blob.name.lower().endswith(".pdf"):
+                ack_ids.append(ack_id)  # 처리 대상 아님
+            elif event.is_finalize:
+                finalized.append((ack_id, event))
+            else:
+                deleted.append((ack_id, event))
+
+        # 이동(copy + delete) 감지를 위해 FINALIZE 먼저 분류
+        for ack_id, event in finalized:
+            try:
+                file_info = self._classify_finalized(event.blob, changes)
+                finalized_docs[(event.blob.name, event.blob.generation)] = file_info.doc_id
+                applied.append((ack_id, event.blob.name))
+            except Exception as e:
+                logger.warning(f"이벤트 처리 실패 (FINALIZE): {event.blob.name} - {e}")
+
+        moved_content_hashes = {content_hash for _, _, content_hash, _ in changes['moved']}
+        for ack_id, event in deleted:
+            try:
+                self._classify_deleted(event, moved_content_hashes, changes, finalized_docs)
+                applied.append((ack_id, event.blob.name))
+            except Exception as e:
+                logger.warning(f"이벤트 처리 실패 (DELETE): {event.blob.name} - {e}")
+
+        logger.info(
+            f"이벤트 {len(messages)}개 → 새 파일 {len(changes['new'])}개, 삭제 {len(changes['deleted'])}개, "
+            f"이동 {len(changes['moved'])}개, 변경 없음 {len(changes['unchanged'])}개"
+        )
+        failed_paths = self._apply_document_changes(changes)
+        if changes['new'] or changes['deleted'] or changes['moved']:
+            self.repo.sync_page_status_with_documents()
+
+        # DB 반영에 실패한 경로의 메시지는 ack 하지 않음 → 다음 pull에서 다시 처리
+        ack_ids += [ack_id for ack_id, path in applied if path not in failed_paths]
+        if failed_paths:
+            logger.warning(f"DB 반영 실패 {len(failed_paths)}건 → 메시지 재처리 예정")
+        source.ack(ack_ids)
+        return changes
+
+    def run_event_loop(self, source=None,
+                       poll_interval: int = EVENT_POLL_INTERVAL_SEC,
+                       reconcile_interval: int = RECONCILE_INTERVAL_SEC):
+        """이벤트 기반 동기화 루프 + 주기적 전체 재스캔 (시작 시 1회 포함)"""
+        source = source or create_event_source()
+        logger.info("=== 이벤트 기반 동기화 시작 ===")
+        last_reconciled = None
+
+        while True:
+            try:
+                if last_reconciled is None or time.monotonic() - last_reconciled >= reconcile_interval:
+                    logger.info("주기적 전체 재스캔 (reconciliation)")
+                    self.reconcile()
+                    last_reconciled = time.monotonic()
+
+                changes = self.sync_from_events(source)
+                if not any(changes.values()):
+                    time.sleep(poll_interval)
+
+            except Exception as e:
+                logger.error(f"이벤트 동기화 중 오류 발생: {e}")
+                self.repo.session.rollback()
+                time.sleep(poll_interval)
+
+    def _classify_finalized(self, blob: BlobMetadata, changes: Dict) -> FileInfo:
+        """
+        새로 올라온 객체 → new / moved / unchanged 분류, 반환: 객체의 FileInfo
+        - 같은 내용으로 덮어쓴 ACTIVE 문서는 unchanged + 새 generation 기록
+          (이전 generation의 DELETE 알림이 문서를 비활성화하지 않도록)
+        - 삭제 후 다시 올라온 INACTIVE 문서는 new → _handle_new_files에서 다시 활성화
+        """
+        file_info = self.detector.resolve_file(blob)
+        doc = self.repo.get_document(file_info.doc_id)
+        if doc is not None and doc.status == DocumentStatus.ACTIVE:
+            if blob.generation and doc.generation != blob.generation:
+                self.repo.update_document_metadata(doc.doc_id, blob)
+            changes['unchanged'].append(file_info)
+            return file_info
+        if doc is not None:
+            changes['new'].append(file_info)
+            return file_info
+
+        # 같은 내용의 ACTIVE 문서가 다른 경로에 있으면 이동
+        for doc in self.repo.get_documents_by_content_hash(file_info.content_hash):
+            if doc.gcs_path != blob.name:
+                changes['moved'].append((doc.gcs_path, blob.name, file_info.content_hash, file_info))
+                return file_info
+
+        changes['new'].append(file_info)
+        return file_info
+
+    def _classify_deleted(self, event: ObjectChangeEvent, moved_content_hashes: set, changes: Dict,
+                          finalized_docs: Optional[Dict[Tuple[str, int], str]] = None):
+        """
+        삭제(또는 덮어쓰기)된 객체 → 해당 generation의 ACTIVE 문서를 deleted로 분류
+        finalized_docs: 같은 pull에서 분류한 FINALIZE의 {(경로, generation): doc_id}
+        → 덮어쓴 새 버전이 같은 문서(같은 내용)면 비활성화하지 않음
+        """
+        replaced_by = None
+        if event.overwritten_by_generation:
+            replaced_by = (finalized_docs or {}).get((event.blob.name, event.overwritten_by_generation))
+        for doc in self.repo.get_documents_at_path(event.blob.name, active_only=True):
+            if doc.generation and event.blob.generation and doc.generation != event.blob.generation:
+                continue  # 다른 버전에 대한 알림
+            if doc.content_hash in moved_content_hashes:
+                continue  # 이동으로 이미 처리됨
+            if replaced_by == doc.doc_id:
+                continue  # 같은 내용으로 덮어쓰기
+            changes['deleted'].append(FileInfo(path=doc.gcs_path, doc_id=doc.doc_id, content_hash=doc.content_hash or ""))
+
+    def _apply_document_changes(self, changes: Dict) -> set:
+        """변경사항 DB 반영, 반환: 반영에 실패한 경로 (이동은 기존/새 경로 모두)"""
+        failed = set()
+        failed.update(self._handle_deleted_files(changes['deleted']))
+        failed.update(self._handle_moved_files(changes['moved']))
+        failed.update(self._handle_new_files(changes['new']))
+        return failed
+
+    def _handle_deleted_files(self, deleted_files) -> List[str]:
+        """삭제된 파일들 처리 - Document 상태만 변경, 반환: 실패한 경로"""
+        failed = []
         if not deleted_files:
-            return
+            return failed
             
         logger.info(f"삭제된 파일 {len(deleted_files)}개 처리 중...")
         
@@ -85,16 +227,20 @@ class SyncManager:
                 logger.info(f"삭제 처리 완료: {file_info.path}")
                 
             except Exception as e:
+                self.repo.session.rollback()
+                failed.append(file_info.path)
                 logger.error(f"삭제 처리 실패: {file_info.path} - {e}")
+        return failed
     
-    def _handle_moved_files(self, moved_files):
-        """이동된 파일들 처리"""
+    def _handle_moved_files(self, moved_files) -> List[str]:
+        """이동된 파일들 처리, 반환: 실패한 경로 (기존/새 경로)"""
+        failed = []
         if not moved_files:
-            return
+            return failed
             
         logger.info(f"이동된 파일 {len(moved_files)}개 처리 중...")
         
-        for old_path, new_path, content_hash in moved_files:
+        for old_path, new_path, content_hash, file_info in moved_files:
             try:
                 # 1. 기존 문서 INACTIVE 처리
                 old_doc_id = self.repo.get_doc_id_by_content_hash(content_hash)
@@ -102,35 +248,54 @@ class SyncManager:
                     self.repo.update_document_status(old_doc_id, DocumentStatus.INACTIVE)
                     logger.info(f"기존 문서 INACTIVE 처리: {old_path}")
                 
-                # 2. 새 문서로 등록 (ACTIVE 상태로 자동 등록됨)
-                new_doc_id = compute_doc_hash(self.storage, new_path)
-                if not self.repo.exists_document(new_doc_id):
-                    self.repo.create_document(new_doc_id, new_path)
-                    self.repo.update_content_hash(new_doc_id, content_hash)
-                    logger.info(f"새 문서 등록: {new_path}")
+                # 2. 새 문서로 등록 (ACTIVE 상태로 자동 등록됨, 스캔 시 계산한 doc_id 재사용)
+                self._register_document(file_info)
                 
                 logger.info(f"이동 처리 완료: {old_path} -> {new_path}")
                 
             except Exception as e:
+                self.repo.session.rollback()
+                failed += [old_path, new_path]
                 logger.error(f"이동 처리 실패: {old_path} -> {new_path} - {e}")
+        return failed
     
-    def _handle_new_files(self, new_files):
-        """새 파일들 DB 등록"""
+    def _handle_new_files(self, new_files) -> List[str]:
+        """새 파일들 DB 등록, 반환: 실패한 경로"""
+        failed = []
         if not new_files:
-            return
+            return failed
             
         logger.info(f"새 파일 {len(new_files)}개 DB 등록 중...")
         
         for file_info in new_files:
             try:
                 # DB에 문서 등록 (ACTIVE 상태로 자동 등록됨)
-                if not self.repo.exists_document(file_info.doc_id):
-                    self.repo.create_document(file_info.doc_id, file_info.path)
-                    self.repo.update_content_hash(file_info.doc_id, file_info.content_hash)
-                    logger.info(f"새 문서 등록: {file_info.path}")
+                self._register_document(file_info)
                 
             except Exception as e:
+                self.repo.session.rollback()
+                failed.append(file_info.path)
                 logger.error(f"새 문서 등록 실패: {file_info.path} - {e}")
+        return failed
+
+    def _register_document(self, file_info: FileInfo):
+        """
+        문서 등록 (ACTIVE)
+        삭제 후 같은 경로에 같은 내용으로 다시 올라온 문서는 doc_id가 같음 → INACTIVE 문서를 다시 활성화
+        (Page 상태는 sync_page_status_with_documents에서 함께 복구)
+        """
+        doc = self.repo.get_document(file_info.doc_id)
+        if doc is None:
+            self.repo.create_document(
+                file_info.doc_id, file_info.path,
+                content_hash=file_info.content_hash, blob=file_info.blob
+            )
+            logger.info(f"새 문서 등록: {file_info.path}")
+        elif doc.status != DocumentStatus.ACTIVE:
+            if file_info.blob is not None:
+                self.repo.update_document_metadata(file_info.doc_id, file_info.blob)
+            self.repo.update_document_status(file_info.doc_id, DocumentStatus.ACTIVE)
+            logger.info(f"문서 다시 활성화: {file_info.path}")
 
 if __name__ == "__main__":
     # 테스트용
@@ -146,7 +311,12 @@ if __name__ == "__main__":
     repo = Repository(session)
     
     # manager는 일단 None으로 (동기화 단계에서는 불필요)
-    sync_manager = SyncManager(storage_client, repo, None)
+    sync_manager = SyncManager(storage_client, repo, None, hash_cache=HashCache())
+
+    # 이벤트 기반 모드: python sync/sync_manager.py --events
+    if "--events" in sys.argv:
+        sync_manager.run_event_loop()
+
     changes = sync_manager.sync_with_gcs()
     
     print(f"\n=== 최종 결과 ===")
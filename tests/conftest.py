@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# config.py는 .env 없이도 import 되어야 테스트 수집이 가능 (DB에는 연결하지 않음)
+os.environ.setdefault("MYSQL_PORT", "3306")
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+
+@compiles(LONGTEXT, "sqlite")
+def _longtext_as_text(type_, compiler, **kw):
+    return "TEXT"
+
+
+@pytest.fixture
+def db_session():
+    """테스트마다 새 in-memory sqlite DB (db.models 전체 테이블)"""
+    from db.models import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+from types import SimpleNamespace
+from typing import Dict, List
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.batch import BatchManager, LocalBatchBackend, target_uri, response_text
+from db.models import PageStatus, TextSource
+
+
+class MemoryStorage:
+    """처리 버킷 대신 메모리에 객체 저장 (manifest 저장/조회/삭제만 사용)"""
+    target_bucket = "processed"
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, bytes] = {}
+
+    def upload_bytes(self, data: bytes, gcs_path: str, bucket_name: str, content_type: str = "", metadata=None) -> str:
+        self.objects[gcs_path] = data
+        return gcs_path
+
+    def download_bytes(self, gcs_path: str, bucket_name: str) -> bytes:
+        return self.objects[gcs_path]
+
+    def delete_file(self, gcs_path: str, bucket_name: str) -> None:
+        del self.objects[gcs_path]
+
+    def list_paths(self, prefix: str, bucket_name: str) -> List[str]:
+        return [path for path in self.objects if path.startswith(prefix)]
+
+
+class RecordingRepository:
+    def __init__(self) -> None:
+        self.updates: List[Dict] = []
+        self.session = SimpleNamespace(get=lambda model, key: None)  # 요약 컨텍스트: synopsis/contact sheet 없는 문서
+
+    def bulk_update_pages(self, mappings: List[Dict]) -> None:
+        self.updates.extend(mappings)
+
+    def get_first_n_pages(self, doc_id: str, n: int) -> List[str]:
+        return [f"docs/{doc_id}/{doc_id}-page-{number:05d}.png" for number in range(1, n + 1)]
+
+
+def make_page(number: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        page_id=f"doc_{number:05d}", doc_id="doc", gcs_path=f"docs/doc/doc-page-{number:05d}.png",
+    )
+
+
+def write_output(backend: LocalBatchBackend, job_id: str, lines: List[Dict]) -> None:
+    with open(os.path.join(backend.root, job_id, "output", "predictions.jsonl"), "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+
+
+def test_submit_then_ingest_with_local_backend(tmp_path):
+    storage = MemoryStorage()
+    repo = RecordingRepository()
+    backend = LocalBatchBackend(str(tmp_path))
+    manager = BatchManager(repo, storage, backend)
+    pages = [make_page(1), make_page(2)]
+
+    job = manager.submit("extraction", pages)
+    assert job is not None
+    with open(os.path.join(backend.root, job.job_id, "input.jsonl"), encoding="utf-8") as f:
+        requests = [json.loads(raw) for raw in f]
+    assert len(requests) == 2
+
+    # 결과 전: 진행 중, 같은 페이지는 다시 제출하지 않음
+    assert manager.ingest_finished("extraction")["running"] == 1
+    assert manager.submit("extraction", pages) is None
+
+    # 다른 호스트(새 BatchManager, 같은 버킷)도 진행 중인 작업을 봄
+    assert [j.name for j in BatchManager(repo, storage, backend).open_jobs("extraction")] == [job.name]
+
+    # 첫 페이지만 응답, 두 번째 페이지는 결과 없음
+    write_output(backend, job.job_id, [{
+        "request": requests[0]["request"],
+        "response": {"candidates": [{"content": {"parts": [{"text": "page one"}]}}]},
+    }])
+    totals = manager.ingest_finished("extraction")
+    assert totals == {"jobs": 1, "succeeded": 1, "failed": 1, "running": 0}
+
+    updates = {mapping["page_id"]: mapping for mapping in repo.updates}
+    assert updates["doc_00001"]["extracted_text"] == "page one"
+    assert updates["doc_00001"]["extracted"] == PageStatus.SUCCESS
+    assert updates["doc_00001"]["text_source"] == TextSource.GEMINI
+    assert updates["doc_00002"]["extracted"] == PageStatus.FAILED
+
+    # 반영한 작업은 open/에서 빠지고 다시 반영하지 않음
+    assert manager.open_jobs("extraction") == []
+    assert any(path.endswith(f"ingested/{job.name}.json") for path in storage.objects)
+    assert manager.ingest_finished("extraction")["jobs"] == 0
+
+
+def test_summary_job_targets_page_after_context_images(tmp_path):
+    storage = MemoryStorage()
+    repo = RecordingRepository()
+    backend = LocalBatchBackend(str(tmp_path))
+    manager = BatchManager(repo, storage, backend)
+    page = make_page(7)
+
+    job = manager.submit("summary", [page])
+    with open(os.path.join(backend.root, job.job_id, "input.jsonl"), encoding="utf-8") as f:
+        request = json.loads(f.readline())
+
+    # 컨텍스트 이미지(첫 페이지들) 뒤에 대상 페이지 → manifest 조회는 마지막 이미지 URI
+    assert target_uri(request) == f"gs://processed/{page.gcs_path}"
+    assert job.pages == {target_uri(request): page.page_id}
+
+    write_output(backend, job.job_id, [{"request": request["request"], "response": {}, "status": "SAFETY"}])
+    assert manager.ingest_finished("summary") == {"jobs": 1, "succeeded": 0, "failed": 1, "running": 0}
+    assert repo.updates == [{"page_id": page.page_id, "summarized": PageStatus.FAILED, "error_message": "Batch Error: SAFETY"}]
+
+
+def test_response_text_joins_parts_and_handles_empty_responses():
+    assert response_text({"response": {"candidates": [{"content": {"parts": [{"text": "a"}, {"text": "b"}]}}]}}) == "ab"
+    assert response_text({"response": {"candidates": []}}) is None
+    assert response_text({"status": "error"}) is None
+    assert target_uri({"request": {"contents": [{"parts": [{"text": "prompt"}]}]}}) is None
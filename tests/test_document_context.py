@@ -0,0 +1,67 @@
+import os
+import sys
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.pdf_manager import PDFManager
+
+
+class MemoryStorage:
+    source_bucket = "source"
+    target_bucket = "processed"
+
+    def __init__(self) -> None:
+        self.downloads: List[str] = []
+
+    def download_bytes(self, gcs_path: str, bucket_name: str) -> bytes:
+        self.downloads.append(gcs_path)
+        return b"image"
+
+
+def make_manager(storage: MemoryStorage, lookups: Dict[str, int]) -> PDFManager:
+    manager = PDFManager(storage, None, None, None, summary_context_mode="pages", session_factory=None)
+
+    async def context_paths(doc_id: str) -> List[str]:
+        lookups[doc_id] = lookups.get(doc_id, 0) + 1
+        await asyncio.sleep(0.01)  # 다른 요청이 잠금에서 기다리도록
+        if doc_id == "broken":
+            raise RuntimeError("db down")
+        return [f"{doc_id}/page-{n}.png" for n in (1, 2)]
+
+    manager._context_paths_async = context_paths
+    return manager
+
+
+def test_concurrent_requests_fetch_context_once_and_release_locks():
+    storage = MemoryStorage()
+    lookups: Dict[str, int] = {}
+    manager = make_manager(storage, lookups)
+
+    async def run():
+        return await asyncio.gather(*[
+            manager._document_context_async(doc_id, images=True) for doc_id in ["a"] * 4 + ["b"] * 2
+        ])
+
+    contexts = asyncio.run(run())
+
+    assert lookups == {"a": 1, "b": 1}
+    assert sorted(storage.downloads) == ["a/page-1.png", "a/page-2.png", "b/page-1.png", "b/page-2.png"]
+    assert all(context.images == [b"image", b"image"] for context in contexts)
+    # 캐시에 넣은 뒤 문서별 잠금은 남지 않음
+    assert manager._context_locks == {}
+    assert manager._context_waiters == {}
+
+
+def test_failed_context_lookup_releases_lock():
+    manager = make_manager(MemoryStorage(), {})
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager._document_context_async("broken", images=True))
+
+    assert manager._context_locks == {}
+    assert manager._context_waiters == {}
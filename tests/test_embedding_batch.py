@@ -0,0 +1,85 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from google.genai import errors as genai_errors
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+import processor.pdf_manager as pdf_manager
+from processor.pdf_manager import PDFManager
+from processor.embedder import batch_texts, estimate_tokens
+
+
+def client_error(code: int, status: str) -> genai_errors.ClientError:
+    return genai_errors.ClientError(code, {"error": {"code": code, "message": status, "status": status}})
+
+
+def make_page(number: int, text: str = "본문") -> SimpleNamespace:
+    return SimpleNamespace(page_id=f"doc_{number:05d}", summary="", extracted_text=text)
+
+
+def run_batch(monkeypatch, pages, fail) -> tuple:
+    calls: List[int] = []
+
+    async def embed(texts, client):
+        calls.append(len(texts))
+        error = fail(texts)
+        if error is not None:
+            raise error
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(pdf_manager, "get_text_embeddings_async", embed)
+    manager = PDFManager(None, None, None, None, session_factory=None)
+    return asyncio.run(manager.invoke_embedding_batch_async(pages)), calls
+
+
+def test_rejected_batch_is_split_down_to_the_bad_page(monkeypatch):
+    pages = [make_page(n, "bad" if n == 5 else "ok") for n in range(8)]
+    bad_request = client_error(400, "INVALID_ARGUMENT")
+
+    results, calls = run_batch(monkeypatch, pages, lambda texts: bad_request if any("bad" in t for t in texts) else None)
+
+    assert sorted(calls) == [1, 1, 2, 2, 4, 4, 8]  # 실패한 절반만 다시 나눔
+    assert results["doc_00005"][0] is None and "INVALID_ARGUMENT" in results["doc_00005"][1]
+    assert all(results[page.page_id][1] is None for page in pages if page.page_id != "doc_00005")
+
+
+def test_empty_text_is_not_sent(monkeypatch):
+    results, calls = run_batch(monkeypatch, [make_page(1), make_page(2, "  ")], lambda texts: None)
+
+    assert calls == [1]
+    assert results["doc_00002"] == (None, "임베딩 대상 텍스트가 비어있음")
+
+
+@pytest.mark.parametrize("error", [
+    client_error(429, "RESOURCE_EXHAUSTED"),
+    genai_errors.ServerError(503, {"error": {"code": 503, "message": "UNAVAILABLE", "status": "UNAVAILABLE"}}),
+])
+def test_quota_and_server_errors_are_raised_without_splitting(monkeypatch, error):
+    calls: List[int] = []
+
+    async def embed(texts, client):
+        calls.append(len(texts))
+        raise error
+
+    monkeypatch.setattr(pdf_manager, "get_text_embeddings_async", embed)
+    manager = PDFManager(None, None, None, None, session_factory=None)
+
+    with pytest.raises(type(error)):
+        asyncio.run(manager.invoke_embedding_batch_async([make_page(n) for n in range(4)]))
+    assert calls == [4]
+
+
+def test_batch_texts_limits_count_and_tokens():
+    assert batch_texts(["a"] * 5, max_count=2, max_tokens=100) == [[0, 1], [2, 3], [4]]
+
+    long_text = "가" * 100
+    limit = estimate_tokens(long_text) + estimate_tokens("a")
+    assert batch_texts(["a", long_text, "a", "a"], max_count=10, max_tokens=limit) == [[0, 1], [2, 3]]
+    # 혼자서 한도를 넘는 텍스트는 단독 요청
+    assert batch_texts([long_text, "a"], max_count=10, max_tokens=1) == [[0], [1]]
@@ -0,0 +1,42 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.pdf_manager import PDFManager
+from processor.extractor import FusedResult
+
+PAGE = SimpleNamespace(page_id="doc_00001", doc_id="doc", gcs_path="docs/doc/doc-page-00001.png")
+
+
+def make_manager(response) -> PDFManager:
+    manager = PDFManager(None, None, None, None, session_factory=None)
+
+    async def request_with_context(page, request):
+        if isinstance(response, Exception):
+            raise response
+        return FusedResult.model_validate_json(response)
+
+    manager._request_with_context_async = request_with_context
+    return manager
+
+
+def test_valid_fused_response():
+    manager = make_manager('{"extracted_text": "text", "summary": "summary"}')
+    assert asyncio.run(manager.invoke_fused_async(PAGE)) == ("text", "summary")
+
+
+@pytest.mark.parametrize("response", ['{"extracted_text": "text"}', '{"extracted_text": "te'])
+def test_invalid_fused_response_returns_none_for_fallback(response):
+    # None → orchestrator가 텍스트 추출 모델의 페이지별 항목으로 다시 처리
+    assert asyncio.run(make_manager(response).invoke_fused_async(PAGE)) is None
+
+
+def test_other_errors_are_raised():
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_manager(RuntimeError("503")).invoke_fused_async(PAGE))
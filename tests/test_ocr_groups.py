@@ -0,0 +1,93 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.extractor import MultiPageResult
+from processor.ocr_groups import group_pages, estimate_page_tokens
+from processor.pdf_manager import PDFManager
+
+
+def make_page(doc_id: str, number: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        page_id=f"{doc_id}_{number:05d}", doc_id=doc_id, page_number=number,
+        gcs_path=f"docs/{doc_id}/{doc_id}-page-{number:05d}.png",
+    )
+
+
+def response(*pages) -> str:
+    return MultiPageResult(pages=[{"page_number": n, "markdown": f"page {n}"} for n in pages]).model_dump_json()
+
+
+def test_by_page_maps_requested_pages():
+    assert MultiPageResult.model_validate_json(response(3, 4)).by_page([3, 4]) == {3: "page 3", 4: "page 4"}
+
+
+@pytest.mark.parametrize("pages", [(3,), (3, 3, 4), (3, 4, 5)])
+def test_by_page_rejects_missing_duplicate_or_extra_pages(pages):
+    with pytest.raises(ValueError):
+        MultiPageResult.model_validate_json(response(*pages)).by_page([3, 4])
+
+
+def test_truncated_response_is_a_value_error():
+    # 출력 토큰 초과로 잘린 JSON → ValidationError (ValueError 하위 클래스)
+    with pytest.raises(ValidationError):
+        MultiPageResult.model_validate_json(response(3, 4)[:-10])
+    assert issubclass(ValidationError, ValueError)
+
+
+def test_group_pages_keeps_consecutive_pages_of_one_document():
+    pages = [make_page("a", n) for n in (1, 2, 3, 5)] + [make_page("b", 1)]
+    sizes = {page.gcs_path: 0 for page in pages}
+
+    groups = group_pages(pages, sizes, max_pages=2, token_budget=10_000)
+
+    assert [[page.page_id for page in group] for group in groups] == [
+        ["a_00001", "a_00002"], ["a_00003"], ["a_00005"], ["b_00001"],
+    ]
+
+
+def test_group_pages_respects_token_budget_and_unknown_sizes():
+    pages = [make_page("a", n) for n in range(1, 5)]
+    budget = estimate_page_tokens(4000, 4) * 2
+    sizes = {pages[0].gcs_path: 4000, pages[1].gcs_path: 4000, pages[2].gcs_path: 4000}  # 4페이지 크기 모름
+
+    groups = group_pages(pages, sizes, max_pages=8, token_budget=budget, bytes_per_token=4)
+
+    assert [len(group) for group in groups] == [2, 1, 1]
+
+
+def make_manager(texts) -> PDFManager:
+    manager = PDFManager(None, None, None, None, session_factory=None)
+
+    async def extract_group(pages, page_numbers):
+        if isinstance(texts, Exception):
+            raise texts
+        return MultiPageResult.model_validate_json(texts).by_page(page_numbers)
+
+    manager._extract_group_async = extract_group
+    return manager
+
+
+def test_group_extraction_maps_texts_to_pages():
+    pages = [make_page("a", 1), make_page("a", 2)]
+    result = asyncio.run(make_manager(response(1, 2)).invoke_extraction_group_async(pages))
+    assert result == {"a_00001": "page 1", "a_00002": "page 2"}
+
+
+def test_malformed_group_response_returns_none_for_fallback():
+    pages = [make_page("a", 1), make_page("a", 2)]
+    # None → orchestrator가 페이지별 텍스트 추출 항목으로 다시 처리
+    assert asyncio.run(make_manager(response(1)).invoke_extraction_group_async(pages)) is None
+
+
+def test_group_request_errors_are_raised():
+    pages = [make_page("a", 1), make_page("a", 2)]
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_manager(RuntimeError("503")).invoke_extraction_group_async(pages))
@@ -0,0 +1,36 @@
+import os
+import sys
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from db.repository import Repository
+from db.models import PipelineStatus, PipelineStatusEnum
+
+
+def test_pipeline_run_updates_only_its_own_row(db_session):
+    repo = Repository(db_session)
+    first = repo.create_pipeline_run()
+    second = repo.create_pipeline_run()
+    assert first.started_at is not None and first.status == PipelineStatusEnum.RUNNING
+
+    repo.update_pipeline_status(PipelineStatusEnum.RUNNING, stage="summary", run_id=first.id, model_calls=3)
+    repo.update_pipeline_status(PipelineStatusEnum.COMPLETED, stage="done", run_id=first.id)
+
+    first = db_session.get(PipelineStatus, first.id)
+    second = db_session.get(PipelineStatus, second.id)
+    assert (first.status, first.stage, first.model_calls) == (PipelineStatusEnum.COMPLETED, "done", 3)
+    assert first.completed_at is not None
+    # 나중에 시작한 실행(가장 최근 행)은 그대로
+    assert (second.status, second.stage, second.completed_at) == (PipelineStatusEnum.RUNNING, None, None)
+
+
+def test_pipeline_status_without_run_id_updates_latest(db_session):
+    repo = Repository(db_session)
+    repo.create_pipeline_run()
+    latest = repo.create_pipeline_run()
+
+    repo.update_pipeline_status(PipelineStatusEnum.FAILED, error_message="boom")
+
+    assert db_session.get(PipelineStatus, latest.id).status == PipelineStatusEnum.FAILED
+    assert repo.get_current_pipeline_status() == PipelineStatusEnum.FAILED.value
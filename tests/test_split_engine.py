@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import pytest
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+import processor.split_engine as split_engine
+from processor.split_engine import SplitEngine, page_windows
+from processor.image_encoding import get_encoding_profile
+
+
+class MemoryStorage:
+    target_bucket = "processed"
+
+    def __init__(self, release: threading.Event = None) -> None:
+        self.objects: Dict[str, dict] = {}
+        self.release = release
+
+    def upload_bytes(self, data: bytes, gcs_path: str, bucket_name: str, content_type: str = "", metadata=None) -> str:
+        if self.release is not None:
+            self.release.wait(5)
+        self.objects[gcs_path] = dict(metadata or {})
+        return gcs_path
+
+
+def make_engine(storage: MemoryStorage, processes: int = 1, window: int = 2, max_buffered_pages: int = 2) -> SplitEngine:
+    engine = SplitEngine(storage, processes=processes, upload_workers=1, window=window, max_buffered_pages=max_buffered_pages)
+    # 테스트에서는 프로세스 대신 스레드로 래스터화 (render_window를 바꿔치기할 수 있도록)
+    engine.render_pool.shutdown()
+    engine.render_pool = ThreadPoolExecutor(max_workers=engine.processes)
+    return engine
+
+
+def fake_render(rendered: List[int], skip=()):
+    def render(local_pdf_path, first_page, last_page, profile):
+        rendered.extend(range(first_page, last_page + 1))
+        return [(p, b"image", f"hash-{p}") for p in range(first_page, last_page + 1) if p not in skip]
+    return render
+
+
+def test_page_windows_split_on_gaps():
+    assert page_windows([1, 2, 3, 5, 6, 9], 2) == [(1, 2), (3, 3), (5, 6), (9, 9)]
+    assert page_windows([], 4) == []
+
+
+def test_split_uploads_and_checkpoints_every_page(monkeypatch):
+    rendered: List[int] = []
+    monkeypatch.setattr(split_engine, "render_window", fake_render(rendered))
+    storage = MemoryStorage()
+    checkpoints: List[Dict[int, str]] = []
+    hashes: Dict[int, str] = {}
+
+    def on_pages(page_infos, page_hashes):
+        checkpoints.append(page_infos)
+        hashes.update(page_hashes)
+
+    page_infos = make_engine(storage).split(
+        "doc.pdf", list(range(1, 8)), get_encoding_profile("png"), lambda p: f"doc/page-{p}.png",
+        {"source_generation": "1"}, on_pages,
+    )
+
+    assert sorted(page_infos) == list(range(1, 8))
+    assert sorted(p for checkpoint in checkpoints for p in checkpoint) == list(range(1, 8))
+    assert hashes == {p: f"hash-{p}" for p in range(1, 8)}
+    assert storage.objects["doc/page-3.png"] == {"source_generation": "1", "phash": "hash-3"}
+
+
+def test_rendering_waits_for_uploads(monkeypatch):
+    rendered: List[int] = []
+    monkeypatch.setattr(split_engine, "render_window", fake_render(rendered))
+    release = threading.Event()
+    engine = make_engine(MemoryStorage(release), processes=4, window=2, max_buffered_pages=4)
+
+    result: Dict[int, str] = {}
+    worker = threading.Thread(target=lambda: result.update(
+        engine.split("doc.pdf", list(range(1, 11)), get_encoding_profile("png"), lambda p: f"doc/page-{p}.png")
+    ))
+    worker.start()
+    time.sleep(0.2)
+    # 업로드가 막혀 있으면 max_buffered_pages를 넘는 구간은 래스터화하지 않음
+    assert len(rendered) == 4
+    release.set()
+    worker.join(5)
+
+    assert sorted(result) == list(range(1, 11))
+
+
+def test_unrendered_pages_fail_after_checkpointing_the_rest(monkeypatch):
+    monkeypatch.setattr(split_engine, "render_window", fake_render([], skip={3}))
+    checkpointed: Dict[int, str] = {}
+
+    with pytest.raises(RuntimeError, match="Failed to render 1 pages"):
+        make_engine(MemoryStorage()).split(
+            "doc.pdf", list(range(1, 9)), get_encoding_profile("png"), lambda p: f"doc/page-{p}.png",
+            None, lambda page_infos, page_hashes: checkpointed.update(page_infos),
+        )
+
+    # 빠진 페이지 때문에 멈추지 않고 나머지는 모두 업로드/체크포인트
+    assert sorted(checkpointed) == [1, 2, 4, 5, 6, 7, 8]
+
+
+def test_stall_raises_instead_of_waiting_forever(monkeypatch):
+    monkeypatch.setattr(split_engine, "render_window", fake_render([]))
+    engine = make_engine(MemoryStorage())
+    engine.max_buffered_pages = 0  # 어떤 구간도 제출할 수 없는 상태
+
+    with pytest.raises(RuntimeError, match="Split engine stalled"):
+        engine.split("doc.pdf", [1, 2], get_encoding_profile("png"), lambda p: f"doc/page-{p}.png")
@@ -0,0 +1,121 @@
+import io
+import os
+import sys
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+import processor.pdf_manager as pdf_manager
+from processor.pdf_manager import PDFManager
+from processor.page_hash import dhash
+
+PAGE_COUNT = 5
+
+
+def page_image(page_number: int) -> Image.Image:
+    image = Image.new("L", (40, 40), 255)
+    image.paste(0, (0, 0, page_number * 7, 40))  # 페이지마다 다른 dHash
+    return image
+
+
+class MemoryStorage:
+    """원본/처리 버킷 대신 메모리에 (본문, 메타데이터) 저장"""
+    source_bucket = "source"
+    target_bucket = "processed"
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, tuple] = {}
+        self.uploads: List[str] = []
+
+    def download_file(self, gcs_path: str, local_path: str, bucket_name: str) -> str:
+        with open(local_path, "wb") as f:
+            f.write(b"%PDF")
+        return local_path
+
+    def upload_bytes(self, data: bytes, gcs_path: str, bucket_name: str, content_type: str = "", metadata=None) -> str:
+        self.objects[gcs_path] = (data, dict(metadata or {}))
+        self.uploads.append(gcs_path)
+        return gcs_path
+
+    def download_bytes(self, gcs_path: str, bucket_name: str) -> bytes:
+        return self.objects[gcs_path][0]
+
+    def list_custom_metadata(self, prefix: str, bucket_name: str) -> Dict[str, Dict[str, str]]:
+        return {path: metadata for path, (_, metadata) in self.objects.items() if path.startswith(prefix)}
+
+
+def make_manager(storage: MemoryStorage, monkeypatch) -> PDFManager:
+    monkeypatch.setattr(pdf_manager, "pdfinfo_from_path", lambda path: {"Pages": PAGE_COUNT})
+    monkeypatch.setattr(
+        pdf_manager, "convert_from_path",
+        lambda path, dpi, first_page, last_page, grayscale=False: [page_image(p) for p in range(first_page, last_page + 1)],
+    )
+    return PDFManager(storage, None, None, None, split_window=2, text_layer_mode="off", session_factory=None)
+
+
+def run_split(manager: PDFManager, completed: Optional[Dict[int, str]] = None):
+    registered: Dict[int, str] = {}
+    hashes: Dict[int, str] = {}
+
+    def on_pages(page_infos, text_layers, page_hashes):
+        registered.update(page_infos)
+        hashes.update(page_hashes)
+
+    page_infos = manager.invoke_split("docs/a.pdf", source_generation=7, completed_pages=completed, on_pages=on_pages)
+    return page_infos, registered, hashes
+
+
+def test_split_records_phash_in_upload_metadata(monkeypatch):
+    storage = MemoryStorage()
+    page_infos, registered, hashes = run_split(make_manager(storage, monkeypatch))
+
+    assert sorted(page_infos) == list(range(1, PAGE_COUNT + 1))
+    assert registered == page_infos
+    for page_number, gcs_path in page_infos.items():
+        metadata = storage.objects[gcs_path][1]
+        assert metadata == {"source_generation": "7", "phash": hashes[page_number]}
+        assert hashes[page_number] == dhash(page_image(page_number))
+
+
+def test_resume_registers_uploaded_pages_with_phash(monkeypatch):
+    storage = MemoryStorage()
+    page_infos, _, hashes = run_split(make_manager(storage, monkeypatch))
+
+    # 1-2 페이지만 DB에 등록된 상태에서 중단, 3-5 페이지는 업로드만 끝남
+    storage.uploads.clear()
+    completed = {p: page_infos[p] for p in (1, 2)}
+    _, registered, recovered_hashes = run_split(make_manager(storage, monkeypatch), completed)
+
+    assert storage.uploads == []  # 다시 변환/업로드하지 않음
+    assert sorted(registered) == [3, 4, 5]
+    assert recovered_hashes == {p: hashes[p] for p in (3, 4, 5)}
+
+
+def test_resume_hashes_pages_uploaded_without_phash(monkeypatch):
+    storage = MemoryStorage()
+    page_infos, _, hashes = run_split(make_manager(storage, monkeypatch))
+
+    # dHash 메타데이터 도입 전 업로드 → 이미지를 받아서 계산
+    for gcs_path, (data, metadata) in list(storage.objects.items()):
+        storage.objects[gcs_path] = (data, {"source_generation": metadata["source_generation"]})
+    _, registered, recovered_hashes = run_split(make_manager(storage, monkeypatch), {1: page_infos[1]})
+
+    assert sorted(registered) == [2, 3, 4, 5]
+    for page_number in registered:
+        with Image.open(io.BytesIO(storage.objects[page_infos[page_number]][0])) as image:
+            assert recovered_hashes[page_number] == dhash(image)
+
+
+def test_pages_from_other_generation_are_split_again(monkeypatch):
+    storage = MemoryStorage()
+    page_infos, _, _ = run_split(make_manager(storage, monkeypatch))
+    for gcs_path, (data, metadata) in list(storage.objects.items()):
+        storage.objects[gcs_path] = (data, {**metadata, "source_generation": "6"})
+
+    storage.uploads.clear()
+    run_split(make_manager(storage, monkeypatch))
+
+    assert sorted(storage.uploads) == sorted(page_infos.values())
@@ -0,0 +1,133 @@
+import os
+import sys
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from sync.sync_manager import SyncManager
+from sync.change_detector import FileInfo
+from sync.notifications import ObjectChangeEvent, OBJECT_FINALIZE, OBJECT_DELETE, OBJECT_ARCHIVE
+from storage.gcs_client import BlobMetadata
+from db.repository import Repository
+from db.models import PDFDocument, DocumentStatus
+
+
+class FakeEventSource:
+    def __init__(self) -> None:
+        self.messages: List[tuple] = []
+        self.acked: List[str] = []
+
+    def pull(self, max_messages: int) -> List[tuple]:
+        messages, self.messages = self.messages[:max_messages], self.messages[max_messages:]
+        return messages
+
+    def ack(self, ack_ids: List[str]) -> None:
+        self.acked.extend(ack_ids)
+
+
+def blob(name: str, generation: int, md5: str, size: int = 100) -> BlobMetadata:
+    return BlobMetadata(name=name, size=size, generation=generation, md5_hash=md5, crc32c=None, updated=None)
+
+
+def event(event_type: str, blob_: BlobMetadata, overwritten_by: Optional[int] = None, bucket: str = "src") -> ObjectChangeEvent:
+    return ObjectChangeEvent(event_type=event_type, bucket=bucket, blob=blob_, overwritten_by_generation=overwritten_by)
+
+
+@pytest.fixture
+def sync(db_session):
+    repo = Repository(db_session)
+    repo.sync_page_status_with_documents = lambda: None  # MySQL UPDATE ... JOIN (sqlite 미지원)
+    manager = SyncManager(SimpleNamespace(source_bucket="src"), repo)
+    # 해시 계산 대신 (경로, md5)로 doc_id 결정 (경로별 doc_id, 같은 경로 + 같은 내용이면 같은 doc_id)
+    manager.detector._resolve_blob = lambda b: (
+        FileInfo(path=b.name, doc_id=f"{b.name}:{b.md5_hash}", content_hash=b.md5_hash, blob=b), None
+    )
+    return manager
+
+
+def status(sync, doc_id: str) -> DocumentStatus:
+    return sync.repo.session.get(PDFDocument, doc_id).status
+
+
+def test_new_file_is_registered_and_acked(sync):
+    source = FakeEventSource()
+    source.messages = [
+        ("a1", event(OBJECT_FINALIZE, blob("docs/a.pdf", 1, "m1"))),
+        ("a2", event(OBJECT_FINALIZE, blob("docs/a.txt", 1, "m2"))),  # 처리 대상 아님
+        ("a3", event(OBJECT_FINALIZE, blob("docs/b.pdf", 1, "m3"), bucket="other")),
+    ]
+    changes = sync.sync_from_events(source)
+
+    assert [f.doc_id for f in changes["new"]] == ["docs/a.pdf:m1"]
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.ACTIVE
+    assert sorted(source.acked) == ["a1", "a2", "a3"]
+
+
+def test_failed_db_write_is_not_acked(sync):
+    sync.repo.create_document = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("db down"))
+    source = FakeEventSource()
+    source.messages = [("a1", event(OBJECT_FINALIZE, blob("docs/a.pdf", 1, "m1")))]
+
+    sync.sync_from_events(source)
+
+    assert source.acked == []
+
+
+def test_overwrite_with_same_content_keeps_document_active(sync):
+    sync.repo.create_document("docs/a.pdf:m1", "docs/a.pdf", content_hash="m1", blob=blob("docs/a.pdf", 1, "m1"))
+    source = FakeEventSource()
+    source.messages = [
+        ("f", event(OBJECT_FINALIZE, blob("docs/a.pdf", 2, "m1"))),
+        ("d", event(OBJECT_ARCHIVE, blob("docs/a.pdf", 1, "m1"), overwritten_by=2)),
+    ]
+    changes = sync.sync_from_events(source)
+
+    assert changes["deleted"] == []
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.ACTIVE
+    assert sync.repo.session.get(PDFDocument, "docs/a.pdf:m1").generation == 2
+    assert sorted(source.acked) == ["d", "f"]
+
+
+def test_delete_of_old_generation_after_overwrite_is_ignored(sync):
+    sync.repo.create_document("docs/a.pdf:m1", "docs/a.pdf", content_hash="m1", blob=blob("docs/a.pdf", 1, "m1"))
+    source = FakeEventSource()
+    source.messages = [("f", event(OBJECT_FINALIZE, blob("docs/a.pdf", 2, "m1")))]
+    sync.sync_from_events(source)
+
+    # 이전 generation의 DELETE가 다음 pull에 도착
+    source.messages = [("d", event(OBJECT_DELETE, blob("docs/a.pdf", 1, "m1"), overwritten_by=2))]
+    sync.sync_from_events(source)
+
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.ACTIVE
+
+
+def test_overwrite_with_new_content_replaces_document(sync):
+    sync.repo.create_document("docs/a.pdf:m1", "docs/a.pdf", content_hash="m1", blob=blob("docs/a.pdf", 1, "m1"))
+    source = FakeEventSource()
+    source.messages = [
+        ("f", event(OBJECT_FINALIZE, blob("docs/a.pdf", 2, "m2"))),
+        ("d", event(OBJECT_ARCHIVE, blob("docs/a.pdf", 1, "m1"), overwritten_by=2)),
+    ]
+    sync.sync_from_events(source)
+
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.INACTIVE
+    assert status(sync, "docs/a.pdf:m2") == DocumentStatus.ACTIVE
+
+
+def test_reupload_after_delete_reactivates_document(sync):
+    sync.repo.create_document("docs/a.pdf:m1", "docs/a.pdf", content_hash="m1", blob=blob("docs/a.pdf", 1, "m1"))
+    source = FakeEventSource()
+    source.messages = [("d", event(OBJECT_DELETE, blob("docs/a.pdf", 1, "m1")))]
+    sync.sync_from_events(source)
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.INACTIVE
+
+    source.messages = [("f", event(OBJECT_FINALIZE, blob("docs/a.pdf", 3, "m1")))]
+    changes = sync.sync_from_events(source)
+
+    assert [f.doc_id for f in changes["new"]] == ["docs/a.pdf:m1"]
+    assert status(sync, "docs/a.pdf:m1") == DocumentStatus.ACTIVE
+    assert sync.repo.session.get(PDFDocument, "docs/a.pdf:m1").generation == 3
@@ -0,0 +1,74 @@
+import os
+import sys
+import math
+import logging
+
+import pytest
+from PyPDF2 import PdfWriter
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from processor.text_layer import score_text_layer, extract_text_layers, _quiet_pypdf2, MIN_CHARS, CHARS_PER_SQ_INCH
+
+LETTER_SQ_INCH = 8.5 * 11
+FULL_PAGE = "가" * math.ceil(LETTER_SQ_INCH * CHARS_PER_SQ_INCH)
+
+
+def test_full_clean_page_scores_one():
+    result = score_text_layer(FULL_PAGE, LETTER_SQ_INCH, False, False)
+    assert result.score == 1.0
+    assert result.coverage == 1.0
+    assert result.garbage_ratio == 0.0
+
+
+def test_short_text_scores_zero():
+    assert score_text_layer("가" * (MIN_CHARS - 1), LETTER_SQ_INCH, False, False).score == 0.0
+    assert score_text_layer("", 0, False, False).score == 0.0
+
+
+def test_sparse_page_scores_by_coverage():
+    text = "가" * (len(FULL_PAGE) // 2)
+    result = score_text_layer(text, LETTER_SQ_INCH, False, False)
+    assert result.coverage == pytest.approx(0.5, abs=0.01)
+    assert result.score == pytest.approx(0.75, abs=0.01)
+
+
+def test_unmapped_glyphs_lower_score():
+    text = FULL_PAGE[: len(FULL_PAGE) // 2] + "�" * (len(FULL_PAGE) // 2)
+    result = score_text_layer(text, LETTER_SQ_INCH, False, False)
+    assert result.garbage_ratio == pytest.approx(0.5, abs=0.01)
+    assert result.score == pytest.approx(0.5, abs=0.01)
+
+    cid = score_text_layer("(cid:12)" * 20, LETTER_SQ_INCH, False, False)
+    assert cid.garbage_ratio == 1.0
+    assert cid.score == 0.0
+
+
+def test_figures_and_tables_halve_score():
+    assert score_text_layer(FULL_PAGE, LETTER_SQ_INCH, True, False).score == 0.5
+    assert score_text_layer(FULL_PAGE, LETTER_SQ_INCH, True, True).score == 0.25
+
+
+def test_extract_blank_and_missing_pages(tmp_path):
+    pdf_path = str(tmp_path / "blank.pdf")
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    results = extract_text_layers(pdf_path, [1, 2])
+
+    assert results[1].score == 0.0 and results[1].char_count == 0
+    assert results[2].score == 0.0  # 없는 페이지도 점수 0으로 (OCR 대상)
+
+
+def test_quiet_pypdf2_restores_level_after_nested_use():
+    logger = logging.getLogger("PyPDF2")
+    logger.setLevel(logging.INFO)
+    with _quiet_pypdf2():
+        with _quiet_pypdf2():
+            assert logger.level == logging.ERROR
+        assert logger.level == logging.ERROR
+    assert logger.level == logging.INFO
+    logger.setLevel(logging.NOTSET)
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(PROJECT_PATH)
+
+from storage.gcs_client import BlobMetadata
+from config import HASH_CACHE_PATH, HASH_CACHE_MAX_ENTRIES
+
+
+class HashCache:
+    """
+    GCS 객체의 불변 식별자 (bucket, name, generation, size) → (doc_id, content_hash) 로컬 SQLite 캐시
+    - 프로세스 재시작 후에도 같은 객체는 다시 다운로드하지 않음
+    - max_entries 초과 시 마지막 접근 시각 기준 LRU 삭제
+    """
+    def __init__(self, path: str = HASH_CACHE_PATH, max_entries: int = HASH_CACHE_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS hash_cache (
+                bucket       TEXT    NOT NULL,
+                name         TEXT    NOT NULL,
+                generation   INTEGER NOT NULL,
+                size         INTEGER NOT NULL,
+                doc_id       TEXT    NOT NULL,
+                content_hash TEXT    NOT NULL,
+                last_access  REAL    NOT NULL,
+                PRIMARY KEY (bucket, name, generation, size)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_hash_cache_last_access ON hash_cache (last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM hash_cache").fetchone()[0]
+
+    def get(self, bucket: str, blob: BlobMetadata) -> Optional[Tuple[str, str]]:
+        """캐시 조회 → (doc_id, content_hash) 또는 None"""
+        if not blob.generation:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        key = (bucket, blob.name, blob.generation, blob.size)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id, content_hash FROM hash_cache "
+                "WHERE bucket = ? AND name = ? AND generation = ? AND size = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE hash_cache SET last_access = ? "
+                "WHERE bucket = ? AND name = ? AND generation = ? AND size = ?",
+                (time.time(), *key),
+            )
+            self._conn.commit()
+            return row[0], row[1]
+
+    def put(self, bucket: str, blob: BlobMetadata, doc_id: str, content_hash: str) -> None:
+        """해시 결과 저장 (generation을 모르는 객체는 저장하지 않음)"""
+        if not blob.generation:
+            return
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO hash_cache "
+                "(bucket, name, generation, size, doc_id, content_hash, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (bucket, blob.name, blob.generation, blob.size, doc_id, content_hash, time.time()),
+            )
+            self._entries += cursor.rowcount
+            if self._entries > self.max_entries:
+                self._evict(self._entries - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, count: int) -> None:
+        """가장 오래 접근하지 않은 항목부터 삭제 (lock 안에서 호출)"""
+        cursor = self._conn.execute(
+            "DELETE FROM hash_cache WHERE rowid IN "
+            "(SELECT rowid FROM hash_cache ORDER BY last_access ASC LIMIT ?)",
+            (count,),
+        )
+        self._entries -= cursor.rowcount
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+            "entries": self._entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
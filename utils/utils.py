@@ -1,16 +1,32 @@
 import os
 import sys
+import time
 import hashlib
+from dataclasses import dataclass
+from typing import Optional
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
 
 from storage.gcs_client import GCSStorageClient
+from config import HASH_CHUNK_SIZE
 
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_PATH)
 
 
+@dataclass
+class DocHashResult:
+    doc_id: str  # 내용 + 경로 해시
+    content_hash: str  # 내용만 해시 (이동 감지용)
+    size: int
+    elapsed: float
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+
 def get_file_hash(file_path: str, extra_data: str = "", hash_type="sha256"):
     # 사용할 해시 알고리즘 선택
     hash_func = getattr(hashlib, hash_type)()
@@ -26,26 +42,44 @@ def get_file_hash(file_path: str, extra_data: str = "", hash_type="sha256"):
 
     return hash_func.hexdigest()
 
+def compute_doc_hashes(storage_client: GCSStorageClient, gcs_pdf_path: str,
+                       generation: Optional[int] = None,
+                       chunk_size: int = HASH_CHUNK_SIZE) -> DocHashResult:
+    """
+    GCS PDF를 임시 파일 없이 한 번만 스트리밍으로 읽어서 doc_id와 content_hash를 함께 계산
+    doc_id = sha256(내용 + 경로), content_hash = sha256(내용) → get_file_hash 결과와 동일
+    """
+    hash_func = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+
+    with storage_client.open_stream(gcs_pdf_path, storage_client.source_bucket, chunk_size, generation) as stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            hash_func.update(chunk)
+            size += len(chunk)
+
+    content_hash = hash_func.hexdigest()
+
+    # 내용까지 계산된 해시 상태를 복사해서 경로만 추가 (재다운로드 불필요)
+    doc_hash_func = hash_func.copy()
+    doc_hash_func.update(gcs_pdf_path.encode("utf-8"))
+
+    return DocHashResult(
+        doc_id=doc_hash_func.hexdigest(),
+        content_hash=content_hash,
+        size=size,
+        elapsed=time.perf_counter() - start,
+    )
+
+
 def compute_content_hash(storage_client: GCSStorageClient, gcs_pdf_path: str) -> str:
     """파일 내용만으로 해시 계산 (이동 감지용)"""
-    import tempfile
-    
-    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
-        storage_client.download_file(
-            gcs_pdf_path, tmp.name, storage_client.source_bucket
-        )
-        return get_file_hash(tmp.name)  # extra_data 제거
+    return compute_doc_hashes(storage_client, gcs_pdf_path).content_hash
 
 
 def compute_doc_hash(storage_client: GCSStorageClient, gcs_pdf_path: str) -> str:
-    """Download a PDF to a tmp file and return its sha-256 hash."""
-    import tempfile
-
-    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
-        storage_client.download_file(
-            gcs_pdf_path, tmp.name, storage_client.source_bucket
-        )
-        return get_file_hash(tmp.name, extra_data=gcs_pdf_path)
+    """Stream a PDF from GCS and return its path-salted sha-256 hash."""
+    return compute_doc_hashes(storage_client, gcs_pdf_path).doc_id
 
 
 def split_file_path(path: str):